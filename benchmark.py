@@ -0,0 +1,486 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.benchmark
+Benchmark of HTML transforms on synthetic e-mail and landing page corpus
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import platform
+import tracemalloc
+import contextlib
+from colorama import Fore, init
+
+# ELQuent imports
+import utils.mail as mail
+import utils.link as link
+import utils.minifier as minifier
+import utils.page as page
+import utils.cache as cache
+
+# Initialize colorama
+init(autoreset=True)
+
+# Predefined messege elements
+ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
+WARNING = f'{Fore.WHITE}[{Fore.YELLOW}WARNING{Fore.WHITE}] '
+SUCCESS = f'{Fore.WHITE}[{Fore.GREEN}SUCCESS{Fore.WHITE}] '
+
+# Sizes of generated corpus codes in bytes
+CORPUS_SIZES = {
+    '10KB': 10 * 1024,
+    '100KB': 100 * 1024,
+    '1MB': 1024 * 1024
+}
+
+# Seed of corpus generator, so every run measures exactly the same codes
+CORPUS_SEED = 2020
+
+# Modules whose import is measured in fresh interpreter, elquent is the app startup
+IMPORT_MODULES = ['elquent', 'utils.api.api', 'utils.link', 'utils.mail', 'utils.minifier',
+                  'utils.page', 'utils.campaign', 'utils.cert', 'utils.webinar', 'utils.database',
+                  'utils.export', 'utils.report', 'utils.validator', 'utils.modifier', 'utils.admin']
+
+# Script measuring single import, with traced memory if second argument is given
+IMPORT_SCRIPT = '''
+import sys, json, time, tracemalloc
+if len(sys.argv) > 2:
+    tracemalloc.start()
+start = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, tracemalloc.get_traced_memory()[1]]))
+'''
+
+
+'''
+=================================================================================
+                                File Path Getter
+=================================================================================
+'''
+
+
+def file(file_path):
+    '''
+    Returns file path to benchmark files
+    '''
+
+    def find_data_file(filename, directory='api'):
+        '''
+        Returns correct file path for both script and frozen app
+        '''
+        if directory == 'api':  # For reading and saving baseline
+            if getattr(sys, 'frozen', False):
+                datadir = os.path.dirname(sys.executable)
+            else:
+                datadir = os.path.dirname(__file__)
+            return os.path.join(datadir, 'utils', directory, filename)
+
+    file_paths = {
+        'baseline': find_data_file('benchmark.json')
+    }
+
+    return file_paths.get(file_path)
+
+
+'''
+=================================================================================
+                                Corpus generator
+=================================================================================
+'''
+
+
+def email_block(rng, unique_links, links_per_block):
+    '''
+    Returns single content block of MJML generated e-mail
+    '''
+    link_id = rng.randrange(unique_links)
+    link_list = ''.join(
+        f'''
+                  <a href="https://www.wolterskluwer.pl/katalog/{rng.randrange(unique_links)}/">Pozycja</a><br/>'''
+        for _ in range(links_per_block - 1))
+    utm = '?utm_source=eloqua&utm_medium=email&utm_campaign=WKPL_EML_NSL' if rng.random() < 0.5 else ''
+    domain = rng.choice(['https://www.wolterskluwer.pl', 'https://info.wolterskluwer.pl',
+                         'https://sklep.lex.pl', 'https://sip.lex.pl'])
+
+    return f'''
+    <!--[if mso | IE]>
+      <table align="center" border="0" cellpadding="0" cellspacing="0" style="width:600px;" width="600">
+        <tr>
+          <td style="line-height:0px;font-size:0px;mso-line-height-rule:exactly;">
+    <![endif]-->
+    <div style="Margin:0px auto;max-width:600px;">
+      <table align="center" border="0" cellpadding="0" cellspacing="0" role="presentation" style="width:100%;">
+        <tbody>
+          <tr>
+            <td style="direction:ltr;font-size:0px;padding:20px 0;text-align:center;vertical-align:top;">
+              <!-- Content block {link_id} -->
+              <div class="mj-column-per-100 outlook-group-fix" style="font-size:13px;text-align:left;">
+                <a href="{domain}/produkt-{link_id}/{utm}" target="_blank" title="">
+                  <img alt="" height="auto" src="http://images.go.wolterskluwer.com/EloquaImages/clients/WoltersKluwer/{{{link_id}}}.png" style="border:0;display:block;" width="600" />
+                </a>
+                <p style="font-family:Arial, sans-serif;font-size:14px;line-height:22px;color:#474747;">
+                  Lorem ipsum dolor sit amet, consectetur adipiscing elit {link_id}.
+                  <a href="{domain}/produkt-{link_id}/szczegoly{utm}" data-class="">Zobacz więcej &gt;&gt;</a>
+                </p>{link_list}
+              </div>
+            </td>
+          </tr>
+        </tbody>
+      </table>
+    </div>
+    <!--[if mso | IE]>
+          </td>
+        </tr>
+      </table>
+    <![endif]-->'''
+
+
+def email_code(size, unique_links=50, links_per_block=1, seed=CORPUS_SEED):
+    '''
+    Returns synthetic e-mail code of given size in bytes
+    '''
+    rng = random.Random(seed)
+    head = '''<!doctype html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml">
+  <head>
+    <title></title>
+    <style type="text/css">
+      #outlook a {
+        padding: 0;
+      }
+      body {
+        margin: 0;
+        padding: 0;
+        -webkit-text-size-adjust: 100%;
+      }
+      table, td {
+        border-collapse: collapse;
+        mso-table-lspace: 0pt;
+      }
+    </style>
+  </head>
+  <body>
+    <div style="display:none;">Pre-header</div>'''
+    tail = '''
+    <a href="https://www.googleapis.com/font">Font</a>
+    <a href="mailto:<span class=eloquaemail>emailfield</span>">Unsubscribe</a>
+  </body>
+</html>
+'''
+    blocks = [head]
+    code_size = len(head) + len(tail)
+    while code_size < size:
+        block = email_block(rng, unique_links, links_per_block)
+        blocks.append(block)
+        code_size += len(block)
+    blocks.append(tail)
+
+    return ''.join(blocks)
+
+
+def page_code(size, seed=CORPUS_SEED):
+    '''
+    Returns synthetic landing page code with Eloqua form of given size in bytes
+    '''
+    rng = random.Random(seed)
+    head = '''<html>
+<head>
+<script type="text/javascript" src="https://code.jquery.com/jquery-1.8.3.min.js"></script>
+<script src="https://img.en25.com/i/livevalidation_standalone.compressed.js" type="text/javascript"></script>
+<style type="text/css">
+.elq-form input[type=submit] {
+    background: #007ac3;
+    color: #ffffff;
+}
+.LV_invalid {
+    color: #cc0000;
+}
+.checkbox-aligned{margin-left:5px;}
+</style>
+</head>
+<body>
+<div class="form">
+<form method="post" name="form" action="https://s1.eloqua.com/e/f2" onsubmit="return handleFormSubmit(this)" id="form">
+<input type="text" name="firstName" />
+<input type="text" name="lead_input" />
+<input type="checkbox" name="marketingOptIn" />
+<input type="submit" value="Wyślij" />
+</form>
+<script type="text/javascript">
+function handleFormSubmit(ele) { return true; }
+</script>
+</div>
+<script type="text/javascript">
+$(document).ready(function() { var requiredChecked = true; });
+</script>'''
+    tail = '''
+</body>
+</html>
+'''
+    sections = [head]
+    code_size = len(head) + len(tail)
+    while code_size < size:
+        section_id = rng.randrange(1000)
+        section = f'''
+<div class="section-{section_id}">
+  <h2>Nagłówek sekcji {section_id}</h2>
+  <p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>
+  <a href="https://www.wolterskluwer.pl/sekcja-{section_id}/">Więcej</a>
+</div>'''
+        sections.append(section)
+        code_size += len(section)
+    sections.append(tail)
+
+    return ''.join(sections)
+
+
+def corpus_getter():
+    '''
+    Returns corpus as dict of {name: (kind, code)}
+    '''
+    corpus = {}
+    for size_name, size in CORPUS_SIZES.items():
+        corpus[f'email-{size_name}'] = ('email', email_code(size))
+    # Many unique links in a single e-mail stress per link replacements
+    corpus['email-100KB-links'] = ('email', email_code(
+        CORPUS_SIZES['100KB'], unique_links=100000, links_per_block=20))
+    corpus['email-1MB-links'] = ('email', email_code(
+        CORPUS_SIZES['1MB'], unique_links=100000, links_per_block=20))
+    for size_name, size in CORPUS_SIZES.items():
+        corpus[f'page-{size_name}'] = ('page', page_code(size))
+
+    return corpus
+
+
+'''
+=================================================================================
+                                Benchmarked transforms
+=================================================================================
+'''
+
+
+def mail_link_manipulator(code):
+    '''
+    Runs mail.link_manipulator with new UTM tracking script
+    '''
+    return mail.link_manipulator(code, '?utm_source=benchmark&utm_medium=email')
+
+
+def page_swap_form(code):
+    '''
+    Runs page.swap_form with a minimal form
+    '''
+    form = '<form method="post" name="new-form"><input type="submit" value="Wyślij" /></form>'
+
+    return page.swap_form(code, form)
+
+
+# Transforms as {name: (kind of corpus code, function)}
+transforms = {
+    'minifier.email_minifier': ('email', minifier.email_minifier),
+    'link.add_elqtrack': ('email', link.add_elqtrack),
+    'mail.link_manipulator': ('email', mail_link_manipulator),
+    'page.swap_form': ('page', page_swap_form),
+    'page.javascript': ('page', page.javascript)
+}
+
+
+'''
+=================================================================================
+                                Measurements
+=================================================================================
+'''
+
+
+def measure(function, code, repeat):
+    '''
+    Returns (best seconds, mean seconds, peak memory in bytes) of function on code
+    Peak memory is traced in separate run as tracing slows down the timing
+    '''
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(code)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(code)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (min(timings), sum(timings) / len(timings), peak_memory)
+
+
+def measure_import(module_name, repeat):
+    '''
+    Returns (best seconds, mean seconds, peak memory in bytes) of importing module
+    Each import runs in fresh interpreter so nothing is imported beforehand
+    '''
+    def run_import(*trace):
+        outcome = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT, module_name, *trace],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        return json.loads(outcome.stdout.decode('utf-8').splitlines()[-1])
+
+    timings = [run_import()[0] for _ in range(repeat)]
+    peak_memory = run_import('trace')[1]
+
+    return (min(timings), sum(timings) / len(timings), peak_memory)
+
+
+def run_benchmark(chosen_transforms, repeat):
+    '''
+    Returns results as {transform: {corpus: {best, mean, peak}}}
+    Import times are stored as {imports: {module: {best, mean, peak}}}
+    '''
+    corpus = corpus_getter()
+    results = {}
+    for transform_name in chosen_transforms:
+        if transform_name == 'imports':
+            results['imports'] = {}
+            for module_name in IMPORT_MODULES:
+                try:
+                    best, mean, peak = measure_import(module_name, repeat)
+                except subprocess.CalledProcessError as error:
+                    print(f'{WARNING}Skipping import of {module_name}: '
+                          f'{error.stderr.decode("utf-8").strip().splitlines()[-1]}')
+                    continue
+                results['imports'][module_name] = {
+                    'best': round(best, 6),
+                    'mean': round(mean, 6),
+                    'peak': peak
+                }
+                print(f'{Fore.WHITE}{transform_name:<26}{module_name:<20}'
+                      f'{Fore.YELLOW}{best*1000:>10.2f}ms{Fore.WHITE}{peak/1024:>12.0f}kB', flush=True)
+            continue
+        kind, function = transforms[transform_name]
+        results[transform_name] = {}
+        for corpus_name, (corpus_kind, code) in corpus.items():
+            if corpus_kind != kind:
+                continue
+            try:
+                # Transforms print their progress to user, which is not measured here
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    best, mean, peak = measure(function, code, repeat)
+            except FileNotFoundError as error:
+                print(f'{WARNING}Skipping {transform_name}: missing template {error.filename}')
+                del results[transform_name]
+                break
+            results[transform_name][corpus_name] = {
+                'best': round(best, 6),
+                'mean': round(mean, 6),
+                'peak': peak
+            }
+            print(f'{Fore.WHITE}{transform_name:<26}{corpus_name:<20}'
+                  f'{Fore.YELLOW}{best*1000:>10.2f}ms{Fore.WHITE}{peak/1024:>12.0f}kB', flush=True)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Prints comparison with baseline
+    Returns list of regressions over tolerance [list of strings]
+    '''
+    regressions = []
+    print(f'\n{Fore.GREEN}{"Transform":<26}{"Corpus":<20}{"Time":>10}{"Memory":>10}')
+    for transform_name, corpus_results in results.items():
+        for corpus_name, result in corpus_results.items():
+            base = baseline.get(transform_name, {}).get(corpus_name)
+            if not base:
+                continue
+            time_change = result['best'] / base['best'] - 1 if base['best'] else 0
+            memory_change = result['peak'] / base['peak'] - 1 if base['peak'] else 0
+            row = []
+            for metric, change in (('time', time_change), ('memory', memory_change)):
+                color = Fore.RED if change > tolerance else Fore.GREEN if change < -tolerance else Fore.WHITE
+                row.append(f'{color}{change*100:>+9.0f}%')
+                if change > tolerance:
+                    regressions.append(f'{transform_name} on {corpus_name}: {metric} {change*100:+.0f}%')
+            print(f'{Fore.WHITE}{transform_name:<26}{corpus_name:<20}{"".join(row)}')
+
+    return regressions
+
+
+'''
+=================================================================================
+                                Benchmark entry
+=================================================================================
+'''
+
+
+def benchmark_module(arguments):
+    '''
+    Measures chosen transforms and compares them with stored baseline
+    Returns exit code (1 if any transform regressed over tolerance) [integer]
+    '''
+    parser = argparse.ArgumentParser(
+        prog='benchmark.py',
+        description='Measures time and peak memory of ELQuent HTML transforms and imports')
+    parser.add_argument('transforms', nargs='*',
+                        help=f'transforms to measure: {", ".join(transforms)}, imports (default: all)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timed runs per transform and corpus code (default: 5)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown or memory growth over baseline (default: 0.25)')
+    parser.add_argument('--save', action='store_true',
+                        help='store results as new baseline')
+    args = parser.parse_args(arguments)
+    unknown_transforms = [name for name in args.transforms
+                          if name not in transforms and name != 'imports']
+    if unknown_transforms:
+        parser.error(f'unknown transforms: {", ".join(unknown_transforms)}')
+
+    # Cached outcomes would hide the real cost of transforms
+    cache.CACHE_ENABLED = False
+
+    chosen_transforms = args.transforms or list(transforms.keys()) + ['imports']
+    print(f'\n{Fore.GREEN}ELQuent.benchmark on Python {platform.python_version()}:')
+    results = run_benchmark(chosen_transforms, args.repeat)
+
+    if args.save:
+        try:
+            with open(file('baseline'), 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            baseline = {}
+        baseline.update(results)
+        with open(file('baseline'), 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=4)
+        print(f'\n{SUCCESS}Baseline saved to {file("baseline")}')
+        return 0
+
+    try:
+        with open(file('baseline'), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        print(f'\n{WARNING}No baseline to compare with, run with --save to store one')
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f'\n{ERROR}Regressions over {args.tolerance*100:.0f}% tolerance:')
+        for regression in regressions:
+            print(f'{Fore.WHITE}  » {regression}')
+        return 1
+    print(f'\n{SUCCESS}No regressions over {args.tolerance*100:.0f}% tolerance')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(benchmark_module(sys.argv[1:]))
@@ -18,23 +18,15 @@ import json
 import shutil
 import pickle
 import datetime
+import importlib
+import threading
+import multiprocessing
 import requests
 from colorama import Fore, Style, init
 
-# ELQuent imports
-import utils.mail as mail
-import utils.link as link
-import utils.minifier as minifier
-import utils.page as page
-import utils.cert as cert
-import utils.campaign as campaign
-import utils.webinar as webinar
-import utils.database as database
-import utils.export as export
-import utils.report as report
-import utils.validator as validator
-import utils.modifier as modifier
-import utils.admin as admin
+# ELQuent imports (utility modules are imported lazily by util function)
+import utils.cache as cache
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -83,7 +75,7 @@ def file(file_path):
         'readme': find_data_file('readme.md'),
         'country': find_data_file('country.p', directory='api'),
         'eloqua': find_data_file('eloqua.p', directory='api'),
-        'naming': find_data_file('naming.json', directory='api')
+        'version': find_data_file('version.json', directory='api')
     }
 
     return file_paths.get(file_path)
@@ -94,6 +86,25 @@ os.makedirs(file('incomes'), exist_ok=True)
 os.makedirs(file('outcomes'), exist_ok=True)
 
 
+'''
+=================================================================================
+                            Lazy Utility Loader
+=================================================================================
+'''
+
+
+def util(module_name, function_name):
+    '''
+    Returns function of ELQuent utility module that imports the module
+    (and its heavy dependencies) only when it is called
+    '''
+    def lazy_util(*args):
+        module = importlib.import_module(f'utils.{module_name}')
+        return getattr(module, function_name)(*args)
+
+    return lazy_util
+
+
 '''
 =================================================================================
                             Source Country Getter
@@ -138,31 +149,104 @@ def get_source_country():
 '''
 
 
-def new_version():
+# Seconds to wait for Github before giving up the version check
+VERSION_TIMEOUT = 3
+
+
+def cached_version_getter():
     '''
-    Returns True if there is newer version of the app available
+    Returns version available on Github if it was checked today [string] or None
     '''
-    # Gets current version number of running app
-    with open(file('readme'), 'r', encoding='utf-8') as files:
-        readme = files.read()
-    check_current_version = re.compile(r'\[_Version: (.*?)_\]', re.UNICODE)
-    current_version = check_current_version.findall(readme)
+    try:
+        with open(file('version'), 'r', encoding='utf-8') as f:
+            version_cache = json.load(f)
+        if version_cache['checked'] == datetime.date.today().isoformat():
+            return version_cache['available']
+    except (OSError, KeyError, TypeError, json.decoder.JSONDecodeError):
+        pass
+
+    return None
+
+
+def available_version_getter():
+    '''
+    Returns version available on Github, checked at most once per day [string]
+    or None if it could not be checked
+    '''
+    cached_version = cached_version_getter()
+    if cached_version:
+        return cached_version
 
     # Gets available version number on Github
-    github = requests.get('https://github.com/MateuszDabrowski/ELQuent')
+    try:
+        github = requests.get('https://github.com/MateuszDabrowski/ELQuent', timeout=VERSION_TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None
     check_available_version = re.compile(
         r'\[<em>Version: (.*?)</em>\]', re.UNICODE)
     available_version = check_available_version.findall(github.text)
+    if not available_version:
+        return None
+
+    try:
+        with open(file('version'), 'w', encoding='utf-8') as f:
+            json.dump({'checked': datetime.date.today().isoformat(),
+                       'available': available_version[0]}, f)
+    except OSError:
+        pass
 
-    current_main_version = ('').join(current_version[0].split('.')[:2])
-    available_main_version = ('').join(available_version[0].split('.')[:2])
+    return available_version[0]
+
+
+def version_check(current_version, available_version, startup):
+    '''
+    Warns if there is newer version of the app available
+    Stops the app on newer main version if checked at startup
+    '''
+    if not available_version:
+        return
+
+    # Skips comparison of versions that are not numeric, e.g. 1.15b
+    try:
+        current_main_version = tuple(int(part) for part in current_version.split('.')[:2])
+        available_main_version = tuple(int(part) for part in available_version.split('.')[:2])
+    except ValueError:
+        return
     if current_main_version < available_main_version:
-        print(f'{ERROR}Update ELQuent to newer version')
-        input('')
-        raise SystemExit
+        print(f'\n{ERROR}Update ELQuent to newer version')
+        if startup:
+            input('')
+            raise SystemExit
+    elif current_version != available_version:
+        print(
+            f'\n{Fore.WHITE}[{Fore.RED}!{Fore.WHITE}]{Fore.RED} Newer version available')
 
-    # Compares versions
-    return bool(current_version != available_version)
+    return
+
+
+def new_version():
+    '''
+    Checks if there is newer version of the app available
+    Uses version checked today at once, otherwise asks Github in background
+    so the menu is not blocked by slow or missing network
+    '''
+    # Gets current version number of running app
+    with open(file('readme'), 'r', encoding='utf-8') as files:
+        readme = files.read()
+    check_current_version = re.compile(r'\[_Version: (.*?)_\]', re.UNICODE)
+    current_version = check_current_version.findall(readme)[0]
+
+    # Version checked today is known without any network call
+    cached_version = cached_version_getter()
+    if cached_version:
+        version_check(current_version, cached_version, startup=True)
+        return
+
+    threading.Thread(
+        target=lambda: version_check(current_version, available_version_getter(), startup=False),
+        daemon=True).start()
+
+    return
 
 
 '''
@@ -202,6 +286,16 @@ def clean_incomes():
     return
 
 
+def clean_cache():
+    '''
+    Cleans all cached outcomes of code transforms
+    '''
+    cache.cache_clear()
+    print(f'\n{Fore.GREEN}» Cache cleaned.')
+
+    return
+
+
 def clean_folders(_):
     '''
     Cleaning functions menu
@@ -214,6 +308,8 @@ def clean_folders(_):
         f'{Fore.WHITE}[{Fore.YELLOW}Outcomes{Fore.WHITE}] Clean Outcomes folder'
         f'\n{Fore.WHITE}[{Fore.YELLOW}3{Fore.WHITE}]\t»',
         f'{Fore.WHITE}{Fore.WHITE}[{Fore.YELLOW}Both{Fore.WHITE}] Clean Incomes & Outcomes folders'
+        f'\n{Fore.WHITE}[{Fore.YELLOW}4{Fore.WHITE}]\t»',
+        f'{Fore.WHITE}[{Fore.YELLOW}Cache{Fore.WHITE}] Clean cached minified and tracked codes'
         f'\n{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t»',
         f'{Fore.WHITE}[{Fore.YELLOW}Quit to main menu{Fore.WHITE}]'
     )
@@ -232,6 +328,9 @@ def clean_folders(_):
             clean_incomes()
             clean_outcomes()
             break
+        elif choice == '4':
+            clean_cache()
+            break
         else:
             print(f'{Fore.RED}Entered value does not belong to any utility!')
             choice = ''
@@ -250,26 +349,25 @@ def menu(choice=''):
     '''
     print(f'\n{Fore.GREEN}-----------------------------------------------------------------------------')
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as naming_file:
-        naming = json.load(naming_file)
+    # Gets naming convention shared with utils
+    naming = config.naming_getter()
 
     # Builds matrix with available utils
     utils = {
         'clean_folders': (clean_folders, f'Folder{Fore.WHITE}] Clean files in Income/Outcome folders'),
-        'change_links': (link.link_module, f'Link{Fore.WHITE}] Change utm_track and elqTrack codes in e-mail links'),
-        'minify_code': (minifier.minifier_module, f'Minifier{Fore.WHITE}] Minify e-mail HTML code'),
-        'build_mail': (mail.mail_constructor, f'Mail{Fore.WHITE}] Build e-mail from package in Incomes folder'),
-        'page_gen': (page.page_gen, f'Page{Fore.WHITE}] Swap or Add Form to a single Landing Page'),
-        'campaign_gen': (campaign.campaign_module, f'Campaign{Fore.WHITE}] Build various Eloqua campaigns'),
-        'contacts': (database.contact_list, f'Contacts{Fore.WHITE}] Create contact upload file with correct structure'),
-        'validator': (validator.validator_module, f'Validator{Fore.WHITE}] Test and validate assets and campaigns'),
-        'modifier': (modifier.modifier_module, f'Modifier{Fore.WHITE}] Modify multiple assets at once'),
-        'webinar': (webinar.webinar_module, f'Webinar{Fore.WHITE}] Upload Webinar attendees & activity'),
-        'cert': (cert.cert_constructor, f'Certificate{Fore.WHITE}] Create certificates and upload with contacts'),
-        'report': (report.report_module, f'Report{Fore.WHITE}] Creates reports on clicks in e-mails'),
-        'export': (export.export_module, f'Export{Fore.WHITE}] Export and save campaign or activity data'),
-        'admin': (admin.admin_module, f'Admin{Fore.WHITE}] WKCORP flows')
+        'change_links': (util('link', 'link_module'), f'Link{Fore.WHITE}] Change utm_track and elqTrack codes in e-mail links'),
+        'minify_code': (util('minifier', 'minifier_module'), f'Minifier{Fore.WHITE}] Minify e-mail HTML code'),
+        'build_mail': (util('mail', 'mail_constructor'), f'Mail{Fore.WHITE}] Build e-mail from package in Incomes folder'),
+        'page_gen': (util('page', 'page_gen'), f'Page{Fore.WHITE}] Swap or Add Form to a single Landing Page'),
+        'campaign_gen': (util('campaign', 'campaign_module'), f'Campaign{Fore.WHITE}] Build various Eloqua campaigns'),
+        'contacts': (util('database', 'contact_list'), f'Contacts{Fore.WHITE}] Create contact upload file with correct structure'),
+        'validator': (util('validator', 'validator_module'), f'Validator{Fore.WHITE}] Test and validate assets and campaigns'),
+        'modifier': (util('modifier', 'modifier_module'), f'Modifier{Fore.WHITE}] Modify multiple assets at once'),
+        'webinar': (util('webinar', 'webinar_module'), f'Webinar{Fore.WHITE}] Upload Webinar attendees & activity'),
+        'cert': (util('cert', 'cert_constructor'), f'Certificate{Fore.WHITE}] Create certificates and upload with contacts'),
+        'report': (util('report', 'report_module'), f'Report{Fore.WHITE}] Creates reports on clicks in e-mails'),
+        'export': (util('export', 'export_module'), f'Export{Fore.WHITE}] Export and save campaign or activity data'),
+        'admin': (util('admin', 'admin_module'), f'Admin{Fore.WHITE}] WKCORP flows')
     }
 
     # Access to all utils for admin
@@ -291,6 +389,7 @@ def menu(choice=''):
     # Validate Voucher App if old last sync
     if SOURCE_COUNTRY == 'PL' and ELOQUA_USER.lower() in naming[SOURCE_COUNTRY]['local_admin']:
         # Gets list of already uploaded voucher campaigns
+        validator = importlib.import_module('utils.validator')
         validator.country_naming_setter(SOURCE_COUNTRY)
         uploaded_voucher_shared_list = api.eloqua_asset_get(
             naming[SOURCE_COUNTRY]['id']['voucher_campaigns'], 'sharedContent', depth='complete')
@@ -369,53 +468,53 @@ def menu(choice=''):
 '''
 
 
-print(f'\n{Fore.GREEN}Ahoj!')
+# Process pool children (e.g. batch minifier) import this file without running the app
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+
+    # Headless monitoring for cron/daemon runs skips update check and password prompt
+    if len(sys.argv) > 1 and sys.argv[1] == 'monitor':
+        raise SystemExit(util('monitor', 'monitor_module')(sys.argv[2:]))
+
+    print(f'\n{Fore.GREEN}Ahoj!')
+
+    # Checks if there is newer version of the app without blocking the menu
+    new_version()
+
+    # Loads utils.json containing source countries and utils available for them
+    with open(file('utils'), 'r', encoding='utf-8') as f:
+        COUNTRY_UTILS = json.load(f)
+
+    # Gets required auth data and prints them
+    SOURCE_COUNTRY = get_source_country()
+
+    # Get eloqua auth for multiple calls
+    eloqua_key = api.get_eloqua_auth(SOURCE_COUNTRY)
+
+    # Load domain and user name
+    ELOQUA_DOMAIN, ELOQUA_USER = pickle.load(open(file('eloqua'), 'rb'))
 
-# Checks if there is newer version of the app
-if new_version():
     print(
-        f'\n{Fore.WHITE}[{Fore.RED}!{Fore.WHITE}]{Fore.RED} Newer version available')
-
-# Loads utils.json containing source countries and utils available for them
-with open(file('utils'), 'r', encoding='utf-8') as f:
-    COUNTRY_UTILS = json.load(f)
-
-# Gets required auth data and prints them
-SOURCE_COUNTRY = get_source_country()
-
-# Get eloqua auth for multiple calls
-eloqua_key = api.get_eloqua_auth(SOURCE_COUNTRY)
-
-# Load domain and user name
-ELOQUA_DOMAIN, ELOQUA_USER = pickle.load(open(file('eloqua'), 'rb'))
-
-print(
-    f'\n{Fore.YELLOW}User » {Fore.WHITE}[{Fore.GREEN}{ELOQUA_DOMAIN} {SOURCE_COUNTRY}{Fore.WHITE}] {ELOQUA_USER}')
-
-# Checks for terminal arguments of shell function
-if len(sys.argv) < 2:
-    menu()
-elif sys.argv[1] == 'link':
-    link.link_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'mail':
-    mail.mail_constructor(SOURCE_COUNTRY)
-elif sys.argv[1] == 'page':
-    page.page_gen(SOURCE_COUNTRY)
-elif sys.argv[1] == 'campaign':
-    campaign.campaign_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'web':
-    webinar.webinar_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'base':
-    database.contact_list(SOURCE_COUNTRY)
-elif sys.argv[1] == 'export':
-    export.export_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'validate':
-    validator.validator_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'modify':
-    modifier.modifier_module(SOURCE_COUNTRY)
-elif sys.argv[1] == 'report':
-    report.report_module()(SOURCE_COUNTRY)
-
-# Allows to cycle through options after first errand
-while True:
-    menu()
+        f'\n{Fore.YELLOW}User » {Fore.WHITE}[{Fore.GREEN}{ELOQUA_DOMAIN} {SOURCE_COUNTRY}{Fore.WHITE}] {ELOQUA_USER}')
+
+    # Checks for terminal arguments of shell function
+    shell_utils = {
+        'link': ('link', 'link_module'),
+        'mail': ('mail', 'mail_constructor'),
+        'page': ('page', 'page_gen'),
+        'campaign': ('campaign', 'campaign_module'),
+        'web': ('webinar', 'webinar_module'),
+        'base': ('database', 'contact_list'),
+        'export': ('export', 'export_module'),
+        'validate': ('validator', 'validator_module'),
+        'modify': ('modifier', 'modifier_module'),
+        'report': ('report', 'report_module')
+    }
+    if len(sys.argv) < 2:
+        menu()
+    elif sys.argv[1] in shell_utils:
+        util(*shell_utils[sys.argv[1]])(SOURCE_COUNTRY)
+
+    # Allows to cycle through options after first errand
+    while True:
+        menu()
@@ -16,7 +16,8 @@ buildOptions = dict(
     include_files=['README.md', 'LICENSE', 'utils', 'utils.json'],
     packages=['pyperclip', 'csv', 're', 'os', 'sys', 'pickle', 'requests', 'idna',
               'platform', 'colorama', 'json', 'multiprocessing', 'shutil', 'PyPDF2',
-              'time', 'datetime', 'getpass', 'base64', 'webbrowser', 'reportlab']
+              'time', 'datetime', 'getpass', 'base64', 'webbrowser', 'reportlab', 'argparse',
+              'utils']
 )
 
 base = 'Console'
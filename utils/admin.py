@@ -12,17 +12,21 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 
 # Python imports
 import os
-import re
 import sys
 import csv
 import json
+import time
+import pickle
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
 import utils.helper as helper
 import utils.modifier as modifier
+import utils.config as config
+import utils.template as template
 import utils.api.api as api
 
 # Initialize colorama
@@ -32,6 +36,12 @@ init(autoreset=True)
 naming = None
 source_country = None
 
+# Maximum of concurrent Eloqua API calls
+ADMIN_WORKERS = 8
+
+# Count of crawled assets after which dependency graph is saved
+DEPENDENCY_CHECKPOINT = 500
+
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
 SUCCESS = f'{Fore.WHITE}[{Fore.GREEN}SUCCESS{Fore.WHITE}] '
@@ -47,10 +57,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -89,7 +98,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'emailgroups': find_data_file('emailgroups.json', directory='api'),
         'form': find_data_file(f'WKCORP_form-email-group.json'),
         'filter': find_data_file(f'WKCORP_filter-email-group.json'),
@@ -98,6 +106,8 @@ def file(file_path, name=''):
         'program-last-step': find_data_file(f'WKCORP_program-last-step.txt'),
         'email-groups': find_data_file(f'WKCORP_email-groups.json'),
         'outcome-json': find_data_file(f'WK{source_country}_{name}.json', directory='outcomes'),
+        'dependency-graph': find_data_file(f'dependencies{source_country}.p', directory='api'),
+        'outcome-ndjson': find_data_file(f'WK{source_country}_{name}.ndjson', directory='outcomes'),
         'outcome-csv': find_data_file(f'WK{source_country}_{name}.csv', directory='outcomes')
     }
 
@@ -116,102 +126,86 @@ def email_groups():
     Creates shared lists and forms for email group corp program
     '''
 
-    def form_builder(countries, groups):
+    def form_job(countries, email_group):
         '''
-        Creates form for each given e-mail group
+        Returns (name, asset type, json) of form for given e-mail group
         '''
-        # Prepares informations necessary for proper data in API call
-        form_folder_id = countries['FolderID']['Form']
-
-        # Gets form source json
-        with open(file('form'), 'r', encoding='utf-8') as f:
-            source_form_json = json.load(f)
-
-        # Iterates for each e-mail group to create form for each
-        for email_group in groups:
-            print(
-                f'\n{Fore.WHITE}[{Fore.YELLOW}CREATING{Fore.WHITE}] {email_group[0]} Form:')
+        form_name = f'{email_group[0]}-{email_group[1]}_FORM'
+        form_html_name = f'{email_group[0]}'
 
-            form_name = f'{email_group[0]}-{email_group[1]}_FORM'
-            form_html_name = f'{email_group[0]}'
+        # Fills form source json for API call
+        form_json = template.json_template_filler(file('form'), {
+            'HTML_NAME': form_html_name,
+            'FORM_NAME': form_name,
+            'EMAIL_GROUP': email_group[0],
+            'GROUP_ID': email_group[1],
+            'FOLDER_ID': countries['FolderID']['Form']
+        })
 
-            # Change form json to string for easy replacing
-            form_string = json.dumps(source_form_json)
-            form_string = form_string\
-                .replace('HTML_NAME', form_html_name)\
-                .replace('FORM_NAME', form_name)\
-                .replace('EMAIL_GROUP', email_group[0])\
-                .replace('GROUP_ID', email_group[1])\
-                .replace('FOLDER_ID', form_folder_id)
+        return (form_name, 'form', form_json)
 
-            # Change back to json for API call
-            form_json = json.loads(form_string)
-
-            # Creates form with given data
-            form_id = api.eloqua_create_form(form_name, form_json)[0]
-
-            # Save to outcome json file
-            assets_created[email_group[0]].append([form_name, form_id])
-
-    def sharedfilter_builder(countries, groups):
+    def sharedfilter_jobs(countries, email_group):
         '''
-        Creates pair of shared filters (sub/unsub) for each given e-mail group
+        Returns [(name, asset type, json)] of shared filters (sub/unsub) for given e-mail group
         '''
-        # Prepares informations necessary for proper data in API call
-        filter_folder_id = countries['FolderID']['SharedFilter']
-
-        # Gets form source json
-        with open(file('filter'), 'r', encoding='utf-8') as f:
-            source_filter_json = json.load(f)
-
-        # Change form json to string for easy replacing
-        filter_string = json.dumps(source_filter_json)
-
-        # Iterates for each e-mail group to create form for each
+        jobs = []
+        for filter_type, criterion in [('SUB', 'SubscriptionCriterion'), ('UNSUB', 'UnsubscriptionCriterion')]:
+            filter_name = f'WK{source_country}_{email_group[0]}-{email_group[1]}_{filter_type}-FILTER'
+
+            # Fills filter source json for API call
+            filter_json = template.json_template_filler(file('filter'), {
+                'FILTER_NAME': filter_name,
+                'GROUP_ID': email_group[1],
+                'FOLDER_ID': countries['FolderID']['SharedFilter'],
+                'SUB_CRITERION': criterion
+            })
+            jobs.append((filter_name, 'sharedFilter', filter_json))
+
+        return jobs
+
+    def asset_builder(countries, groups):
+        '''
+        Creates form and pair of shared filters (sub/unsub) for each given e-mail group
+        Skips assets which names already exist and creates the rest concurrently
+        '''
+        # Builds [form, sub filter, unsub filter] jobs for each e-mail group in order
+        jobs = []
         for email_group in groups:
-            print(
-                f'\n{Fore.WHITE}[{Fore.YELLOW}CREATING{Fore.WHITE}] {email_group[0]} Shared Filters (SUB/UNSUB):')
-
-            # ---------------------------------- Creating Subscription Shared Filter
-            filter_sub_name = f'WK{source_country}_{email_group[0]}-{email_group[1]}_SUB-FILTER'
-
-            # Swapping shared filter elements
-            filter_sub_string = filter_string\
-                .replace('FILTER_NAME', filter_sub_name)\
-                .replace('GROUP_ID', email_group[1])\
-                .replace('FOLDER_ID', filter_folder_id)\
-                .replace('SUB_CRITERION', 'SubscriptionCriterion')
-
-            # Change back to json for API call
-            filter_sub_json = json.loads(filter_sub_string)
-
-            # Creates form with given data
-            filter_id = api.eloqua_create_filter(
-                filter_sub_name, filter_sub_json)[0]
-
-            # Save to outcome json file
-            assets_created[email_group[0]].append([filter_sub_name, filter_id])
-
-            # ---------------------------------- Creating Unsubscription Shared Filter
-            filter_unsub_name = f'WK{source_country}_{email_group[0]}-{email_group[1]}_UNSUB-FILTER'
-
-            # Swapping shared filter elements
-            filter_unsub_string = filter_string\
-                .replace('FILTER_NAME', filter_unsub_name)\
-                .replace('GROUP_ID', email_group[1])\
-                .replace('FOLDER_ID', filter_folder_id)\
-                .replace('SUB_CRITERION', 'UnsubscriptionCriterion')
+            jobs.append((email_group[0], form_job(countries, email_group)))
+            jobs.extend((email_group[0], job) for job in sharedfilter_jobs(countries, email_group))
+
+        # Gets names of already existing assets once instead of searching for each of them
+        # (forms by prefix of every e-mail group, as groups may differ in it)
+        print(f'\n{Fore.WHITE}[{Fore.YELLOW}CHECKING{Fore.WHITE}] Existing forms and shared filters', end='')
+        form_prefixes = sorted({email_group[0].split('_')[0] for email_group in groups})
+        queries = [('form', f'{prefix}*') for prefix in form_prefixes]
+        queries.append(('sharedFilter', f'WK{source_country}_*'))
+        name_index = {'form': {}, 'sharedFilter': {}}
+        for asset_type, query in queries:
+            name_index[asset_type].update(
+                {asset['name']: asset['id'] for asset in assets_getter(query, asset_type)})
+
+        def asset_creator(job):
+            '''
+            Returns id of existing or newly created asset
+            '''
+            name, asset_type, asset_json = job[1]
+            if name in name_index[asset_type]:
+                print(f'\n{Fore.WHITE}» {Fore.YELLOW}{name}{Fore.WHITE} already exists')
+                return name_index[asset_type][name]
+            print(f'\n{Fore.WHITE}[{Fore.YELLOW}CREATING{Fore.WHITE}] {name}:')
+            if asset_type == 'form':
+                return api.eloqua_create_form(name, asset_json, check_exist=False)[0]
+
+            return api.eloqua_create_filter(name, asset_json, check_exist=False)[0]
+
+        # Creates assets concurrently, map keeps results in order of jobs
+        with ThreadPoolExecutor(max_workers=ADMIN_WORKERS) as executor:
+            asset_ids = list(executor.map(asset_creator, jobs))
 
-            # Change back to json for API call
-            filter_unsub_json = json.loads(filter_unsub_string)
-
-            # Creates form with given data
-            filter_id = api.eloqua_create_filter(
-                filter_unsub_name, filter_unsub_json)[0]
-
-            # Save to outcome json file
-            assets_created[email_group[0]].append(
-                [filter_unsub_name, filter_id])
+        # Save to outcome json file
+        for (group, (name, _, _)), asset_id in zip(jobs, asset_ids):
+            assets_created[group].append([name, asset_id])
 
     def program_builder(assets_created):
         '''
@@ -221,16 +215,14 @@ def email_groups():
             f'\n{Fore.WHITE}[{Fore.YELLOW}CREATING{Fore.WHITE}] Program Canvas:')
 
         # Gets program canvas json
-        with open(file('program-canvas'), 'r', encoding='utf-8') as f:
-            program_canvas = f.read()
+        program_canvas = template.text_getter(file('program-canvas'))
         country = list(assets_created.keys())[0].split('_')
         country = country[0]
         program_name = f'WKCORP_GDPR-Subscription-{country}_PROG'
         program_canvas = program_canvas.replace('PROGRAM_NAME', program_name)
 
         # Gets program steps json
-        with open(file('program-steps'), 'r', encoding='utf-8') as f:
-            program_steps = f.read()
+        program_steps = template.text_getter(file('program-steps'))
 
         counter = 1
         for group, assets in assets_created.items():
@@ -239,15 +231,15 @@ def email_groups():
 
             # Check if this is last email group to add
             if counter == len(assets_created.keys()):
-                with open(file('program-last-step'), 'r', encoding='utf-8') as f:
-                    program_steps = f.read()
+                program_steps = template.text_getter(file('program-last-step'))
 
-            filled_program_steps = program_steps\
-                .replace('EMAIL_GROUP', group)\
-                .replace('COUNTER_PLUS', str(counter * 150 + 100))\
-                .replace('COUNTER', str(counter * 150))\
-                .replace('FILTER_SUB_ID', sub_id)\
-                .replace('FILTER_UNSUB_ID', unsub_id)
+            filled_program_steps = template.code_filler(program_steps, {
+                'EMAIL_GROUP': group,
+                'COUNTER_PLUS': str(counter * 150 + 100),
+                'COUNTER': str(counter * 150),
+                'FILTER_SUB_ID': sub_id,
+                'FILTER_UNSUB_ID': unsub_id
+            })
 
             program_canvas = program_canvas.replace(
                 'INSERT_STEPS', filled_program_steps)
@@ -302,8 +294,7 @@ def email_groups():
 
     # Creates forms and shared filters
     assets_created = defaultdict(list)
-    form_builder(countries, groups)
-    sharedfilter_builder(countries, groups)
+    asset_builder(countries, groups)
     program_builder(assets_created)
 
     with open(file('outcome-json', name='GDPR-Email-Group-Assets'), 'w', encoding='utf-8') as f:
@@ -328,9 +319,222 @@ def email_groups():
 '''
 
 
+def assets_getter(query, asset_type):
+    '''
+    Returns all assets of given type matching query with minimal depth [list]
+    '''
+    page = 1
+    count = 500
+    assets = []
+    while True:
+        assets_partial = api.eloqua_get_assets(
+            query, asset_type, count=count, page=page, depth='minimal')
+        assets.extend(assets_partial['elements'])
+
+        # Stops iteration when full list is obtained
+        if assets_partial['total'] - page * count <= 0:
+            break
+        page += 1
+
+        # Every ten batches draws hyphen for better readability
+        if page % 10 == 0:
+            print(f'{Fore.YELLOW}-', end='', flush=True)
+
+    return assets
+
+
+def dependency_graph_getter():
+    '''
+    Returns stored dependency graph of source country or empty one
+    Nodes are (Eloqua type, id) tuples of assets and Eloqua lists assets
+    using the asset as its dependencies
+    '''
+    try:
+        with open(file('dependency-graph'), 'rb') as f:
+            graph = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        graph = {}
+    if graph.get('country') != source_country:
+        graph = {
+            'country': source_country,
+            'assets': {},  # {crawled node: (updatedAt, tuple of dependency nodes)}
+            'names': {},  # {node: name} of crawled assets and their dependencies
+            'listed_by': {}  # {dependency node: set of crawled nodes listing it}
+        }
+
+    return graph
+
+
+def dependency_graph_add(graph, node, name, updated_at, dependencies):
+    '''
+    Replaces dependencies of crawled asset in dependency graph
+    '''
+    if node in graph['assets']:
+        for dependency in graph['assets'][node][1]:
+            listed_by = graph['listed_by'].get(dependency)
+            if listed_by is None:
+                continue
+            listed_by.discard(node)
+            if not listed_by:
+                del graph['listed_by'][dependency]
+    dependency_nodes = []
+    for dependency in dependencies:
+        dependency_node = (dependency.get('type', ''), str(dependency.get('id', '')))
+        graph['names'][dependency_node] = dependency.get('name', '')
+        graph['listed_by'].setdefault(dependency_node, set()).add(node)
+        dependency_nodes.append(dependency_node)
+    graph['names'][node] = name
+    graph['assets'][node] = (updated_at, tuple(dependency_nodes))
+
+    return
+
+
+def dependency_graph_saver(graph):
+    '''
+    Saves dependency graph replacing stored one only after it is fully written
+    '''
+    temporary_path = file('dependency-graph') + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        pickle.dump(graph, f)
+    os.replace(temporary_path, file('dependency-graph'))
+
+    return
+
+
+def dependency_crawler(asset_type, query, outcome):
+    '''
+    Requires asset type, Eloqua search query and opened NDJSON outcome file
+    Gets dependencies concurrently only for assets changed since last crawl
+    Writes one line per asset as soon as its dependencies are known
+    Returns updated dependency graph
+    '''
+    graph = dependency_graph_getter()
+
+    def dependency_getter(asset):
+        '''
+        Returns list of Eloqua dependencies of the asset
+        '''
+        dependencies = api.eloqua_get_dependencies(asset['id'], asset_type)
+        if isinstance(dependencies, dict):
+            dependencies = dependencies.get('elements', [])
+
+        return dependencies
+
+    def line_writer(node, asset):
+        '''
+        Writes asset with its dependencies from graph to outcome file
+        '''
+        outcome.write(json.dumps({
+            'id': asset.get('id'),
+            'name': asset.get('name'),
+            'type': node[0],
+            'createdAt': helper.epoch_to_date(asset.get('createdAt')),
+            'updatedAt': helper.epoch_to_date(asset.get('updatedAt')),
+            'dependencies': [{'type': dependency[0], 'id': dependency[1], 'name': graph['names'].get(dependency, '')}
+                             for dependency in graph['assets'][node][1]]
+        }, ensure_ascii=False) + '\n')
+        outcome.flush()
+
+    print(f'\n{Fore.YELLOW}» Listing {asset_type} assets ', end='')
+    assets = assets_getter(query, asset_type)
+    changed = []
+    for asset in assets:
+        node = (asset.get('type', ''), str(asset.get('id')))
+        if graph['assets'].get(node, (None,))[0] == asset.get('updatedAt'):
+            line_writer(node, asset)
+        else:
+            changed.append((node, asset))
+    print(f'\n{Fore.WHITE}» {len(assets) - len(changed)} unchanged assets taken from dependency graph,',
+          f'crawling {Fore.YELLOW}{len(changed)}{Fore.WHITE} new or changed ', end='')
+
+    # Saves graph periodically and on any interruption, so crawled assets are not fetched again
+    failed = 0
+    with ThreadPoolExecutor(max_workers=ADMIN_WORKERS) as executor:
+        dependency_calls = {executor.submit(dependency_getter, asset): (node, asset) for node, asset in changed}
+        try:
+            for crawled, dependency_call in enumerate(as_completed(dependency_calls), 1):
+                node, asset = dependency_calls[dependency_call]
+                try:
+                    dependencies = dependency_call.result()
+                except Exception:
+                    failed += 1  # Not added to graph, so it is crawled again next time
+                    continue
+                dependency_graph_add(graph, node, asset.get('name', ''),
+                                     asset.get('updatedAt'), dependencies)
+                line_writer(node, asset)
+                if crawled % 50 == 0:
+                    print(f'{Fore.GREEN}|', end='', flush=True)
+                if crawled % DEPENDENCY_CHECKPOINT == 0:
+                    dependency_graph_saver(graph)
+        finally:
+            for dependency_call in dependency_calls:
+                dependency_call.cancel()
+            dependency_graph_saver(graph)
+    if failed:
+        print(f'\n{ERROR}Could not get dependencies of {failed} assets, they will be crawled on next run')
+
+    return graph
+
+
+def dependency_query(graph):
+    '''
+    Answers "what uses X" and "what does X use" queries from dependency graph
+    '''
+    queries = {
+        '1': ('Used by', 'Assets Eloqua lists as dependencies of asset'),
+        '2': ('Uses', 'Crawled assets listing asset as their dependency')
+    }
+    while True:
+        print(f'\n{Fore.GREEN}Dependency queries:')
+        for choice, (query_name, query_description) in queries.items():
+            print(f'{Fore.WHITE}[{Fore.YELLOW}{choice}{Fore.WHITE}]\t» '
+                  f'[{Fore.YELLOW}{query_name}{Fore.WHITE}] {query_description}')
+        print(f'{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t» [{Fore.YELLOW}Quit{Fore.WHITE}]')
+        print(f'{Fore.YELLOW}Enter number associated with chosen query:', end='')
+        choice = input(' ')
+        if choice.lower() == 'q':
+            break
+        elif choice not in queries:
+            print(f'{Fore.RED}Entered value does not belong to any query!')
+            continue
+
+        print(f'\n{Fore.WHITE}» Write or copypaste asset {Fore.YELLOW}id or name{Fore.WHITE} and click [Enter]')
+        phrase = input(' ')
+        if not phrase:
+            phrase = pyperclip.paste()
+        if not phrase:
+            print(f'{ERROR}Query can not be blank')
+            continue
+
+        # Finds assets by exact id or part of name
+        start = time.perf_counter()
+        nodes = [node for node, name in graph['names'].items()
+                 if node[1] == phrase or phrase.lower() in name.lower()]
+        results = {}
+        for node in nodes:
+            if choice == '1':
+                related = graph['assets'].get(node, (None, ()))[1]
+            else:
+                related = graph['listed_by'].get(node, set())
+            results[node] = sorted(related)
+        query_time = (time.perf_counter() - start) * 1000
+
+        print(f'\n{Fore.WHITE}» Found {Fore.YELLOW}{len(nodes)}{Fore.WHITE} matching assets in {query_time:.1f}ms')
+        for node, related in list(results.items())[:20]:
+            print(f'{Fore.WHITE}  [{Fore.YELLOW}{node[0]} {node[1]}{Fore.WHITE}] {graph["names"][node]}')
+            for related_node in related:
+                print(f'{Fore.WHITE}      › [{Fore.YELLOW}{related_node[0]} {related_node[1]}{Fore.WHITE}]',
+                      graph['names'].get(related_node, ''))
+        if len(results) > 20:
+            print(f'{Fore.WHITE}  ... and {len(results) - 20} more')
+
+    return
+
+
 def asset_dependency():
     '''
-    Gets data on dependecies for chosen assets in JSON format
+    Gets data on dependecies for chosen assets in NDJSON format
+    Keeps dependency graph for local queries
     '''
 
     def asset_type_chooser():
@@ -373,6 +577,8 @@ def asset_dependency():
 
     # Get asset for dependency checker
     chosen_asset = asset_type_chooser()
+    if not chosen_asset:
+        return
 
     # Get query string from the user
     print(f'\n{Fore.YELLOW}»{Fore.WHITE} Write or copypaste search {Fore.YELLOW}query string',
@@ -383,51 +589,21 @@ def asset_dependency():
         if not search_query:
             search_query = '*'
 
-    # Get json of all assets based on query
-    page = 1
-    count = 500
-    assets = []
-    while True:
-        # Gets full data on first part of assets
-        assets_partial = api.eloqua_get_assets(
-            search_query, chosen_asset, count=count, page=page, depth='minimal')
-
-        # Add existing to a list
-        for single_asset in assets_partial['elements']:
-            assets.append(single_asset)
-
-        # Stops iteration when full list is obtained
-        if assets_partial['total'] - page * count < 0:
-            break
-
-        # Else increments page to get next part of outcomes
-        page += 1
-
-        # Every ten batches draws hyphen for better readability
-        if page % 10 == 0:
-            print(f'{Fore.YELLOW}-', end='', flush=True)
-
-    # Get json of dependencies and create oytput dict
-    dependency_output = {}
-    for asset in assets:
-        dependecies_json = api.eloqua_get_dependencies(
-            asset.get('id'), chosen_asset)
-        dependency_output[asset['name']] = {
-            'id': asset.get('id'),
-            'createdAt': helper.epoch_to_date(asset.get('createdAt')),
-            'updatedAt': helper.epoch_to_date(asset.get('updatedAt')),
-            'dependencies': dependecies_json
-        }
-
     # Change asteriks in search query to ^ to mitigate Windows limitations
-    search_query = search_query.replace('*', '^')
+    file_query = search_query.replace('*', '^')
 
-    # Save outcome dict to file
-    with open(file('outcome-json', name=f'Dependencies-{chosen_asset}-{search_query}'), 'w', encoding='utf-8') as f:
-        json.dump(dependency_output, f)
+    # Streams assets with dependencies to file while crawling
+    start = time.perf_counter()
+    with open(file('outcome-ndjson', name=f'Dependencies-{chosen_asset}-{file_query}'), 'w', encoding='utf-8') as f:
+        graph = dependency_crawler(chosen_asset, search_query, f)
     print(f'\n{Fore.WHITE}[{Fore.GREEN}FINISHED{Fore.WHITE}] Dependencies for',
-          f'{Fore.YELLOW}{chosen_asset} {Fore.WHITE}[{Fore.YELLOW}{search_query}',
-          f'{Fore.WHITE}] saved to Outcomes folder')
+          f'{Fore.YELLOW}{chosen_asset} {Fore.WHITE}[{Fore.YELLOW}{file_query}',
+          f'{Fore.WHITE}] saved to Outcomes folder in {time.perf_counter() - start:.1f}s')
+
+    # Answers queries about dependencies from local graph
+    print(f'\n{Fore.YELLOW}» {Fore.WHITE}Do you want to query dependency graph? {Fore.WHITE}({YES}/{NO}):', end=' ')
+    if input(' ').lower() == 'y':
+        dependency_query(graph)
 
     # Asks user if he would like to repeat
     print(f'\n{Fore.YELLOW}» {Fore.WHITE}Do you want to create another batch? {Fore.WHITE}({YES}/{NO}):', end=' ')
@@ -443,15 +619,26 @@ def asset_dependency():
 '''
 
 
-def form_data():
+# Subscription related form processing steps
+SUBSCRIPTION_STEPS = ('FormStepGroupSubscription', 'FormStepGlobalUnsubscribe', 'FormStepGlobalSubscribe')
+
+
+def form_fields_getter(form):
     '''
-    Gets data on form processing steps related to GCR via API
+    Returns {field id: selected field data} of all fields of the form, including grouped ones
     '''
-
-    def append_form_fields(field):
-        '''
-        Takes selected field data and append it to form_fields dict of dicts
-        '''
+    form_fields = {}
+    fields = []
+    for field in form.get('elements', []):
+        if field['type'] in ['FormFieldGroup', 'ProgressiveProfile']:
+            if field.get('fields'):
+                fields.extend(field['fields'])
+            elif field.get('stages'):
+                for stage in field['stages']:
+                    fields.extend(stage['fields'])
+        else:
+            fields.append(field)
+    for field in fields:
         form_fields[field['id']] = {
             'id': field.get('id'),
             'name': field.get('name'),
@@ -465,7 +652,101 @@ def form_data():
             'displayType': field.get('displayType')
         }
 
-        return
+    return form_fields
+
+
+def processing_resolver(element, form_fields, datamodel_data, emailgroups_data):
+    '''
+    Returns copy of processing step data with resolved ids:
+    - fieldId of contact field (id over 100000) as [id, contact field name]
+    - fieldId of form field as selected form field data
+    - emailGroup id as [id, e-mail group name]
+    '''
+    if isinstance(element, list):
+        return [processing_resolver(value, form_fields, datamodel_data, emailgroups_data)
+                for value in element]
+    if not isinstance(element, dict):
+        return element
+
+    resolved = {}
+    for key, value in element.items():
+        if key == 'fieldId' and isinstance(value, str) and value.isdigit():
+            if int(value) > 100000:
+                value = [value, datamodel_data.get(value)]
+            elif value in form_fields:
+                value = form_fields[value]
+        elif key == 'emailGroup' and isinstance(value, str) and value in emailgroups_data:
+            value = [int(value), emailgroups_data[value]]
+        resolved[key] = processing_resolver(value, form_fields, datamodel_data, emailgroups_data)
+
+    return resolved
+
+
+def form_analyzer(form, datamodel_data, emailgroups_data):
+    '''
+    Requires form of complete depth, {field id: name} of contact fields
+    and {group id: name} of e-mail groups
+    Returns data on subscription processing steps and shared update rules of the form
+    '''
+    form_fields = form_fields_getter(form)
+    form_processing_steps = []
+    source_country_trigger = []
+    contact_update_trigger = False
+    for processing_step in form.get('processingSteps', []):
+        # Catch shared update rule processing steps
+        if processing_step['type'] == 'FormStepCreateUpdateContact':
+            rule_set = processing_step.get('sharedContactUpdateRuleSet')
+            if rule_set:
+                if rule_set.get('id') in naming['sourceCountrySharedUpdate']:
+                    source_country_trigger.append(rule_set.get('name'))
+                if rule_set.get('id') in naming['contactDataSharedUpdate']:
+                    contact_update_trigger = True
+
+        # Catch subscription based processing steps
+        elif processing_step['type'] in SUBSCRIPTION_STEPS:
+            step_email_group = processing_step.get('emailGroupId', {}).get('constantValue')
+            step_subscription = processing_step.get('isSubscribing', {}).get('formFieldId')
+            form_processing_steps.append(processing_resolver({
+                'type': processing_step.get('type'),
+                'description': processing_step.get('description'),
+                'execute': processing_step.get('execute'),
+                'condition': processing_step.get('condition'),
+                'emailGroup': [step_email_group, emailgroups_data[step_email_group]]
+                if step_email_group in emailgroups_data else '',
+                'isSubscribing': form_fields.get(step_subscription, '')
+            }, form_fields, datamodel_data, emailgroups_data))
+
+    return {
+        'id': form.get('id'),
+        'name': form.get('name'),
+        'creationDate': helper.epoch_to_date(form.get('createdAt')),
+        'htmlName': form.get('htmlName'),
+        'formProcessingSteps': form_processing_steps,
+        'sharedSourceCountryUpdate': source_country_trigger or False,
+        'sharedContactUpdateTrigger': contact_update_trigger
+    }
+
+
+def forms_getter(query, executor, count=50):
+    '''
+    Requires Eloqua search query and executor for concurrent page calls
+    Yields forms of complete depth in order of pages
+    '''
+    first_page = api.eloqua_get_assets(query, 'form', count=count, page=1)
+    yield from first_page.get('elements', [])
+
+    # Gets all other pages concurrently
+    pages = -(-int(first_page.get('total', 0)) // count)
+    for forms_page in executor.map(
+            lambda page: api.eloqua_get_assets(query, 'form', count=count, page=page), range(2, pages + 1)):
+        yield from forms_page.get('elements', [])
+        print(f'{Fore.GREEN}|', end='', flush=True)
+
+
+def form_data():
+    '''
+    Gets data on form processing steps related to GCR via API
+    '''
 
     # Get query string from the user
     print(f'\n{Fore.YELLOW}»{Fore.WHITE} Write or copypaste search {Fore.YELLOW}query string',
@@ -483,168 +764,24 @@ def form_data():
     # Get e-mail groups via API
     emailgroups_data = api.eloqua_get_emailgroups()
 
-    # Get json of all froms based on query
-    page = 1
-    count = 50
-    forms = []
-    while True:
-        # Gets full data on first part of assets
-        assets_partial = api.eloqua_get_assets(
-            search_query, 'form', count=count, page=page)
-
-        # Add existing to a list
-        for single_asset in assets_partial['elements']:
-            forms.append(single_asset)
-
-        # Stops iteration when full list is obtained
-        if assets_partial['total'] - page * count < 0:
-            break
-
-        # Else increments page to get next part of outcomes
-        page += 1
-
-        # Every ten batches draws hyphen for better readability
-        if page % 10 == 0:
-            print(f'{Fore.YELLOW}-', end='', flush=True)
-
-    # Create dict with selected data from the forms
-    forms_dict = {}  # Dict with structure {formID:formData}
-    source_country_trigger_list = naming['sourceCountrySharedUpdate']
-    contact_update_trigger_list = naming['contactDataSharedUpdate']
-    for form in forms:
-        form_id = form.get('id')
-        form_name = form.get('name')
-        form_html_name = form.get('htmlName')
-        form_creation_date = helper.epoch_to_date(form.get('createdAt'))
-        form_fields = {}
-        for field in form['elements']:
-            if field['type'] in ['FormFieldGroup', 'ProgressiveProfile']:
-                if field.get('fields'):
-                    for subfield in field['fields']:
-                        append_form_fields(subfield)
-                elif field.get('stages'):
-                    for stage in field['stages']:
-                        for subfield in stage['fields']:
-                            append_form_fields(subfield)
-            else:
-                append_form_fields(field)
-        form_processing_steps = []
-        source_country_trigger = []
-        contact_update_trigger = []
-        for processing_step in form['processingSteps']:
-            # Catch shared update rule processing steps
-            if processing_step['type'] == 'FormStepCreateUpdateContact':
-                try:
-                    if processing_step['sharedContactUpdateRuleSet']['id'] in source_country_trigger_list:
-                        source_country_trigger.append(
-                            processing_step['sharedContactUpdateRuleSet']['name'])
-
-                except KeyError:
-                    source_country_trigger.append(False)
-                try:
-                    if processing_step['sharedContactUpdateRuleSet']['id'] in contact_update_trigger_list:
-                        contact_update_trigger.append(True)
-                except KeyError:
-                    contact_update_trigger.append(False)
-            # Catch subscription based processing steps
-            if processing_step['type'] in [
-                    'FormStepGroupSubscription',
-                    'FormStepGlobalUnsubscribe',
-                    'FormStepGlobalSubscribe'
-            ]:
-                step_type = processing_step.get('type')
-                step_description = processing_step.get('description')
-                step_execute = processing_step.get('execute')
-                try:
-                    step_condition = processing_step.get('condition')
-                except KeyError:
-                    step_condition = ''
-                try:
-                    step_email_group = processing_step['emailGroupId']['constantValue']
-                    step_email_group = [step_email_group,
-                                        emailgroups_data[step_email_group]]
-                except KeyError:
-                    step_email_group = ''
-                try:
-                    step_subscription = form_fields[
-                        processing_step['isSubscribing']['formFieldId']
-                    ]
-                except KeyError:
-                    step_subscription = ''
-
-                form_processing_dict = {
-                    'type': step_type,
-                    'description': step_description,
-                    'execute': step_execute,
-                    'condition': step_condition,
-                    'emailGroup': step_email_group,
-                    'isSubscribing': step_subscription
-                }
-
-                # Appends form fields to conditional form processing steps
-                form_processing_string = json.dumps(form_processing_dict)
-                if '"fieldId"' in form_processing_string:
-                    field_ids = re.findall(r'("fieldId": "(\d+)")',
-                                           form_processing_string)
-                    for field in field_ids:
-                        if int(field[1]) > 100000:
-                            form_processing_string = form_processing_string\
-                                .replace(
-                                    field[0],
-                                    f'"fieldId": ["{field[1]}", "{datamodel_data[field[1]]}"]'
-                                )
-                        else:
-                            form_processing_string = form_processing_string\
-                                .replace(
-                                    field[0],
-                                    f'"fieldId": {form_fields[field[1]]}'
-                                )
-
-                    form_processing_json = form_processing_string\
-                        .replace("'", "\"").replace("d\"information", "d'information").replace(': None', ': null')
-                    form_processing_dict = json.loads(form_processing_json)
-
-                form_processing_steps.append(form_processing_dict)
-            else:
-                continue
-
-        # Simplifies output for end user
-        source_country_trigger = [e for e in source_country_trigger if e]
-        if not source_country_trigger:
-            source_country_trigger = False
-        contact_update_trigger = True if contact_update_trigger else False
-
-        # Appends obtained data to main dict
-        forms_dict[form_id] = {
-            'id': form_id,
-            'name': form_name,
-            'creationDate': form_creation_date,
-            'htmlName': form_html_name,
-            'formProcessingSteps': form_processing_steps,
-            'sharedSourceCountryUpdate': source_country_trigger,
-            'sharedContactUpdateTrigger': contact_update_trigger
-        }
-
-    forms_string = json.dumps(forms_dict)
-    email_groups_regex = re.findall(r'("emailGroup": "(\d+)")', forms_string)
-    for group in email_groups_regex:
-        if group[1] in emailgroups_data.keys():
-            forms_string = forms_string\
-                .replace(
-                    group[0],
-                    f'"emailGroup": [{group[1]}, "{emailgroups_data[group[1]]}"]'
-                )
-
-    forms_dict = json.loads(forms_string)
-
     # Change asteriks in search query to ^ to mitigate Windows limitations
-    search_query = search_query.replace('*', '^')
-
-    # Save full dict to Outcomes folder
-    with open(file('outcome-json', name=f'FormProcessing-{search_query}'), 'w', encoding='utf-8') as f:
-        json.dump(forms_dict, f)
+    file_query = search_query.replace('*', '^')
+
+    # Analyzes forms as their pages arrive and streams results to JSON object in Outcomes folder
+    forms_summary = []  # List of (id, name, sharedSourceCountryUpdate, sharedContactUpdateTrigger)
+    with open(file('outcome-json', name=f'FormProcessing-{file_query}'), 'w', encoding='utf-8') as f:
+        f.write('{')
+        with ThreadPoolExecutor(max_workers=ADMIN_WORKERS) as executor:
+            for form in forms_getter(search_query, executor):
+                form_result = form_analyzer(form, datamodel_data, emailgroups_data)
+                f.write(f'{", " if forms_summary else ""}{json.dumps(form_result["id"])}: {json.dumps(form_result)}')
+                forms_summary.append((
+                    form_result['id'], form_result['name'],
+                    form_result['sharedSourceCountryUpdate'], form_result['sharedContactUpdateTrigger']))
+        f.write('}')
+    search_query = file_query
     print(f'\n{Fore.WHITE}[{Fore.GREEN}FINISHED{Fore.WHITE}] JSON of',
-          f'{Fore.WHITE}{len(forms_dict.keys())} {Fore.YELLOW}{search_query}',
+          f'{Fore.WHITE}{len(forms_summary)} {Fore.YELLOW}{search_query}',
           f'{Fore.WHITE}forms saved to Outcomes folder')
 
     # Create list of completed campaigns
@@ -658,13 +795,11 @@ def form_data():
     # Create list of forms that need a fix
     no_shared_source_country_update = [('ID', 'Name')]
     no_shared_contact_update_trigger = [('ID', 'Name')]
-    for form in forms_dict:
-        if not forms_dict[form]['sharedSourceCountryUpdate']:
-            no_shared_source_country_update.append(
-                (forms_dict[form]['id'], forms_dict[form]['name']))
-        if not forms_dict[form]['sharedContactUpdateTrigger']:
-            no_shared_contact_update_trigger.append(
-                (forms_dict[form]['id'], forms_dict[form]['name']))
+    for form_id, form_name, source_country_trigger, contact_update_trigger in forms_summary:
+        if not source_country_trigger:
+            no_shared_source_country_update.append((form_id, form_name))
+        if not contact_update_trigger:
+            no_shared_contact_update_trigger.append((form_id, form_name))
     print(f'\n{Fore.YELLOW}» {Fore.WHITE}Found:')
     print(f'{Fore.WHITE} › {Fore.YELLOW}{len(no_shared_source_country_update) - 1}'
           f'{Fore.WHITE} forms without {Fore.YELLOW}shared Source Country Update Rule', end=' ')
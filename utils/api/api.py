@@ -19,11 +19,15 @@ import time
 import base64
 import pickle
 import getpass
+import threading
 import webbrowser
 import pyperclip
 import requests
 from colorama import Fore, Style, init
 
+# ELQuent imports
+import utils.config as config
+
 # Globals
 naming = None
 eloqua_key = None
@@ -33,6 +37,17 @@ shared_list = None
 asset_names = None
 source_country = None
 
+# Serializes user prompts of assets created concurrently
+console_lock = threading.RLock()
+
+# Settings of similar past e-mails {(country, search phrase): (fetch time, [settings])}
+mail_defaults_cache = {}
+mail_defaults_locks = {}
+mail_defaults_lock = threading.Lock()
+MAIL_DEFAULTS_TTL = 15 * 60  # Seconds after which settings are fetched again
+MAIL_DEFAULTS_FIELDS = ('senderEmail', 'senderName', 'replyToEmail', 'folderId',
+                        'emailFooterId', 'emailHeaderId', 'emailGroupId')
+
 # Initialize colorama
 init(autoreset=True)
 
@@ -69,8 +84,8 @@ def file(file_path):
     file_paths = {
         'click': find_data_file('click.p'),
         'eloqua': find_data_file('eloqua.p'),
+        'key': find_data_file('key.p'),
         'country': find_data_file('country.p'),
-        'naming': find_data_file('naming.json'),
         'image': find_data_file('image.jpg')
     }
 
@@ -223,20 +238,21 @@ def eloqua_asset_exist(name, asset):
 
     if elq_asset['total']:
         asset_id = elq_asset['elements'][0]['id']
-        print(
-            f'\n  {WARNING}{asset} "{name}" already exists! [ID: {asset_id}]')
-        while True:
+        with console_lock:
             print(
-                f'  {Fore.WHITE}» Click [Enter] to continue with current name or [Q] to quit', end='')
-            choice = input(' ')
-            if not choice:
-                return asset_id
-            elif choice.lower() == 'q':
-                print(f'\n{Fore.GREEN}Ahoj!')
-                raise SystemExit
-            else:
+                f'\n  {WARNING}{asset} "{name}" already exists! [ID: {asset_id}]')
+            while True:
                 print(
-                    f'\n{ERROR}Entered value is not a valid choice!')
+                    f'  {Fore.WHITE}» Click [Enter] to continue with current name or [Q] to quit', end='')
+                choice = input(' ')
+                if not choice:
+                    return asset_id
+                elif choice.lower() == 'q':
+                    print(f'\n{Fore.GREEN}Ahoj!')
+                    raise SystemExit
+                else:
+                    print(
+                        f'\n{ERROR}Entered value is not a valid choice!')
     else:
         return False
 
@@ -248,9 +264,10 @@ def eloqua_asset_html_name(name):
     html_name = ''
     date_element = re.compile(r'\d\d', re.UNICODE)
     local_name = name.split('_')[-2]  # Gets local name from asset name
+    psp = config.country_lookups(source_country)['psp']
     for part in local_name.split('-'):
         # Skip if part belongs to PSP
-        if part.startswith(tuple(naming[source_country]['psp'])):
+        if part.startswith(psp):
             continue
         # Skip if part is a date
         elif date_element.search(part):
@@ -267,6 +284,7 @@ def eloqua_asset_name():
     '''
     Returns correct name for the asset
     '''
+    lookups = config.country_lookups(source_country)
     while True:
         name = input(' ')
         if not name:
@@ -281,10 +299,10 @@ def eloqua_asset_name():
         elif name_check[0][:2] != 'WK':
             print(
                 f'{ERROR}"{name_check[0]}" is not existing country code')
-        elif name_check[1] not in naming[source_country]['segment']:
+        elif name_check[1] not in lookups['segments']:
             print(
                 f'{ERROR}"{name_check[1]}" is not existing segment name')
-        elif name_check[2] not in naming['campaign']:
+        elif name_check[2] not in lookups['campaign_types']:
             print(
                 f'{ERROR}"{name_check[2]}" is not existing campaign type')
         else:
@@ -296,6 +314,7 @@ def eloqua_asset_get(asset_id, asset_type, depth=''):
     '''
     Requires asset_id, asset_type and optionally depth
     Returns name and optionally code of Eloqua asset of given ID
+    With depth 'complete' or 'minimal' returns response of that depth
     '''
 
     # Gets required endpoint
@@ -303,12 +322,12 @@ def eloqua_asset_get(asset_id, asset_type, depth=''):
 
     # Gets data of requested asset
     root = f'{eloqua_rest}assets/{endpoint}/{asset_id}'
-    params = {'depth': 'complete'}
+    params = {'depth': 'minimal' if depth == 'minimal' else 'complete'}
     response = api_request(root, params=params)
     asset_response = response.json()
 
     # Returns full response
-    if depth == 'complete':
+    if depth in ['complete', 'minimal']:
         return asset_response
 
     # Gets name and code of the asset
@@ -326,6 +345,22 @@ def eloqua_asset_get(asset_id, asset_type, depth=''):
         return name
 
 
+def eloqua_delete_asset(asset_id, asset_type):
+    '''
+    Requires asset_id and asset_type to delete that asset from Eloqua
+    Returns True if asset was deleted [bool]
+    '''
+
+    # Gets required endpoint
+    endpoint = asset_names.get(asset_type)
+
+    # Deletes requested asset
+    root = f'{eloqua_rest}assets/{endpoint}/{asset_id}'
+    response = api_request(root, call='delete')
+
+    return response.status_code == 200
+
+
 def eloqua_get_assets(query, asset_type, count='', page='1', depth='complete'):
     '''
     Requires query string, asset_type and optionally count, pagination, depth
@@ -391,9 +426,11 @@ def eloqua_get_dependencies(asset_id, asset_type, depth='minimal'):
 '''
 
 
-def get_eloqua_auth(country):
+def get_eloqua_auth(country, cached=False):
     '''
     Returns Eloqua Root URL and creates globals with auth and bulk/rest roots
+    If cached is True, uses stored key instead of asking for password
+    and returns False when there is no valid stored key
     '''
 
     # Creates global source_country from main module
@@ -417,9 +454,8 @@ def get_eloqua_auth(country):
     }
 
     # Gets data from naming.json
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    global naming
+    naming = config.naming_getter()
 
     def get_eloqua_root():
         '''
@@ -431,7 +467,21 @@ def get_eloqua_auth(country):
 
         return login_data
 
+    global eloqua_key
     while True:
+        # Uses key from environment or key.p for runs without user
+        if cached:
+            eloqua_key = os.environ.get('ELQUENT_KEY', '')
+            if not eloqua_key and os.path.isfile(file('key')):
+                eloqua_key = pickle.load(open(file('key'), 'rb'))
+            if not eloqua_key:
+                return False
+            try:
+                eloqua_root = get_eloqua_root()['urls']['base']
+            except (TypeError, KeyError, ValueError):
+                return False
+            break
+
         # Gets Eloqua user details if they are already stored
         print()
         if not os.path.isfile(file('eloqua')):
@@ -446,7 +496,6 @@ def get_eloqua_auth(country):
         eloqua_password = getpass.getpass(' ')
 
         # Converts domain, user and  to Eloqua Auth Key
-        global eloqua_key
         eloqua_key = bytes(eloqua_domain + '\\' +
                            eloqua_user + ':' +
                            eloqua_password, 'utf-8')
@@ -876,12 +925,13 @@ def eloqua_create_landingpage(name, code):
                 and landing_page[0]['property'] == 'relativePath'\
                 and landing_page[0]['requirement']['type'] == 'UniquenessRequirement':
 
-            print(
-                f'\n  {ERROR}URL ending "/{html_name}" already exists!',
-                f'\n  {Fore.WHITE}» Enter new URL ending:', end='')
-            html_name = input(' ')
-            if not html_name:
-                html_name = pyperclip.paste()
+            with console_lock:
+                print(
+                    f'\n  {ERROR}URL ending "/{html_name}" already exists!',
+                    f'\n  {Fore.WHITE}» Enter new URL ending for {name}:', end='')
+                html_name = input(' ')
+                if not html_name:
+                    html_name = pyperclip.paste()
             continue
         elif isinstance(landing_page, list):  # Other errors
             print(f'{Fore.YELLOW}{landing_page}')
@@ -927,13 +977,15 @@ def eloqua_put_landingpage(lp_id, data):
 '''
 
 
-def eloqua_create_filter(name, data):
+def eloqua_create_filter(name, data, check_exist=True):
     '''
     Requires name and json data of the shared filter to create it in Eloqua
+    Skips search for existing filter with that name if check_exist is False
     Returns Filter ID and response of created filter
     '''
     # Checks if there already is Form with that name
-    eloqua_asset_exist(name, asset='sharedFilter')
+    if check_exist:
+        eloqua_asset_exist(name, asset='sharedFilter')
 
     # Creating a post call to Eloqua API
     root = f'{eloqua_rest}assets/contact/filter'
@@ -983,13 +1035,15 @@ def eloqua_get_form_data(form_id):
     return (all_fills, fills['total'])
 
 
-def eloqua_create_form(name, data):
+def eloqua_create_form(name, data, check_exist=True):
     '''
     Requires name and json data of the form to create it in Eloqua
+    Skips search for existing form with that name if check_exist is False
     Returns Form ID and response of created form
     '''
     # Checks if there already is Form with that name
-    eloqua_asset_exist(name, asset='form')
+    if check_exist:
+        eloqua_asset_exist(name, asset='form')
 
     # Creating a post call to Eloqua API
     root = f'{eloqua_rest}assets/form'
@@ -1054,6 +1108,35 @@ def eloqua_update_form(form_id, css='', html='', processing='', open_form=False)
 '''
 
 
+def eloqua_mail_defaults(phrase):
+    '''
+    Requires search phrase (naming prefix) of e-mail name
+    Returns settings of last six e-mails matching the phrase [list of dicts]
+    Gets them via partial depth without e-mail code and caches them for MAIL_DEFAULTS_TTL
+    '''
+    key = (source_country, phrase)
+    with mail_defaults_lock:
+        phrase_lock = mail_defaults_locks.setdefault(key, threading.Lock())
+
+    # Lets only one thread fetch settings for the phrase, others wait for its outcome
+    with phrase_lock:
+        cached = mail_defaults_cache.get(key)
+        if cached and time.monotonic() - cached[0] < MAIL_DEFAULTS_TTL:
+            return cached[1]
+
+        root = f'{eloqua_rest}assets/emails'
+        params = {'depth': 'partial',
+                  'search': f'{phrase}*',
+                  'orderBy': 'id DESC',
+                  'count': '6'}
+        response = api_request(root, params=params)
+        settings = [{field: mail[field] for field in MAIL_DEFAULTS_FIELDS if field in mail}
+                    for mail in response.json().get('elements', [])]
+        mail_defaults_cache[key] = (time.monotonic(), settings)
+
+    return settings
+
+
 def eloqua_fill_mail_params(name):
     '''
     Returns eloqua_create_email data based on settings of similar mails from the past
@@ -1099,21 +1182,6 @@ def eloqua_fill_mail_params(name):
         if len(gatherer[0]) == 1:
             data[gatherer[1]] = gatherer[0][0]
 
-    def eloqua_search_emails(phrase):
-        '''
-        Returns information about e-mails with phrase
-        '''
-        # Gets data of requested e-mail
-        root = f'{eloqua_rest}assets/emails'
-        params = {'depth': 'complete',
-                  'search': f'{phrase}*',
-                  'orderBy': 'id DESC',
-                  'count': '6'}
-        response = api_request(root, params=params)
-        email = response.json()
-
-        return email
-
     '''
     =================================================== Prepares necessary data structures
     '''
@@ -1184,10 +1252,10 @@ def eloqua_fill_mail_params(name):
     search_phrase = '_'.join(search_name)
 
     for search_query in [search_full_phrase, search_phrase]:
-        previous_mails = eloqua_search_emails(search_query)
+        previous_mails = eloqua_mail_defaults(search_query)
 
         # Fills gatherers with data
-        for mail in previous_mails['elements']:
+        for mail in previous_mails:
             for gatherer in gatherers:
                 try:
                     gatherer[0].append(mail[gatherer[1]])
@@ -1227,9 +1295,10 @@ def eloqua_fill_mail_params(name):
                     and data['emailGroupId']:
                 # If gathering data from broader search, gets confirmation on chosen e-mail sender
                 if search_query == search_phrase:
-                    print(f'\n{Fore.WHITE}» Continue with {Fore.YELLOW}{data["senderEmail"]}',
-                          f'{Fore.WHITE}as sender e-mail? ({YES}/{NO}):', end=' ')
-                    sender_acceptance = input('')
+                    with console_lock:
+                        print(f'\n{Fore.WHITE}» Continue with {Fore.YELLOW}{data["senderEmail"]}',
+                              f'{Fore.WHITE}as sender e-mail? ({YES}/{NO}):', end=' ')
+                        sender_acceptance = input('')
                     if sender_acceptance.lower() == 'n':
                         data['senderEmail'] = ''
                         data['replyToEmail'] = ''
@@ -1246,89 +1315,93 @@ def eloqua_fill_mail_params(name):
     =================================================== Step 3: Fill from user input
     '''
 
-    # Fill sender/reply e-mail address based on user choice
-    if not data.get('senderEmail', False):
-        sender_mail = naming[source_country]['mail']['senders']
-        print(f'\n{Fore.GREEN}Choose sender and reply e-mail address:')
-        for i, sender in enumerate(sender_mail):
-            print(
-                f'{Fore.WHITE}[{Fore.YELLOW}{i}{Fore.WHITE}]\t» {sender}')
-        print(
-            f'{Fore.WHITE}[{Fore.YELLOW}S{Fore.WHITE}]\t» Skip choosing sender e-mail')
-        while True:
-            print(
-                f'{Fore.YELLOW}Enter number associated with e-mail address or write it down:', end='')
-            choice = input(' ')
-            valid_mail = re.compile(
-                r'([\w\.\-\+]+?@[\w\.\-\+]+?\.[\w\.\-\+]+?)', re.UNICODE)
-            if valid_mail.findall(choice):
-                data['senderEmail'] = choice
-                data['replyToEmail'] = choice
-                break
-            if choice.lower() == 's':
+    # Lets only one thread at a time ask user for missing data
+    with console_lock:
+        # Fill sender/reply e-mail address based on user choice
+        if not data.get('senderEmail', False):
+            sender_mail = naming[source_country]['mail']['senders']
+            print(f'\n{Fore.GREEN}Choose sender and reply e-mail address:')
+            for i, sender in enumerate(sender_mail):
                 print(
-                    f'\n{WARNING}Remember to fill sender and reply e-mail addresses in Eloqua')
-                break
-            try:
-                choice = int(choice)
-            except (TypeError, ValueError):
-                print(f'{ERROR}Please enter numeric value!')
-                choice = ''
-                continue
-            if 0 <= choice < len(sender_mail):
-                data['senderEmail'] = sender_mail[choice]
-                data['replyToEmail'] = sender_mail[choice]
-                break
-            else:
+                    f'{Fore.WHITE}[{Fore.YELLOW}{i}{Fore.WHITE}]\t» {sender}')
+            print(
+                f'{Fore.WHITE}[{Fore.YELLOW}S{Fore.WHITE}]\t» Skip choosing sender e-mail')
+            while True:
                 print(
-                    f'{ERROR}Entered value does not belong to any e-mail address!')
-                choice = ''
+                    f'{Fore.YELLOW}Enter number associated with e-mail address or write it down:', end='')
+                choice = input(' ')
+                valid_mail = re.compile(
+                    r'([\w\.\-\+]+?@[\w\.\-\+]+?\.[\w\.\-\+]+?)', re.UNICODE)
+                if valid_mail.findall(choice):
+                    data['senderEmail'] = choice
+                    data['replyToEmail'] = choice
+                    break
+                if choice.lower() == 's':
+                    print(
+                        f'\n{WARNING}Remember to fill sender and reply e-mail addresses in Eloqua')
+                    break
+                try:
+                    choice = int(choice)
+                except (TypeError, ValueError):
+                    print(f'{ERROR}Please enter numeric value!')
+                    choice = ''
+                    continue
+                if 0 <= choice < len(sender_mail):
+                    data['senderEmail'] = sender_mail[choice]
+                    data['replyToEmail'] = sender_mail[choice]
+                    break
+                else:
+                    print(
+                        f'{ERROR}Entered value does not belong to any e-mail address!')
+                    choice = ''
 
-    # If there is no chosen e-mail group
-    if not data.get('emailGroupId', False):
-        print(f'\n{Fore.GREEN}Choose e-mail group:')
-        for group in naming[source_country]['mail']['by_group'].items():
-            print(
-                f'{Fore.WHITE}[{Fore.YELLOW}{group[0]}{Fore.WHITE}]\t» {group[1]["group_name"]}')
-        print(
-            f'{Fore.WHITE}[{Fore.YELLOW}S{Fore.WHITE}]\t» Skip choosing e-mail group')
-        while True:
-            print(
-                f'{Fore.YELLOW}Enter number associated with chosen e-mail group:', end='')
-            choice = input(' ')
-            if choice.lower() == 's':
+        # If there is no chosen e-mail group
+        if not data.get('emailGroupId', False):
+            print(f'\n{Fore.GREEN}Choose e-mail group:')
+            for group in naming[source_country]['mail']['by_group'].items():
                 print(
-                    f'\n{WARNING}Remember to fill e-mail group in Eloqua')
-                break
-            try:
-                naming[source_country]['mail']['by_group'][choice]['group_name']
-            except KeyError:
-                print(f'{ERROR}Entered value does not belong to any e-mail group!')
-            else:
-                data['emailGroupId'] = choice
-                break
-
-    # If there is chosen e-mail group, but there is no e-mail footer yet in data
-    if not data.get('emailFooterId', False) and data.get('emailGroupId', False):
-        group_id = data.get('emailGroupId', False)
-        if group_id:
-            try:
-                data['emailFooterId'] = naming[source_country]['mail']['by_group'][group_id]['emailFooterId']
-            except KeyError:
+                    f'{Fore.WHITE}[{Fore.YELLOW}{group[0]}{Fore.WHITE}]\t» {group[1]["group_name"]}')
+            print(
+                f'{Fore.WHITE}[{Fore.YELLOW}S{Fore.WHITE}]\t» Skip choosing e-mail group')
+            while True:
                 print(
-                    f'\n{WARNING}Remember to pick e-mail footer in Eloqua')
+                    f'{Fore.YELLOW}Enter number associated with chosen e-mail group:', end='')
+                choice = input(' ')
+                if choice.lower() == 's':
+                    print(
+                        f'\n{WARNING}Remember to fill e-mail group in Eloqua')
+                    break
+                try:
+                    naming[source_country]['mail']['by_group'][choice]['group_name']
+                except KeyError:
+                    print(f'{ERROR}Entered value does not belong to any e-mail group!')
+                else:
+                    data['emailGroupId'] = choice
+                    break
 
-    print(f'\n{Fore.WHITE}» {SUCCESS}E-mail data ready for upload:')
-    for value in data.items():
-        print(
-            f'   {Fore.YELLOW}› {Fore.GREEN}{value[0]}{Fore.WHITE} {value[1]}')
+        # If there is chosen e-mail group, but there is no e-mail footer yet in data
+        if not data.get('emailFooterId', False) and data.get('emailGroupId', False):
+            group_id = data.get('emailGroupId', False)
+            if group_id:
+                try:
+                    data['emailFooterId'] = naming[source_country]['mail']['by_group'][group_id]['emailFooterId']
+                except KeyError:
+                    print(
+                        f'\n{WARNING}Remember to pick e-mail footer in Eloqua')
+
+        print(f'\n{Fore.WHITE}» {SUCCESS}E-mail data ready for upload:')
+        for value in data.items():
+            print(
+                f'   {Fore.YELLOW}› {Fore.GREEN}{value[0]}{Fore.WHITE} {value[1]}')
 
     return data
 
 
-def eloqua_create_email(name, code):
+def eloqua_create_email(name, code, subject=None, open_email=True, data=None):
     '''
     Requires name and code of the email to create it in Eloqua
+    Optionally subject (asked from user if None, skipped if empty), open_email flag
+    and data of eloqua_fill_mail_params already resolved for similar e-mail
     Returns E-mail ID
     '''
 
@@ -1340,7 +1413,10 @@ def eloqua_create_email(name, code):
     code = code.replace('<br>', '<br/>')
 
     # Gets required data for the API call
-    data = eloqua_fill_mail_params(name)
+    if data is None:
+        data = eloqua_fill_mail_params(name)
+    else:
+        data = dict(data, name=name)
     data['isTracked'] = 'true'
     data['htmlContent'] = {
         'type': 'RawHtmlContent',
@@ -1348,21 +1424,22 @@ def eloqua_create_email(name, code):
     }
 
     # Gets subject line for the e-mail
-    while True:
-        print(f'\n{Fore.YELLOW}»{Fore.WHITE} Write or copypaste',
-              f'{Fore.YELLOW}e-mail subject{Fore.WHITE} and click [Enter] or [S]kip')
-        subject = input(' ')
-        if not subject:
-            subject = pyperclip.paste()
+    with console_lock:
+        while subject is None:
+            print(f'\n{Fore.YELLOW}»{Fore.WHITE} Write or copypaste',
+                  f'{Fore.YELLOW}e-mail subject{Fore.WHITE} of {name} and click [Enter] or [S]kip')
+            subject = input(' ')
             if not subject:
-                print(f'\n{ERROR}Subject can not be blank')
+                subject = pyperclip.paste()
+                if not subject:
+                    print(f'\n{ERROR}Subject can not be blank')
+                    subject = None
+                    continue
+            elif len(subject) > 100:
+                print(f'\n{ERROR}Subject is over 100 characters long')
+                subject = None
                 continue
-        elif len(subject) > 100:
-            print(f'\n{ERROR}Subject is over 100 characters long')
-            continue
-        else:
-            break
-    if subject.lower() != 's':
+    if subject and subject.lower() != 's':
         data['subject'] = subject
 
     # Creating a post call to Eloqua API
@@ -1376,18 +1453,17 @@ def eloqua_create_email(name, code):
     url = naming['root'] + '#emails&id=' + email_id
     print(
         f'\n{Fore.WHITE}» {SUCCESS}Created Eloqua E-mail ID: {email_id}')
-    webbrowser.open(url, new=2, autoraise=False)
+    if open_email:
+        webbrowser.open(url, new=2, autoraise=False)
 
     return email_id
 
 
-def eloqua_update_email(email_id, code):
+def eloqua_put_email(old_data, code):
     '''
-    Requires id and code of the email to update it in Eloqua
-    Returns E-mail ID
+    Requires complete data of existing email and its new code to update it in Eloqua
+    Returns response of the update [dict] or False if update failed
     '''
-    # Gets current data of e-mail to update
-    old_data = eloqua_asset_get(email_id, asset_type='email', depth='complete')
     code = code.replace('"', '\"').replace('<br>', '<br/>')
 
     data = {
@@ -1410,10 +1486,26 @@ def eloqua_update_email(email_id, code):
             continue
 
     # Creating a post call to Eloqua API and taking care of emoticons encoding
-    root = f'{eloqua_rest}assets/email/{email_id}'
+    root = f'{eloqua_rest}assets/email/{old_data["id"]}'
     response = api_request(
         root, call='put', data=json.dumps(data, ensure_ascii=False).encode('utf-8'))
-    email = response.json()
+    if response.status_code != 200:
+        return False
+
+    return response.json()
+
+
+def eloqua_update_email(email_id, code):
+    '''
+    Requires id and code of the email to update it in Eloqua
+    Returns E-mail ID
+    '''
+    # Gets current data of e-mail to update
+    old_data = eloqua_asset_get(email_id, asset_type='email', depth='complete')
+    email = eloqua_put_email(old_data, code)
+    if not email:
+        print(f'\n{ERROR}Could not update Eloqua E-mail ID: {email_id}')
+        return email_id
 
     # Open in new tab
     email_id = email['id']
@@ -1432,7 +1524,7 @@ def eloqua_update_email(email_id, code):
 '''
 
 
-def eloqua_create_campaign(name, data):
+def eloqua_create_campaign(name, data, open_campaign=True):
     '''
     Requires name and json data of the campaign canvas to create it in Eloqua
     Returns ID and reponse of created campaign canvas
@@ -1450,7 +1542,8 @@ def eloqua_create_campaign(name, data):
     campaign_id = campaign['id']
     url = naming['root'] + '#campaigns&id=' + campaign_id
     print(f'{Fore.WHITE}» {SUCCESS}Created Eloqua Campaign ID: {campaign_id}')
-    webbrowser.open(url, new=2, autoraise=True)
+    if open_campaign:
+        webbrowser.open(url, new=2, autoraise=True)
 
     return (campaign_id, campaign)
 
@@ -1572,24 +1665,29 @@ def eloqua_get_images(image_name):
 
 def eloqua_post_image(image):
     '''
-    Returns url of uploaded image
+    Returns url and id of uploaded image
     '''
 
-    def eloqua_move_image(image_id):
+    def eloqua_move_image(image_info):
         '''
         Moves image to ELQuent image uploads folder
+        Uses image data returned by upload and gets complete data only if that fails
         '''
 
-        # Gets image data to prepare PUT body
-        image_data = eloqua_asset_get(
-            image_id, asset_type='image', depth='complete')
-
         # Gets and swaps folder_id to correct one for ELQuent image uploads
         folder_id = naming[source_country]['id']['image']
-        image_data['folderId'] = folder_id
+        image_data = dict(image_info, folderId=folder_id)
 
         # Updates image folder_id
-        root = f'{eloqua_rest}assets/image/{image_id}'
+        root = f'{eloqua_rest}assets/image/{image_info["id"]}'
+        response = api_request(root, call='put', data=json.dumps(image_data))
+        if response.status_code == 200:
+            return
+
+        # Gets image data to prepare PUT body
+        image_data = eloqua_asset_get(
+            image_info['id'], asset_type='image', depth='complete')
+        image_data['folderId'] = folder_id
         api_request(root, call='put', data=json.dumps(image_data))
 
         return
@@ -1604,12 +1702,9 @@ def eloqua_post_image(image):
     image_link = naming['image'] + image_url
 
     # Moves file to correct image folder
-    image_id = image_info['id']
-    eloqua_move_image(image_id)
+    eloqua_move_image(image_info)
 
-    print(f'{Fore.GREEN} › {Fore.WHITE}ELQ', end='', flush=True)
-
-    return image_link
+    return (image_link, image_info['id'])
 
 
 '''
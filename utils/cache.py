@@ -0,0 +1,180 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.cache
+Content-hash disk cache for outcomes of code transforms
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import sys
+import hashlib
+import threading
+
+# Switch of the cache, disabled e.g. by benchmark to measure real transforms
+CACHE_ENABLED = True
+
+# Version of cached outcomes, bump it whenever any cached transform changes its output
+CACHE_VERSION = 2
+
+# Maximum size of cache folder in bytes, least recently used entries are evicted above it
+CACHE_SIZE = 64 * 1024 * 1024
+
+# Part of CACHE_SIZE left after eviction, so the folder is not scanned again on next writes
+CACHE_EVICT_RATIO = 0.9
+
+# Globals
+cache_size = None  # Running total of cache folder size in bytes, None until first scan
+cache_lock = threading.Lock()
+
+
+'''
+=================================================================================
+                                File Path Getter
+=================================================================================
+'''
+
+
+def file(file_path, name=''):
+    '''
+    Returns file path to cache files
+    '''
+
+    def find_data_file(filename, directory='api'):
+        '''
+        Returns correct file path for both script and frozen app
+        '''
+        if directory == 'api':  # For reading and writing cache files
+            if getattr(sys, 'frozen', False):
+                datadir = os.path.dirname(sys.executable)
+            else:
+                datadir = os.path.dirname(os.path.dirname(__file__))
+            return os.path.join(datadir, 'utils', directory, 'cache', filename)
+
+    file_paths = {
+        'cache': find_data_file(''),
+        'entry': find_data_file(f'{name}.html')
+    }
+
+    return file_paths.get(file_path)
+
+
+'''
+=================================================================================
+                                Cache functions
+=================================================================================
+'''
+
+
+def cache_key(transform, code, *params):
+    '''
+    Requires name of the transform, its input code and all other parameters
+    Returns content hash identifying the outcome [string]
+    '''
+    key = hashlib.sha256(
+        f'{CACHE_VERSION}\0{transform}\0{params!r}\0'.encode('utf-8'))
+    key.update(code.encode('utf-8', 'surrogatepass'))
+
+    return key.hexdigest()
+
+
+def cache_get(key):
+    '''
+    Returns cached outcome of given key or None if it was not cached
+    '''
+    if not CACHE_ENABLED:
+        return None
+
+    try:
+        with open(file('entry', name=key), 'r', encoding='utf-8', newline='') as f:
+            outcome = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    # Marks entry as recently used for eviction
+    try:
+        os.utime(file('entry', name=key))
+    except OSError:
+        pass
+
+    return outcome
+
+
+def cache_set(key, outcome):
+    '''
+    Saves outcome under given key and evicts least recently used entries
+    when running total of cache size passes the CACHE_SIZE limit
+    '''
+    global cache_size
+    if not CACHE_ENABLED:
+        return
+
+    try:
+        os.makedirs(file('cache'), exist_ok=True)
+        # Writes to temporary file first as many processes and threads may share the cache
+        temporary_path = file('entry', name=f'{key}.{os.getpid()}.{threading.get_ident()}')
+        with open(temporary_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(outcome)
+        size = os.path.getsize(temporary_path)
+        os.replace(temporary_path, file('entry', name=key))
+        with cache_lock:
+            if cache_size is None:
+                cache_size = cache_evict()
+            else:
+                cache_size += size
+                if cache_size > CACHE_SIZE:
+                    cache_size = cache_evict(int(CACHE_SIZE * CACHE_EVICT_RATIO))
+    except OSError:
+        pass
+
+    return
+
+
+def cache_evict(limit=None):
+    '''
+    Removes least recently used entries until cache fits in limit (CACHE_SIZE by default)
+    Returns size of cache folder after eviction [int]
+    '''
+    entries = []
+    with os.scandir(file('cache')) as cache_folder:
+        for entry in cache_folder:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    cache_size = sum(entry[1] for entry in entries)
+    limit = CACHE_SIZE if limit is None else limit
+    for _, size, path in sorted(entries):
+        if cache_size <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        cache_size -= size
+
+    return cache_size
+
+
+def cache_clear():
+    '''
+    Removes all cached outcomes
+    '''
+    global cache_size
+    cache_size = None
+    if not os.path.isdir(file('cache')):
+        return
+    with os.scandir(file('cache')) as cache_folder:
+        for entry in cache_folder:
+            if entry.is_file():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    return
@@ -15,10 +15,15 @@ import os
 import re
 import sys
 import json
+import time
 import pyperclip
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
+import utils.template as template
 import utils.api.api as api
 import utils.helper as helper
 import utils.page as page
@@ -35,11 +40,9 @@ converter_choice = None
 webinar_epoch = None
 product_name = None
 header_text = None
-regex_asset_name = None
-regex_asset_url = None
-regex_product_name = None
-regex_header_text = None
-regex_gtm = None
+
+# Maximum of concurrently built campaign assets
+CAMPAIGN_WORKERS = 4
 
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
@@ -61,10 +64,9 @@ def country_naming_setter(country):
     page.country_naming_setter(source_country)
     helper.country_naming_setter(source_country)
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -95,7 +97,7 @@ def file(file_path, name='LP'):
             else:
                 datadir = os.path.dirname(os.path.dirname(__file__))
             return os.path.join(datadir, 'utils', directory, filename)
-        elif directory == 'outcomes':  # For writing outcome files
+        elif directory in ['incomes', 'outcomes']:  # For reading user files and writing outcome files
             if getattr(sys, 'frozen', False):
                 datadir = os.path.dirname(sys.executable)
             else:
@@ -103,7 +105,6 @@ def file(file_path, name='LP'):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'jquery': find_data_file('WKCORP_LP_jquery.txt'),
         'simple-campaign': find_data_file(f'WK{source_country}_CAMPAIGN_simple.json'),
         'basic-campaign': find_data_file(f'WK{source_country}_CAMPAIGN_basic.json'),
@@ -124,6 +125,8 @@ def file(file_path, name='LP'):
         'form-processing': find_data_file(f'WK{source_country}_FORM_processing-template.json'),
         'form-html': find_data_file(f'WK{source_country}_FORM_html-template.txt'),
         'form-css': find_data_file(f'WK{source_country}_FORM_css-template.txt'),
+        'batch-manifest': find_data_file(f'WK{source_country}_CAMPAIGN_batch.json', directory='incomes'),
+        'batch-report': find_data_file(f'WK{source_country}_CAMPAIGN_batch-report.json', directory='outcomes'),
         'outcome-file': find_data_file(f'WK{source_country}_{name}.txt', directory='outcomes')
     }
 
@@ -137,22 +140,93 @@ def file(file_path, name='LP'):
 '''
 
 
-def campaign_compile_regex():
+def converter_filler(code):
     '''
-    Creates global regex compiles for campaign flows
+    Returns code with placeholders of chosen converter filled
+    (placeholders of naming.json converter are regex patterns)
     '''
-    global regex_asset_name
-    global regex_asset_url
-    global regex_product_name
-    global regex_header_text
-    global regex_gtm
-    regex_asset_name = re.compile(r'ASSET_NAME', re.UNICODE)
-    regex_asset_url = re.compile(r'ASSET_URL', re.UNICODE)
-    regex_product_name = re.compile(r'PRODUCT_NAME', re.UNICODE)
-    regex_header_text = re.compile(r'OPTIONAL_TEXT', re.UNICODE)
-    regex_gtm = re.compile(r'<SITE_NAME>', re.UNICODE)
+    converter = naming[source_country]['converter']
+    for placeholder, converter_value in zip(converter['Placeholders'], converter[converter_choice]):
+        code = re.sub(placeholder, converter_value, code, flags=re.UNICODE)
 
-    return
+    return code
+
+
+def campaign_build(nodes):
+    '''
+    Requires {node name: (function, dependencies, interactive, assets)} where
+    function gets {dependency name: result} of its dependencies, interactive nodes
+    are run one at a time in main thread and assets returns [(asset type, id)]
+    created by the node from its result
+    Runs independent nodes concurrently as soon as their dependencies are built
+    Returns {node name: result} or False after deleting created assets if any node failed
+    '''
+    results = {}
+    created = []
+    failed = {}
+    pending = dict(nodes)
+    running = {}
+
+    def record(name, outcome):
+        '''
+        Saves result and created assets of the node or marks build as failed
+        '''
+        if outcome is False or isinstance(outcome, BaseException):
+            failed.setdefault(name, outcome)
+            return
+        results[name] = outcome
+        created.extend(nodes[name][3](outcome))
+
+    def ready(interactive):
+        '''
+        Returns names of pending nodes with all dependencies built [list]
+        '''
+        return [name for name, (_, dependencies, node_interactive, _) in pending.items()
+                if node_interactive == interactive
+                and all(dependency in results for dependency in dependencies)]
+
+    with ThreadPoolExecutor(max_workers=CAMPAIGN_WORKERS) as executor:
+        while (pending or running) and not failed:
+            # Starts background nodes first so they work during user prompts
+            for name in ready(interactive=False):
+                function, dependencies, _, _ = pending.pop(name)
+                running[executor.submit(
+                    function, {dependency: results[dependency] for dependency in dependencies})] = name
+
+            interactive_names = ready(interactive=True)
+            if interactive_names:
+                function, dependencies, _, _ = pending.pop(interactive_names[0])
+                try:
+                    with api.console_lock:
+                        outcome = function({dependency: results[dependency] for dependency in dependencies})
+                except (Exception, SystemExit) as error:
+                    outcome = error
+                record(interactive_names[0], outcome)
+            elif running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(running.pop(future), future.exception() or future.result())
+            else:
+                failed.update({name: False for name in pending})
+
+        # Waits for nodes started before failure to clean up their assets too
+        for future in running:
+            record(running[future], future.exception() or future.result())
+
+    if not failed:
+        return results
+
+    for name, outcome in failed.items():
+        reason = f' ({outcome!r})' if outcome is not False else ''
+        print(f'\n{ERROR}Could not build {name}{reason}')
+    print(f'{Fore.YELLOW}» Deleting {len(created)} assets created for the campaign')
+    for asset_type, asset_id in reversed(created):
+        if api.eloqua_delete_asset(asset_id, asset_type):
+            print(f'{Fore.WHITE}» [{Fore.YELLOW}DELETED{Fore.WHITE}] Eloqua {asset_type} ID: {asset_id}')
+        else:
+            print(f'{ERROR}Could not delete Eloqua {asset_type} ID: {asset_id}')
+
+    return False
 
 
 def campaign_first_mail(main_lp_url='', mail_html='', camp_name='', ab_test=False, reminder=True):
@@ -241,18 +315,15 @@ def campaign_main_page(form_id=''):
 
     # Creates LP
     file_name = ('_'.join(campaign_name[1:4]) + '_LP')
-    with open(file('lp-template'), 'r', encoding='utf-8') as f:
-        code = f.read()
+    code = template.text_getter(file('lp-template'))
     code = page.swap_form(code, form_html)
     code = page.javascript(code)
-    code = regex_product_name.sub(product_name, code)
-    code = regex_header_text.sub(header_text, code)
-    code = regex_gtm.sub(f'WK{source_country}_{file_name}', code)
-    for i in range(len(naming[source_country]['converter']['Placeholders'])):
-        placeholder = naming[source_country]['converter']['Placeholders'][i]
-        regex_converter = re.compile(rf'{placeholder}', re.UNICODE)
-        converter_value = naming[source_country]['converter'][converter_choice][i]
-        code = regex_converter.sub(rf'{converter_value}', code)
+    code = template.code_filler(code, {
+        'PRODUCT_NAME': product_name,
+        'OPTIONAL_TEXT': header_text,
+        '<SITE_NAME>': f'WK{source_country}_{file_name}'
+    })
+    code = converter_filler(code)
 
     # Saves to Outcomes file
     print(
@@ -282,19 +353,16 @@ def campaign_main_form():
     form_html_name = api.eloqua_asset_html_name(form_name)
 
     # Loads json data for blindform creation and fills it with name and html_name
-    with open(file('form-design'), 'r', encoding='utf-8') as f:
-        form_json = json.load(f)
-        form_json['name'] = form_name
-        form_json['htmlName'] = form_html_name
-        form_json['folderId'] = form_folder_id
+    form_json = template.json_getter(file('form-design'))
+    form_json['name'] = form_name
+    form_json['htmlName'] = form_html_name
+    form_json['folderId'] = form_folder_id
 
     # Creates form with given data
     form_id, form_json = api.eloqua_create_form(form_name, form_json)
 
     # Prepares HTML Code of the form
-    with open(file('form-html'), 'r', encoding='utf-8') as f:
-        form_html = f.read()
-        form_html = form_html.replace('FORM_ID', form_id)
+    form_html = template.template_filler(file('form-html'), {'FORM_ID': form_id})
 
     # Updates form with HTML
     form_id, form_json = api.eloqua_update_form(form_id, html=form_html)
@@ -307,40 +375,27 @@ def campaign_update_form(form_html, form_id, form_json, asset_mail_id, ty_page_i
     Updates main form with asset_mail_id, ty_page_id, form_id, from_a_form, psp, lead_status
     '''
     # Gets CSS Code of the form
-    with open(file('form-css'), 'r', encoding='utf-8') as f:
-        form_css = f.read()
-
-    for field in form_json['elements']:
-        if field['htmlName'] == 'emailAddress':
-            email_field_id = field['id']
-        elif field['htmlName'] == 'firstName':
-            firstname_field_id = field['id']
-        elif field['htmlName'] == 'lastName':
-            lastname_field_id = field['id']
-        elif field['htmlName'] == 'jobTitleFreeText1':
-            jobtitle_field_id = field['id']
-        elif field['htmlName'] == 'company':
-            company_field_id = field['id']
-        elif field['htmlName'] == 'busPhone':
-            phone_field_id = field['id']
-        elif field['htmlName'] == 'utm_source':
-            source_field_id = field['id']
-        elif field['htmlName'] == 'utm_campaign':
-            detail_field_id = field['id']
-        elif field['htmlName'] == 'utm_medium':
-            medium_field_id = field['id']
-        elif field['htmlName'] == 'utm_content':
-            content_field_id = field['id']
-        elif field['htmlName'] == 'utm_term':
-            term_field_id = field['id']
-        elif field['htmlName'] == 'form_url':
-            url_field_id = field['id']
-        elif field['htmlName'] == 'directMailOptedIn1':
-            dataoptin_field_id = field['id']
-        elif field['htmlName'] == 'emailOptedIn1':
-            emailoptin_field_id = field['id']
-        elif field['htmlName'] == 'phoneOptedIn1':
-            phoneoptin_field_id = field['id']
+    form_css = template.text_getter(file('form-css'))
+
+    # Gets ids of form fields used in processing steps
+    field_ids = {field['htmlName']: field['id'] for field in form_json['elements']}
+    field_placeholders = {
+        'EMAIL_FIELD_ID': 'emailAddress',
+        'FIRSTNAME_FIELD_ID': 'firstName',
+        'LASTNAME_FIELD_ID': 'lastName',
+        'JOBTITLE_FIELD_ID': 'jobTitleFreeText1',
+        'COMPANY_FIELD_ID': 'company',
+        'PHONE_FIELD_ID': 'busPhone',
+        'SOURCE_FIELD_ID': 'utm_source',
+        'DETAIL_FIELD_ID': 'utm_campaign',
+        'MEDIUM_FIELD_ID': 'utm_medium',
+        'CONTENT_FIELD_ID': 'utm_content',
+        'TERM_FIELD_ID': 'utm_term',
+        'URL_FIELD_ID': 'form_url',
+        'DATAOPTIN_FIELD_ID': 'directMailOptedIn1',
+        'EMAILOPTIN_FIELD_ID': 'emailOptedIn1',
+        'PHONEOPTIN_FIELD_ID': 'phoneOptedIn1'
+    }
 
     # Gets PSP Cost from name
     if '/' in campaign_name[4]:
@@ -360,35 +415,17 @@ def campaign_update_form(form_html, form_id, form_json, asset_mail_id, ty_page_i
         else:
             print(f'\n{ERROR}Incorrect Lead Status')
 
-    # Gets and prepares processing steps json of the form
-    with open(file('form-processing'), 'r', encoding='utf-8') as f:
-        form_processing = json.load(f)
-        # Change to string for easy replacing
-        form_string = json.dumps(form_processing)
-        form_string = form_string\
-            .replace('EMAIL_FIELD_ID', email_field_id)\
-            .replace('FIRSTNAME_FIELD_ID', firstname_field_id)\
-            .replace('LASTNAME_FIELD_ID', lastname_field_id)\
-            .replace('COMPANY_FIELD_ID', company_field_id)\
-            .replace('JOBTITLE_FIELD_ID', jobtitle_field_id)\
-            .replace('PHONE_FIELD_ID', phone_field_id)\
-            .replace('SOURCE_FIELD_ID', source_field_id)\
-            .replace('DETAIL_FIELD_ID', detail_field_id)\
-            .replace('MEDIUM_FIELD_ID', medium_field_id)\
-            .replace('CONTENT_FIELD_ID', content_field_id)\
-            .replace('TERM_FIELD_ID', term_field_id)\
-            .replace('URL_FIELD_ID', url_field_id)\
-            .replace('DATAOPTIN_FIELD_ID', dataoptin_field_id)\
-            .replace('EMAILOPTIN_FIELD_ID', emailoptin_field_id)\
-            .replace('PHONEOPTIN_FIELD_ID', phoneoptin_field_id)\
-            .replace('LEAD_STATUS', lead_status)\
-            .replace('COST_CODE', cost_code)\
-            .replace('CAMPAIGN_ELEMENT_ID', from_a_form)\
-            .replace('ASSET_EMAIL_ID', asset_mail_id)\
-            .replace('TY_LP_ID', ty_page_id)\
-            .replace('FORM_ID', form_id)
-        # Change back to json for API call
-        form_processing = json.loads(form_string)
+    # Gets processing steps json of the form filled with ids in single walk
+    form_processing = template.json_template_filler(file('form-processing'), {
+        **{placeholder: field_ids.get(html_name)
+           for placeholder, html_name in field_placeholders.items()},
+        'LEAD_STATUS': lead_status,
+        'COST_CODE': cost_code,
+        'CAMPAIGN_ELEMENT_ID': from_a_form,
+        'ASSET_EMAIL_ID': asset_mail_id,
+        'TY_LP_ID': ty_page_id,
+        'FORM_ID': form_id
+    })
 
     api.eloqua_update_form(
         form_id,
@@ -408,18 +445,13 @@ def campaign_ty_page(asset_name):
     file_name = '_'.join(campaign_name[1:4]) + '_TY-LP'
 
     # Gets and prepares general TY LP structure
-    with open(file('ty-lp'), 'r', encoding='utf-8') as f:
-        ty_lp_code = f.read()
-    ty_lp_code = regex_product_name.sub(product_name, ty_lp_code)
-    ty_lp_code = regex_header_text.sub(header_text, ty_lp_code)
-    ty_lp_code = regex_asset_name.sub(asset_name, ty_lp_code)
-    ty_lp_code = regex_gtm.sub(f'WK{source_country}_{file_name}', ty_lp_code)
-
-    for i in range(len(naming[source_country]['converter']['Placeholders'])):
-        placeholder = naming[source_country]['converter']['Placeholders'][i]
-        regex_converter = re.compile(rf'{placeholder}', re.UNICODE)
-        converter_value = naming[source_country]['converter'][converter_choice][i]
-        ty_lp_code = regex_converter.sub(rf'{converter_value}', ty_lp_code)
+    ty_lp_code = template.template_filler(file('ty-lp'), {
+        'PRODUCT_NAME': product_name,
+        'OPTIONAL_TEXT': header_text,
+        'ASSET_NAME': asset_name,
+        '<SITE_NAME>': f'WK{source_country}_{file_name}'
+    })
+    ty_lp_code = converter_filler(ty_lp_code)
 
     # Saves to Outcomes file
     print(
@@ -439,8 +471,7 @@ def campaign_asset_mail(asset_name, asset_url):
     Returns asset mail id
     '''
     file_name = ('_'.join(campaign_name[1:4]) + '_asset-TECH-EML')
-    with open(file('asset-eml'), 'r', encoding='utf-8') as f:
-        asset_mail_code = f.read()
+    asset_mail_code = template.text_getter(file('asset-eml'))
 
     if converter_choice == 'Webinar Access':
         webinar_string = naming[source_country]['webinar']['dateText']
@@ -451,15 +482,12 @@ def campaign_asset_mail(asset_name, asset_url):
             .replace('<em>"ASSET_NAME"</em>',
                      '<em>"ASSET_NAME"</em>.\n' + webinar_string)
 
-    asset_mail_code = regex_product_name.sub(product_name, asset_mail_code)
-    asset_mail_code = regex_asset_name.sub(asset_name, asset_mail_code)
-    asset_mail_code = regex_asset_url.sub(asset_url, asset_mail_code)
-    for i in range(len(naming[source_country]['converter']['Placeholders'])):
-        placeholder = naming[source_country]['converter']['Placeholders'][i]
-        regex_converter = re.compile(rf'{placeholder}', re.UNICODE)
-        converter_value = naming[source_country]['converter'][converter_choice][i]
-        asset_mail_code = regex_converter.sub(
-            rf'{converter_value}', asset_mail_code)
+    asset_mail_code = template.code_filler(asset_mail_code, {
+        'PRODUCT_NAME': product_name,
+        'ASSET_NAME': asset_name,
+        'ASSET_URL': asset_url
+    })
+    asset_mail_code = converter_filler(asset_mail_code)
 
     # Saves to Outcomes file
     print(
@@ -484,22 +512,13 @@ def campaign_webinar_mails(asset_name, asset_url):
         '''
         Returns filled e-mail code [string]
         '''
-        before_mail_code = regex_product_name.sub(
-            product_name, before_mail_code)
-        before_mail_code = regex_asset_name.sub(asset_name, before_mail_code)
-        before_mail_code = regex_asset_url.sub(asset_url, before_mail_code)
-        for i in range(len(naming[source_country]['converter']['Placeholders'])):
-            placeholder = naming[source_country]['converter']['Placeholders'][i]
-            regex_converter = re.compile(rf'{placeholder}', re.UNICODE)
-            converter_value = naming[source_country]['converter'][converter_choice][i]
-            before_mail_code = regex_converter.sub(
-                rf'{converter_value}', before_mail_code)
-
-        return before_mail_code
-
-    # Gets the before mail template
-    with open(file('before-webinar-eml'), 'r', encoding='utf-8') as f:
-        before_mail_code = f.read()
+        before_mail_code = template.code_filler(before_mail_code, {
+            'PRODUCT_NAME': product_name,
+            'ASSET_NAME': asset_name,
+            'ASSET_URL': asset_url
+        })
+
+        return converter_filler(before_mail_code)
 
     '''
     =================================================== Day Before EML
@@ -509,10 +528,11 @@ def campaign_webinar_mails(asset_name, asset_url):
     file_name = ('_'.join(campaign_name[1:4]) + '_day-before-TECH-EML')
     day_before_preheader = naming[source_country]['webinar']['dayBeforePre']
     day_before_content = naming[source_country]['webinar']['dayBeforeContent']
-    day_before_mail_code = before_mail_code\
-        .replace('PREHEADER_TEXT', day_before_preheader)\
-        .replace('CONTENT_TEXT', day_before_content)\
-        .replace('INSERT_HOUR', helper.epoch_to_time(webinar_epoch))
+    day_before_mail_code = template.template_filler(file('before-webinar-eml'), {
+        'PREHEADER_TEXT': day_before_preheader,
+        'CONTENT_TEXT': day_before_content,
+        'INSERT_HOUR': helper.epoch_to_time(webinar_epoch)
+    })
     day_before_mail_code = prepare_mail(day_before_mail_code)
 
     # Saves day before mail to Outcomes file
@@ -533,10 +553,11 @@ def campaign_webinar_mails(asset_name, asset_url):
     file_name = ('_'.join(campaign_name[1:4]) + '_hour-before-TECH-EML')
     day_before_preheader = naming[source_country]['webinar']['hourBeforePre']
     day_before_content = naming[source_country]['webinar']['hourBeforeContent']
-    hour_before_mail_code = before_mail_code\
-        .replace('PREHEADER_TEXT', day_before_preheader)\
-        .replace('CONTENT_TEXT', day_before_content)\
-        .replace('INSERT_HOUR', helper.epoch_to_time(webinar_epoch))
+    hour_before_mail_code = template.template_filler(file('before-webinar-eml'), {
+        'PREHEADER_TEXT': day_before_preheader,
+        'CONTENT_TEXT': day_before_content,
+        'INSERT_HOUR': helper.epoch_to_time(webinar_epoch)
+    })
     hour_before_mail_code = prepare_mail(hour_before_mail_code)
 
     # Saves hour before mail to Outcomes file
@@ -558,11 +579,10 @@ def campaign_demo_mail(asset_url):
     Returns demo mail id
     '''
     file_name = ('_'.join(campaign_name[1:4]) + '_demo-TECH-EML')
-    with open(file('demo-eml'), 'r', encoding='utf-8') as f:
-        demo_mail_code = f.read()
-
-    demo_mail_code = regex_product_name.sub(product_name, demo_mail_code)
-    demo_mail_code = regex_asset_url.sub(asset_url, demo_mail_code)
+    demo_mail_code = template.template_filler(file('demo-eml'), {
+        'PRODUCT_NAME': product_name,
+        'ASSET_URL': asset_url
+    })
 
     # Saves to Outcomes file
     print(
@@ -583,13 +603,12 @@ def campaign_code_mail(asset_name, asset_url, code_fieldmerge):
     Returns code mail id
     '''
     file_name = ('_'.join(campaign_name[1:4]) + '_code-TECH-EML')
-    with open(file('code-eml'), 'r', encoding='utf-8') as f:
-        code_mail_code = f.read()
-
-    code_mail_code = regex_product_name.sub(product_name, code_mail_code)
-    code_mail_code = regex_asset_name.sub(asset_name, code_mail_code)
-    code_mail_code = regex_asset_url.sub(asset_url, code_mail_code)
-    code_mail_code = code_mail_code.replace('FIELD_MERGE', code_fieldmerge)
+    code_mail_code = template.template_filler(file('code-eml'), {
+        'PRODUCT_NAME': product_name,
+        'ASSET_NAME': asset_name,
+        'ASSET_URL': asset_url,
+        'FIELD_MERGE': code_fieldmerge
+    })
 
     # Saves to Outcomes file
     print(
@@ -681,50 +700,35 @@ def simple_campaign():
             psp_element = iter_camp_name[4].split('/')[1]
             campaign_code = f'{psp_element}_{iter_camp_name[5]}'
         else:
+            psp = config.country_lookups(source_country)['psp']
             for part in iter_camp_name[3].split('-'):
-                if part.startswith(tuple(naming[source_country]['psp'])):
+                if part.startswith(psp):
                     campaign_code.append(part)
             campaign_code = '_'.join(campaign_code)
 
         # Loads json data for campaign canvas creation and fills it with data
-        with open(file('simple-campaign'), 'r', encoding='utf-8') as f:
-            campaign_json = json.load(f)
-            # Change to string for easy replacing
-            campaign_string = json.dumps(campaign_json)
-            campaign_string = campaign_string.replace('MAIL_ID', mail_id)
-            if alert_mail:
-                # Capture specific folder
-                folder_id = naming[source_country]['id']['campaign'].get(
-                    diff_name)
-                # Capture specific segment
-                segment_id = naming[source_country]['mail']['by_name'][diff_name]['segmentId'][i]
-                campaign_string = campaign_string.replace(
-                    'SEGMENT_ID', segment_id)
-            elif newsletter_mail:
-                # Capture specific folder
-                folder_id = naming[source_country]['id']['campaign'].get(
-                    diff_name)
-                # Capture specific segment
-                segment_id = naming[source_country]['mail']['by_name'][diff_name]['segmentId'][i]
-                campaign_string = campaign_string.replace(
-                    'SEGMENT_ID', segment_id)
-            else:
-                # Capture generic folder for campaign type
-                folder_id = naming[source_country]['id']['campaign'].get(
-                    iter_camp_name[1])
-                # Insert test segment
-                campaign_string = campaign_string.replace('SEGMENT_ID', '466')
-            # Change back to json for API call
-            campaign_json = json.loads(campaign_string)
-            campaign_json['name'] = '_'.join(iter_camp_name)
-            campaign_json['folderId'] = folder_id
-            campaign_json['region'] = iter_camp_name[0]
-            campaign_json['campaignType'] = iter_camp_name[2]
-            if '/' in iter_camp_name[4]:
-                campaign_json['product'] = iter_camp_name[4].split('/')[0]
-            else:
-                campaign_json['product'] = iter_camp_name[-1]
-            campaign_json['fieldValues'][0]['value'] = campaign_code
+        if alert_mail or newsletter_mail:
+            # Capture specific folder and segment
+            folder_id = naming[source_country]['id']['campaign'].get(diff_name)
+            segment_id = naming[source_country]['mail']['by_name'][diff_name]['segmentId'][i]
+        else:
+            # Capture generic folder for campaign type and test segment
+            folder_id = naming[source_country]['id']['campaign'].get(
+                iter_camp_name[1])
+            segment_id = '466'
+        campaign_json = template.json_template_filler(file('simple-campaign'), {
+            'MAIL_ID': mail_id,
+            'SEGMENT_ID': segment_id
+        })
+        campaign_json['name'] = '_'.join(iter_camp_name)
+        campaign_json['folderId'] = folder_id
+        campaign_json['region'] = iter_camp_name[0]
+        campaign_json['campaignType'] = iter_camp_name[2]
+        if '/' in iter_camp_name[4]:
+            campaign_json['product'] = iter_camp_name[4].split('/')[0]
+        else:
+            campaign_json['product'] = iter_camp_name[-1]
+        campaign_json['fieldValues'][0]['value'] = campaign_code
 
         # Creates campaign with given data
         api.eloqua_create_campaign(iter_camp_name, campaign_json)
@@ -806,38 +810,30 @@ def alert_campaign():
             psp_element = iter_camp_name[4].split('/')[1]
             campaign_code = f'{psp_element}_{iter_camp_name[5]}'
         else:
+            psp = config.country_lookups(source_country)['psp']
             for part in iter_camp_name[3].split('-'):
-                if part.startswith(tuple(naming[source_country]['psp'])):
+                if part.startswith(psp):
                     campaign_code.append(part)
             campaign_code = '_'.join(campaign_code)
 
         # Loads json data for campaign canvas creation and fills it with data
         template_name = 'alert-ab-campaign' if ab_test else 'alert-campaign'
-
-        with open(file(template_name), 'r', encoding='utf-8') as f:
-            campaign_json = json.load(f)
-            # Change to string for easy replacing
-            campaign_string = json.dumps(campaign_json)
-            campaign_string = campaign_string.replace('MAIL_ID', mail_id)
-            if ab_test:
-                campaign_string = campaign_string.replace(
-                    'REMINDER_ID', reminder_id)
-            # Capture specific folder
-            folder_id = naming[source_country]['id']['campaign'].get(diff_name)
-            # Capture specific segment
-            segment_id = naming[source_country]['mail']['by_name'][diff_name]['segmentId'][i]
-            campaign_string = campaign_string.replace('SEGMENT_ID', segment_id)
-            # Change back to json for API call
-            campaign_json = json.loads(campaign_string)
-            campaign_json['name'] = '_'.join(iter_camp_name)
-            campaign_json['folderId'] = folder_id
-            campaign_json['region'] = iter_camp_name[0]
-            campaign_json['campaignType'] = iter_camp_name[2]
-            if '/' in iter_camp_name[4]:
-                campaign_json['product'] = iter_camp_name[4].split('/')[0]
-            else:
-                campaign_json['product'] = iter_camp_name[-1]
-            campaign_json['fieldValues'][0]['value'] = campaign_code
+        # Capture specific folder and segment
+        folder_id = naming[source_country]['id']['campaign'].get(diff_name)
+        segment_id = naming[source_country]['mail']['by_name'][diff_name]['segmentId'][i]
+        canvas_values = {'MAIL_ID': mail_id, 'SEGMENT_ID': segment_id}
+        if ab_test:
+            canvas_values['REMINDER_ID'] = reminder_id
+        campaign_json = template.json_template_filler(file(template_name), canvas_values)
+        campaign_json['name'] = '_'.join(iter_camp_name)
+        campaign_json['folderId'] = folder_id
+        campaign_json['region'] = iter_camp_name[0]
+        campaign_json['campaignType'] = iter_camp_name[2]
+        if '/' in iter_camp_name[4]:
+            campaign_json['product'] = iter_camp_name[4].split('/')[0]
+        else:
+            campaign_json['product'] = iter_camp_name[-1]
+        campaign_json['fieldValues'][0]['value'] = campaign_code
 
         # Creates campaign with given data
         api.eloqua_create_campaign(iter_camp_name, campaign_json)
@@ -853,6 +849,202 @@ def alert_campaign():
     return
 
 
+'''
+=================================================================================
+                                BATCH CAMPAIGN FLOW
+=================================================================================
+'''
+
+
+def batch_manifest_getter():
+    '''
+    Returns canvas type and list of valid campaign iterations from batch manifest
+    or False if manifest is missing or invalid
+    '''
+    print(
+        f'\n{Fore.YELLOW}» {Fore.WHITE}Please add {Fore.YELLOW}WK{source_country}_CAMPAIGN_batch.json{Fore.WHITE}',
+        f'manifest to Incomes folder, e.g.:'
+        f'\n{Fore.WHITE}  {{"canvas": "simple", "campaigns": [{{"name": "...", "subject": "...",'
+        f' "segment": "123", "date": "DD-MM-YYYY hh:mm"}}]}}'
+        f'\n{Fore.WHITE}[Enter] to continue when finished.', end='')
+    input(' ')
+    try:
+        with open(file('batch-manifest'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.decoder.JSONDecodeError) as error:
+        print(f'\n{ERROR}Could not read batch manifest ({error})')
+        return False
+
+    canvas = manifest.get('canvas', 'simple')
+    if canvas not in ['simple', 'alert']:
+        print(f'\n{ERROR}Canvas "{canvas}" is not simple nor alert')
+        return False
+
+    # Validates all iterations before creating anything in Eloqua
+    lookups = config.country_lookups(source_country)
+    iterations = []
+    errors = []
+    for iteration in manifest.get('campaigns', []):
+        name = iteration.get('name', '').split('_')
+        if len(name) != 6 or '/' not in name[4]:
+            errors.append(f'"{"_".join(name)}" has not 6 name elements with VSP/PSP')
+        elif name[0] != f'WK{source_country}':
+            errors.append(f'"{"_".join(name)}" is not {source_country} campaign')
+        elif name[1] not in lookups['segments'] or name[2] not in lookups['campaign_types']:
+            errors.append(f'"{"_".join(name)}" has not existing segment or campaign type')
+        elif len(iteration.get('subject', '')) > 100:
+            errors.append(f'"{"_".join(name)}" subject is over 100 characters long')
+        else:
+            try:
+                start = datetime.strptime(iteration['date'], '%d-%m-%Y %H:%M') if iteration.get('date') else None
+            except ValueError:
+                errors.append(f'"{"_".join(name)}" date is not in DD-MM-YYYY hh:mm format')
+                continue
+            iterations.append({
+                'name': name,
+                'subject': iteration.get('subject', ''),
+                'segment': str(iteration.get('segment', '')),
+                'start': helper.date_to_epoch(start) if start else None
+            })
+    for error in errors:
+        print(f'{ERROR}{error}')
+    if errors or not iterations:
+        print(f'\n{ERROR}Batch manifest has no valid campaigns or has errors')
+        return False
+
+    return (canvas, iterations)
+
+
+def batch_campaign():
+    '''
+    Main flow for batch of simple or alert campaigns from manifest in Incomes folder
+    Creates all e-mails and then all campaigns concurrently from one e-mail HTML
+    Prints and saves to Outcomes folder table of created ids with timings
+    '''
+    manifest = batch_manifest_getter()
+    if not manifest:
+        return False
+    canvas, iterations = manifest
+
+    # Gets base e-mail HTML once for all iterations
+    first_name = iterations[0]['name']
+    diff_name = '_'.join([first_name[2], first_name[3].split('-')[0]])
+    if diff_name.startswith('RET_LA'):
+        mail_html = mail.alert_constructor(source_country)
+    elif first_name[1] == 'MSG' and first_name[2] == 'NSL':
+        mail_html = mail.newsletter_constructor(source_country)
+    else:
+        mail_html = mail.mail_constructor(source_country, campaign='linkless')
+    if not mail_html:
+        return False
+    mail_html = re.sub(
+        r'<!-- Lead START --> (.*?) <!-- Lead END -->', r'\g<1>', mail_html)
+
+    def mail_prefix(name):
+        '''
+        Returns part of campaign name by which e-mail settings are searched
+        '''
+        return '_'.join(name[0:3] + [name[3].split('-')[0]])
+
+    # Asks for e-mail settings once per similar e-mails before any of them is created
+    mail_params = {}
+    for iteration in iterations:
+        prefix = mail_prefix(iteration['name'])
+        if prefix not in mail_params:
+            mail_params[prefix] = api.eloqua_fill_mail_params('_'.join(iteration['name'][0:4]) + '_EML')
+
+    def batch_mail(iteration):
+        '''
+        Returns id of created e-mail and its creation time
+        '''
+        start = time.perf_counter()
+        mail_id = api.eloqua_create_email(
+            '_'.join(iteration['name'][0:4]) + '_EML', mail_html,
+            subject=iteration['subject'], open_email=False,
+            data=mail_params[mail_prefix(iteration['name'])])
+
+        return (mail_id, time.perf_counter() - start)
+
+    def batch_canvas(iteration, index):
+        '''
+        Returns id of created campaign and its creation time
+        '''
+        start = time.perf_counter()
+        name = iteration['name']
+        diff_name = '_'.join([name[2], name[3].split('-')[0]])
+        by_name = naming[source_country]['mail']['by_name']
+        segment_id = iteration['segment']
+        if not segment_id and diff_name in by_name:
+            segment_ids = by_name[diff_name]['segmentId']
+            segment_id = segment_ids[index % len(segment_ids)]
+        folder_id = naming[source_country]['id']['campaign'].get(diff_name)\
+            or naming[source_country]['id']['campaign'].get(name[1])
+
+        # Gets campaign code out of the campaign name
+        campaign_code = f'{name[4].split("/")[1]}_{name[5]}'
+
+        campaign_json = template.json_template_filler(file(f'{canvas}-campaign'), {
+            'MAIL_ID': iteration['mail_id'],
+            'SEGMENT_ID': segment_id or '466'
+        })
+        campaign_json['name'] = '_'.join(name)
+        campaign_json['folderId'] = folder_id
+        campaign_json['region'] = name[0]
+        campaign_json['campaignType'] = name[2]
+        campaign_json['product'] = name[4].split('/')[0]
+        campaign_json['fieldValues'][0]['value'] = campaign_code
+        if iteration['start']:
+            campaign_json['startAt'] = str(iteration['start'])
+        campaign_id, _ = api.eloqua_create_campaign(name, campaign_json, open_campaign=False)
+
+        return (campaign_id, time.perf_counter() - start)
+
+    # Creates all e-mails and then all campaigns with bounded concurrency
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CAMPAIGN_WORKERS) as executor:
+        mail_calls = {executor.submit(batch_mail, iteration): iteration for iteration in iterations}
+        for mail_call in as_completed(mail_calls):
+            iteration = mail_calls[mail_call]
+            try:
+                iteration['mail_id'], iteration['mail_time'] = mail_call.result()
+            except (Exception, SystemExit) as error:
+                iteration['error'] = repr(error)
+        canvas_calls = {executor.submit(batch_canvas, iteration, index): iteration
+                        for index, iteration in enumerate(iterations) if 'error' not in iteration}
+        for canvas_call in as_completed(canvas_calls):
+            iteration = canvas_calls[canvas_call]
+            try:
+                iteration['campaign_id'], iteration['campaign_time'] = canvas_call.result()
+            except (Exception, SystemExit) as error:
+                iteration['error'] = repr(error)
+
+    # Prints and saves table of created assets
+    report = [{
+        'name': '_'.join(iteration['name']),
+        'mail_id': iteration.get('mail_id', ''),
+        'mail_time': round(iteration.get('mail_time', 0), 2),
+        'campaign_id': iteration.get('campaign_id', ''),
+        'campaign_time': round(iteration.get('campaign_time', 0), 2),
+        'error': iteration.get('error', '')
+    } for iteration in iterations]
+    print(f'\n{Fore.WHITE}{"E-mail":>10} {"Time":>6} {"Campaign":>10} {"Time":>6}  Name')
+    for entry in report:
+        color = Fore.RED if entry['error'] else Fore.WHITE
+        print(f'{color}{entry["mail_id"]:>10} {entry["mail_time"]:>5.1f}s '
+              f'{entry["campaign_id"]:>10} {entry["campaign_time"]:>5.1f}s  {entry["name"]}')
+        if entry['error']:
+            print(f'  {ERROR}{entry["error"]}')
+    with open(file('batch-report'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    created = len([entry for entry in report if entry['campaign_id']])
+    print(f'\n{SUCCESS}Created {created}/{len(report)} campaigns in',
+          f'{time.perf_counter() - batch_start:.1f}s, report saved to Outcomes folder',
+          f'\n{Fore.WHITE}» Click [Enter] to continue.', end='')
+    input(' ')
+
+    return
+
+
 '''
 =================================================================================
                                 BASIC CAMPAIGN FLOW
@@ -885,30 +1077,26 @@ def basic_campaign():
         psp_element = campaign_name[4].split('/')[1]
         campaign_code = f'{psp_element}_{campaign_name[5]}'
     else:
+        psp = config.country_lookups(source_country)['psp']
         for part in campaign_name[3].split('-'):
-            if part.startswith(tuple(naming[source_country]['psp'])):
+            if part.startswith(psp):
                 campaign_code.append(part)
         campaign_code = '_'.join(campaign_code)
 
     # Loads json data for campaign canvas creation and fills it with data
-    with open(file('basic-campaign'), 'r', encoding='utf-8') as f:
-        campaign_json = json.load(f)
-        # Change to string for easy replacing
-        campaign_string = json.dumps(campaign_json)
-        campaign_string = campaign_string\
-            .replace('MAIL_ID', mail_id)\
-            .replace('REMINDER_ID', reminder_id)
-        # Change back to json for API call
-        campaign_json = json.loads(campaign_string)
-        campaign_json['name'] = '_'.join(campaign_name)
-        campaign_json['folderId'] = folder_id
-        campaign_json['region'] = campaign_name[0]
-        campaign_json['campaignType'] = campaign_name[2]
-        if '/' in campaign_name[4]:
-            campaign_json['product'] = campaign_name[4].split('/')[0]
-        else:
-            campaign_json['product'] = campaign_name[-1]
-        campaign_json['fieldValues'][0]['value'] = campaign_code
+    campaign_json = template.json_template_filler(file('basic-campaign'), {
+        'MAIL_ID': mail_id,
+        'REMINDER_ID': reminder_id
+    })
+    campaign_json['name'] = '_'.join(campaign_name)
+    campaign_json['folderId'] = folder_id
+    campaign_json['region'] = campaign_name[0]
+    campaign_json['campaignType'] = campaign_name[2]
+    if '/' in campaign_name[4]:
+        campaign_json['product'] = campaign_name[4].split('/')[0]
+    else:
+        campaign_json['product'] = campaign_name[-1]
+    campaign_json['fieldValues'][0]['value'] = campaign_code
 
     # Creates campaign with given data
     api.eloqua_create_campaign(campaign_name, campaign_json)
@@ -938,114 +1126,15 @@ def content_campaign():
     Saves multiple html codes as backup to outcome folder
     '''
 
-    def ebook_campaign():
+    def canvas_filler(campaign_json, canvas_values):
         '''
-        Returns prepared campaign_json for e-book campaign
+        Returns campaign_json filled with canvas_values and campaign data
         '''
-        with open(file('ebook-campaign'), 'r', encoding='utf-8') as f:
-            campaign_json = json.load(f)
-            # If form is externally hosted, delete LP reporting step from campaign
-            if campaign_choice == '4':
-                no_lp_elements = []
-                for element in campaign_json['elements']:
-                    if element['type'] != 'CampaignLandingPage':
-                        no_lp_elements.append(element)
-                campaign_json['elements'] = no_lp_elements
-            # Change to string for easy replacing
-            campaign_string = json.dumps(campaign_json)
-            campaign_string = campaign_string\
-                .replace('FIRST_EMAIL', mail_id)\
-                .replace('REMINDER_EMAIL', reminder_id)\
-                .replace('ASSET_TYPE', asset_type)\
-                .replace('ASSET_EMAIL', asset_mail_id)\
-                .replace('FORM_ID', main_form_id)\
-                .replace('LP_ID', main_lp_id)
-            # Change back to json for API call
-            campaign_json = json.loads(campaign_string)
-            campaign_json['name'] = '_'.join(campaign_name)
-            campaign_json['folderId'] = folder_id
-            campaign_json['region'] = campaign_name[0]
-            campaign_json['campaignType'] = campaign_name[2]
-            if '/' in campaign_name[4]:
-                campaign_json['product'] = campaign_name[4].split('/')[0]
-            else:
-                campaign_json['product'] = campaign_name[-1]
-            campaign_json['fieldValues'][0]['value'] = campaign_code
-
-        return campaign_json
-
-    def webinar_campaign(day_before_mail_id, hour_before_mail_id):
-        '''
-        Returns prepared campaign_json for webinar campaign
-        '''
-        with open(file('webinar-campaign'), 'r', encoding='utf-8') as f:
-            campaign_json = json.load(f)
-            # If form is externally hosted, delete LP reporting step from campaign
-            if campaign_choice == '4':
-                no_lp_elements = []
-                for element in campaign_json['elements']:
-                    if element['type'] != 'CampaignLandingPage':
-                        no_lp_elements.append(element)
-                campaign_json['elements'] = no_lp_elements
-            # Change to string for easy replacing
-            campaign_string = json.dumps(campaign_json)
-            campaign_string = campaign_string\
-                .replace('FIRST_EMAIL', mail_id)\
-                .replace('REMINDER_EMAIL', reminder_id)\
-                .replace('ASSET_TYPE', asset_type)\
-                .replace('ASSET_EMAIL', asset_mail_id)\
-                .replace('DAY_BEFORE_EMAIL', day_before_mail_id)\
-                .replace('HOUR_BEFORE_EMAIL', hour_before_mail_id)\
-                .replace('FORM_ID', main_form_id)\
-                .replace('WEBINAR_DATE', str(webinar_epoch))\
-                .replace('DAY_BEFORE', str(webinar_epoch - 86400))\
-                .replace('DAY_END_BEFORE', str(webinar_epoch - 82800))\
-                .replace('HOUR_BEFORE', str(webinar_epoch - 3600))\
-                .replace('HOUR_END_BEFORE', str(webinar_epoch - 1800))\
-                .replace('LP_ID', main_lp_id)
-            # Change back to json for API call
-            campaign_json = json.loads(campaign_string)
-            campaign_json['name'] = '_'.join(campaign_name)
-            campaign_json['folderId'] = folder_id
-            campaign_json['region'] = campaign_name[0]
-            campaign_json['campaignType'] = campaign_name[2]
-            if '/' in campaign_name[4]:
-                campaign_json['product'] = campaign_name[4].split('/')[0]
-            else:
-                campaign_json['product'] = campaign_name[-1]
-            campaign_json['fieldValues'][0]['value'] = campaign_code
-
-        return campaign_json
-
-    def code_campaign():
-        '''
-        Returns prepared campaign_json for code/test campaign
-        '''
-        # Gets either test template or code template based on user input
-        if converter_choice == 'Test Access':
-            with open(file('demo-campaign'), 'r', encoding='utf-8') as f:
-                campaign_json = json.load(f)
-        elif converter_choice == 'Voucher Code':
-            with open(file('code-campaign'), 'r', encoding='utf-8') as f:
-                campaign_json = json.load(f)
         # If form is externally hosted, delete LP reporting step from campaign
         if campaign_choice == '4':
-            no_lp_elements = []
-            for element in campaign_json['elements']:
-                if element['type'] != 'CampaignLandingPage':
-                    no_lp_elements.append(element)
-            campaign_json['elements'] = no_lp_elements
-        # Change to string for easy replacing
-        campaign_string = json.dumps(campaign_json)
-        campaign_string = campaign_string\
-            .replace('FIRST_EMAIL', mail_id)\
-            .replace('REMINDER_EMAIL', reminder_id)\
-            .replace('ASSET_TYPE', asset_type)\
-            .replace('CODE_EMAIL', asset_mail_id)\
-            .replace('FORM_ID', main_form_id)\
-            .replace('LP_ID', main_lp_id)
-        # Change back to json for API call
-        campaign_json = json.loads(campaign_string)
+            campaign_json['elements'] = [element for element in campaign_json['elements']
+                                         if element['type'] != 'CampaignLandingPage']
+        campaign_json = template.json_filler(campaign_json, canvas_values)
         campaign_json['name'] = '_'.join(campaign_name)
         campaign_json['folderId'] = folder_id
         campaign_json['region'] = campaign_name[0]
@@ -1058,6 +1147,59 @@ def content_campaign():
 
         return campaign_json
 
+    def campaign_canvas(built):
+        '''
+        Creates campaign canvas filled with ids of built assets
+        Returns ID and response of created campaign canvas
+        '''
+        main_lp_id, _, main_form_id = built['page']
+        mail_id, reminder_id = built.get('first_mail', ('', ''))
+        canvas_values = {
+            'FIRST_EMAIL': mail_id,
+            'REMINDER_EMAIL': reminder_id,
+            'ASSET_TYPE': asset_type,
+            'FORM_ID': main_form_id,
+            'LP_ID': main_lp_id
+        }
+
+        # Loads json data for campaign canvas creation and fills it with data
+        if converter_choice in ['E-book', 'Webinar Recording']:
+            campaign_json = template.json_getter(file('ebook-campaign'))
+            canvas_values['ASSET_EMAIL'] = built['asset_mail']
+        elif converter_choice == 'Webinar Access':
+            campaign_json = template.json_getter(file('webinar-campaign'))
+            day_before_mail_id, hour_before_mail_id = built['webinar_mails']
+            canvas_values.update({
+                'ASSET_EMAIL': built['asset_mail'],
+                'DAY_BEFORE_EMAIL': day_before_mail_id,
+                'HOUR_BEFORE_EMAIL': hour_before_mail_id,
+                'WEBINAR_DATE': str(webinar_epoch),
+                'DAY_BEFORE': str(webinar_epoch - 86400),
+                'DAY_END_BEFORE': str(webinar_epoch - 82800),
+                'HOUR_BEFORE': str(webinar_epoch - 3600),
+                'HOUR_END_BEFORE': str(webinar_epoch - 1800)
+            })
+        elif converter_choice in ['Test Access', 'Voucher Code']:
+            # Gets either test template or code template based on user input
+            template_name = 'demo-campaign' if converter_choice == 'Test Access' else 'code-campaign'
+            campaign_json = template.json_getter(file(template_name))
+            canvas_values['CODE_EMAIL'] = built['asset_mail']
+
+        return api.eloqua_create_campaign(
+            campaign_name, canvas_filler(campaign_json, canvas_values))
+
+    def campaign_form_update(built):
+        '''
+        Updates confirmation blindform with ids of built assets
+        '''
+        form_html, form_id, form_json = built['form']
+        for campaign_step in built['canvas'][1]['elements']:
+            if '(FaF)' in campaign_step['name']:
+                from_a_form = campaign_step['id']
+
+        return campaign_update_form(form_html, form_id, form_json,
+                                    built['asset_mail'], built['ty_page'], from_a_form)
+
     '''
     =================================================== Content campaign globals
     '''
@@ -1068,11 +1210,10 @@ def content_campaign():
     converter_choice, asset_type, asset_name = helper.asset_name_getter()
     if converter_choice in ['Test Access', 'Voucher Code']:
         fieldmerge_name = f'{source_country}_Voucher_{campaign_name[3]}'
-        with open(file('field-merge'), 'r', encoding='utf-8') as f:
-            fieldmerge_json = json.load(f)
-            fieldmerge_json['name'] = fieldmerge_name
-            fieldmerge_json['fieldConditions'][0]['condition']['value'] = '_'.join(
-                campaign_name)
+        fieldmerge_json = template.json_getter(file('field-merge'))
+        fieldmerge_json['name'] = fieldmerge_name
+        fieldmerge_json['fieldConditions'][0]['condition']['value'] = '_'.join(
+            campaign_name)
         code_fieldmerge = api.eloqua_create_fieldmerge(
             fieldmerge_name, fieldmerge_json)
     if converter_choice == 'Test Access':
@@ -1106,59 +1247,17 @@ def content_campaign():
         f'\n{Fore.WHITE}           Uses externally hosted Landing Page with Eloqua Form'
     )
 
-    # Creates required assets based on chosen campaign type
+    # Gets approach for required assets
     while True:
         print(f'{Fore.YELLOW}Enter number associated with chosen approach:', end='')
         campaign_choice = input(' ')
-        if campaign_choice == '1':
-            form_html, form_id, form_json = campaign_main_form()
-            main_lp_id, main_lp_url, main_form_id = campaign_main_page(form_id)
-            break
-        elif campaign_choice == '2':
-            main_lp_id, main_lp_url, main_form_id = campaign_main_page()
-            break
-        elif campaign_choice == '3':
-            form_html, main_form_id, form_json = campaign_main_form()
-            main_lp_id, main_lp_url = page.page_gen(
-                source_country, main_form_id)
-            break
-        elif campaign_choice == '4':
-            main_form_id = str(api.get_asset_id('form'))
-            main_lp_url, main_lp_id = helper.external_page_getter()
+        if campaign_choice in ['1', '2', '3', '4']:
             break
-        else:
-            print(f'{Fore.RED}Entered value does not belong to any approach!')
-            campaign_choice = ''
+        print(f'{Fore.RED}Entered value does not belong to any approach!')
 
-    # Creates main e-mail and reminder
-    mail_id, reminder_id = '', ''
+    # Gets decision about main e-mail and reminder
     print(f'\n{Fore.YELLOW}»{Fore.WHITE} Start with e-mail package? {Fore.WHITE}({YES}/{NO}):', end=' ')
-    choice = input('')
-    if choice.lower() == 'y':
-        mail_id, reminder_id = campaign_first_mail(main_lp_url)
-        if not mail_id:
-            return False
-
-    # Creates thank you page
-    ty_page_id = campaign_ty_page(asset_name)
-
-    # Creates asset mail
-    if converter_choice not in ['Test Access', 'Voucher Code']:
-        asset_mail_id = campaign_asset_mail(asset_name, asset_url)
-    elif converter_choice == 'Test Access':
-        asset_mail_id = campaign_demo_mail(asset_url)
-    elif converter_choice == 'Voucher Code':
-        asset_mail_id = campaign_code_mail(
-            asset_name, asset_url, code_fieldmerge)
-
-    # Creates day-before and hour-before reminders for Webinar camapaign
-    if converter_choice == 'Webinar Access':
-        day_before_mail_id, hour_before_mail_id = campaign_webinar_mails(
-            asset_name, asset_url)
-
-    '''
-    =================================================== Create Campaign
-    '''
+    first_mail = input('').lower() == 'y'
 
     # Chosses correct folder ID for campaign
     folder_id = naming[source_country]['id']['campaign'].get(campaign_name[1])
@@ -1169,35 +1268,83 @@ def content_campaign():
         psp_element = campaign_name[4].split('/')[1]
         campaign_code = f'{psp_element}_{campaign_name[5]}'
     else:
+        psp = config.country_lookups(source_country)['psp']
         for part in campaign_name[3].split('-'):
-            if part.startswith(tuple(naming[source_country]['psp'])):
+            if part.startswith(psp):
                 campaign_code.append(part)
         campaign_code = '_'.join(campaign_code)
 
-    # Loads json data for campaign canvas creation and fills it with data
-    if converter_choice in ['E-book', 'Webinar Recording']:
-        campaign_json = ebook_campaign()
-    elif converter_choice == 'Webinar Access':
-        campaign_json = webinar_campaign(
-            day_before_mail_id, hour_before_mail_id)
-    elif converter_choice in ['Test Access', 'Voucher Code']:
-        campaign_json = code_campaign()
-
-    # Creates campaign with given data
-    _, campaign_json = api.eloqua_create_campaign(campaign_name, campaign_json)
-
     '''
-    =================================================== Finished :)
+    =================================================== Builds campaign
     '''
 
+    # Declares every asset with assets it needs, so independent ones are built concurrently
+    def main_page(built):
+        '''
+        Returns main LP ID, main LP URL and main Form ID for chosen approach
+        '''
+        if campaign_choice == '1':
+            return campaign_main_page(built['form'][1])
+        elif campaign_choice == '2':
+            return campaign_main_page()
+        elif campaign_choice == '3':
+            main_lp_code = page.page_gen(source_country, built['form'][1])
+            if not main_lp_code:
+                return False
+            main_lp_id, _, main_lp_url = api.eloqua_create_landingpage(
+                '_'.join(campaign_name[1:4]) + '_LP', main_lp_code)
+            return (main_lp_id, main_lp_url, built['form'][1])
+        main_form_id = str(api.get_asset_id('form'))
+        main_lp_url, main_lp_id = helper.external_page_getter()
+        return (main_lp_id, main_lp_url, main_form_id)
+
+    def asset_mail(built):
+        '''
+        Returns id of e-mail delivering the asset
+        '''
+        if converter_choice == 'Test Access':
+            return campaign_demo_mail(asset_url)
+        elif converter_choice == 'Voucher Code':
+            return campaign_code_mail(asset_name, asset_url, code_fieldmerge)
+        return campaign_asset_mail(asset_name, asset_url)
+
+    def main_mail(built):
+        '''
+        Returns ids of first mail and its reminder or False if there is no mail package
+        '''
+        mail_ids = campaign_first_mail(built['page'][1])
+        if not mail_ids or not mail_ids[0]:
+            return False
+        return mail_ids
+
+    nodes = {}
     if campaign_choice in ['1', '3']:
-        for campaign_step in campaign_json['elements']:
-            if '(FaF)' in campaign_step['name']:
-                from_a_form = campaign_step['id']
+        nodes['form'] = (lambda built: campaign_main_form(), [], False,
+                         lambda form: [('form', form[1])])
+    nodes['page'] = (main_page, ['form'] if campaign_choice in ['1', '3'] else [], True,
+                     lambda lp: [('landingPage', lp[0])] if campaign_choice in ['1', '2', '3'] and lp[0] else [])
+    if first_mail:
+        nodes['first_mail'] = (main_mail, ['page'], True,
+                               lambda mail_ids: [('email', mail_id) for mail_id in mail_ids if mail_id])
+    nodes['ty_page'] = (lambda built: campaign_ty_page(asset_name), [], False,
+                        lambda ty_page_id: [('landingPage', ty_page_id)])
+    nodes['asset_mail'] = (asset_mail, [], False,
+                           lambda asset_mail_id: [('email', asset_mail_id)])
+    if converter_choice == 'Webinar Access':
+        nodes['webinar_mails'] = (lambda built: campaign_webinar_mails(asset_name, asset_url), [], False,
+                                  lambda mail_ids: [('email', mail_id) for mail_id in mail_ids])
+    nodes['canvas'] = (campaign_canvas, [node for node in nodes if node not in ['form', 'ty_page']], False,
+                       lambda canvas: [('campaign', canvas[0])])
+    if campaign_choice in ['1', '3']:
+        nodes['form_update'] = (campaign_form_update, ['form', 'canvas', 'asset_mail', 'ty_page'], True,
+                                lambda form_update: [])
+
+    if not campaign_build(nodes):
+        return False
 
-        # Update confirmation blindform
-        campaign_update_form(form_html, form_id, form_json,
-                             asset_mail_id, ty_page_id, from_a_form)
+    '''
+    =================================================== Finished :)
+    '''
 
     print(f'\n{SUCCESS}Campaign prepared!')
     if converter_choice in ['Test Access', 'Voucher Code']:
@@ -1232,9 +1379,6 @@ def campaign_module(country):
     country_naming_setter(country)
     global campaign_name
 
-    # Compile necessary regex definitions
-    campaign_compile_regex()
-
     # Campaign type chooser
     print(
         f'\n{Fore.GREEN}ELQuent.campaign Campaigns:'
@@ -1242,6 +1386,7 @@ def campaign_module(country):
         f'\n{Fore.WHITE}[{Fore.YELLOW}2{Fore.WHITE}]\t» [{Fore.YELLOW}Basic Canvas{Fore.WHITE}] When you want to send e-mail with reminder'
         f'\n{Fore.WHITE}[{Fore.YELLOW}3{Fore.WHITE}]\t» [{Fore.YELLOW}Alert Canvas{Fore.WHITE}] When you want to send LEX Alert e-mail'
         # f'\n{Fore.WHITE}[{Fore.YELLOW}4{Fore.WHITE}]\t» [{Fore.YELLOW}Content Canvas{Fore.WHITE}] For campaigns with e-books, webinars, codes'
+        f'\n{Fore.WHITE}[{Fore.YELLOW}5{Fore.WHITE}]\t» [{Fore.YELLOW}Batch{Fore.WHITE}] Many simple or alert campaigns from manifest'
         f'\n{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t» [{Fore.YELLOW}Quit to main menu{Fore.WHITE}]'
     )
     while True:
@@ -1266,6 +1411,9 @@ def campaign_module(country):
         #     campaign_name = helper.campaign_name_getter()
         #     content_campaign()
         #     break
+        elif choice == '5':
+            batch_campaign()
+            break
         else:
             print(f'{Fore.RED}Entered value does not belong to any utility!')
             choice = ''
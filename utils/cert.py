@@ -17,7 +17,6 @@ import io
 import re
 import sys
 import csv
-import json
 import webbrowser
 from datetime import datetime
 import PyPDF2
@@ -28,6 +27,7 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import HexColor
 
 # ELQuent imports
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -53,10 +53,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -95,7 +94,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'database': find_data_file('database.csv', directory='incomes'),
         'template': find_data_file('template.pdf', directory='incomes'),
         'certified': find_data_file('certified_users.csv', directory='outcomes'),
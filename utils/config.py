@@ -0,0 +1,102 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.config
+Shared naming convention cache with precomputed lookups for other modules
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import sys
+import json
+import threading
+
+# Globals
+naming_cache = None  # (modification time, naming, {country: lookups})
+naming_lock = threading.Lock()
+
+
+'''
+=================================================================================
+                                File Path Getter
+=================================================================================
+'''
+
+
+def file(file_path):
+    '''
+    Returns file path to naming convention file
+    '''
+
+    def find_data_file(filename, directory='api'):
+        '''
+        Returns correct file path for both script and frozen app
+        '''
+        if directory == 'api':  # For reading api files
+            if getattr(sys, 'frozen', False):
+                datadir = os.path.dirname(sys.executable)
+            else:
+                datadir = os.path.dirname(os.path.dirname(__file__))
+            return os.path.join(datadir, 'utils', directory, filename)
+
+    file_paths = {
+        'naming': find_data_file('naming.json')
+    }
+
+    return file_paths.get(file_path)
+
+
+'''
+=================================================================================
+                                Naming convention
+=================================================================================
+'''
+
+
+def naming_cache_getter():
+    '''
+    Returns cached (modification time, naming, lookups) of naming.json
+    Parses the file again only if it was modified since last load
+    '''
+    global naming_cache
+    modified = os.stat(file('naming')).st_mtime_ns
+    with naming_lock:
+        if naming_cache is None or naming_cache[0] != modified:
+            with open(file('naming'), 'r', encoding='utf-8') as f:
+                naming_cache = (modified, json.load(f), {})
+
+    return naming_cache
+
+
+def naming_getter():
+    '''
+    Returns naming convention dict shared by all modules
+    '''
+    return naming_cache_getter()[1]
+
+
+def country_lookups(country):
+    '''
+    Returns lookups precomputed once per naming.json version for country:
+    - psp: tuple of PSP prefixes for str.startswith
+    - segments: set of segment names
+    - campaign_types: set of campaign types
+    - vsp: set of VSP names
+    '''
+    _, naming, lookups = naming_cache_getter()
+    with naming_lock:
+        if country not in lookups:
+            country_naming = naming.get(country, {})
+            lookups[country] = {
+                'psp': tuple(country_naming.get('psp', [])),
+                'segments': set(country_naming.get('segment', [])),
+                'campaign_types': set(naming.get('campaign', [])),
+                'vsp': set(naming.get('vsp', []))
+            }
+
+    return lookups[country]
@@ -15,11 +15,11 @@ import os
 import re
 import csv
 import sys
-import json
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -45,10 +45,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -81,7 +80,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'database': find_data_file(f'{name}.txt', directory='outcomes')
     }
 
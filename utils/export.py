@@ -21,6 +21,7 @@ from colorama import Fore, init
 
 # ELQuent imports
 import utils.helper as helper
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -46,10 +47,9 @@ def country_naming_setter(country):
     # Prepares globals for imported modules
     helper.country_naming_setter(source_country)
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -88,7 +88,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, 'utils', directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'activity-export': find_data_file(f'WKCORP_ACTIVITY_export.json', directory='templates'),
         'bounceback-def': find_data_file(f'WK{source_country}_bounceback_export.txt', directory='templates'),
         'pageview-def': find_data_file(f'WK{source_country}_pageview_export.txt', directory='templates'),
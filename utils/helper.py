@@ -13,12 +13,12 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 # Python imports
 import os
 import sys
-import json
 from datetime import datetime
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -44,10 +44,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -80,7 +79,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, 'utils', directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'outcome-json': find_data_file(f'WK{source_country}_{name}.json', directory='outcomes')
     }
 
@@ -127,13 +125,14 @@ def campaign_name_getter():
             [campaign_name[2], campaign_name[3].split('-')[0]])
 
         # Value check
+        lookups = config.country_lookups(source_country)
         if campaign_name[0][:2] != 'WK':
             print(f'{ERROR}"{campaign_name[0]}" is not existing country code')
-        elif campaign_name[1] not in naming[source_country]['segment']:
+        elif campaign_name[1] not in lookups['segments']:
             print(f'{ERROR}"{campaign_name[1]}" is not existing segment name')
-        elif campaign_name[2] not in naming['campaign']:
+        elif campaign_name[2] not in lookups['campaign_types']:
             print(f'{ERROR}"{campaign_name[2]}" is not existing campaign type')
-        elif vsp_element not in naming['vsp']:
+        elif vsp_element not in lookups['vsp']:
             print(f'{ERROR}"{campaign_name[4]}" is not existing VSP')
         elif diff_name.startswith('RET_LA') or (campaign_name[1] == 'MSG' and campaign_name[2] == 'NSL'):
             if diff_name in naming[source_country]['mail']['by_name'].keys():
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.index
+Local searchable index of Eloqua asset names and ids
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ELQuent imports
+import utils.api.api as api
+
+# Globals
+index_lock = threading.Lock()
+
+# Seconds for which synced asset type is searched only locally
+INDEX_SYNC_INTERVAL = 5 * 60
+
+# Seconds after which asset type is fully listed again to drop deleted assets
+INDEX_RESYNC_INTERVAL = 24 * 60 * 60
+
+# Version of index database schema, bump it whenever tables change
+INDEX_VERSION = 2
+
+# Maximum of concurrently fetched pages of asset listings
+INDEX_WORKERS = 8
+
+# Page size of minimal depth asset listings
+INDEX_PAGE_SIZE = 500
+
+
+'''
+=================================================================================
+                                File Path Getter
+=================================================================================
+'''
+
+
+def file(file_path):
+    '''
+    Returns file path to asset index database
+    '''
+
+    def find_data_file(filename, directory='api'):
+        '''
+        Returns correct file path for both script and frozen app
+        '''
+        if directory == 'api':  # For reading and writing index files
+            if getattr(sys, 'frozen', False):
+                datadir = os.path.dirname(sys.executable)
+            else:
+                datadir = os.path.dirname(os.path.dirname(__file__))
+            return os.path.join(datadir, 'utils', directory, filename)
+
+    file_paths = {
+        'asset-index': find_data_file('assets.db')
+    }
+
+    return file_paths.get(file_path)
+
+
+'''
+=================================================================================
+                                Index storage
+=================================================================================
+'''
+
+
+def index_connection():
+    '''
+    Returns connection to asset index database, creating its tables if needed
+    '''
+    connection = sqlite3.connect(file('asset-index'))
+    connection.row_factory = sqlite3.Row
+    if connection.execute('PRAGMA user_version').fetchone()[0] != INDEX_VERSION:
+        connection.executescript(f'''
+            DROP TABLE IF EXISTS assets;
+            DROP TABLE IF EXISTS syncs;
+            PRAGMA user_version = {INDEX_VERSION};
+        ''')
+    connection.executescript('''
+        CREATE TABLE IF NOT EXISTS assets (
+            instance TEXT NOT NULL,
+            type TEXT NOT NULL,
+            id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            name_lower TEXT NOT NULL,
+            folder_id TEXT,
+            created_at INTEGER,
+            updated_at INTEGER,
+            PRIMARY KEY (instance, type, id)
+        );
+        CREATE INDEX IF NOT EXISTS assets_name ON assets (instance, type, name_lower);
+        CREATE TABLE IF NOT EXISTS syncs (
+            instance TEXT NOT NULL,
+            type TEXT NOT NULL,
+            watermark INTEGER NOT NULL,
+            synced_at REAL NOT NULL,
+            resynced_at REAL NOT NULL,
+            PRIMARY KEY (instance, type)
+        );
+    ''')
+
+    return connection
+
+
+def index_instance():
+    '''
+    Returns key of Eloqua instance the user is logged in
+    '''
+    return api.eloqua_rest
+
+
+def glob_pattern(query):
+    '''
+    Returns lowercase GLOB pattern of Eloqua search query where * is the only wildcard
+    '''
+    pattern = query.lower().replace('[', '[[]').replace('?', '[?]')
+
+    return pattern
+
+
+'''
+=================================================================================
+                                Index sync
+=================================================================================
+'''
+
+
+def index_sync(asset_type, rebuild=False):
+    '''
+    Requires asset type as in api.asset_names
+    Adds assets created or updated since last sync to index via minimal depth listings
+    Lists all assets again and drops deleted ones if rebuild or INDEX_RESYNC_INTERVAL passed
+    Returns count of indexed assets
+    '''
+    instance = index_instance()
+    with index_lock:
+        connection = index_connection()
+        try:
+            sync = connection.execute('SELECT watermark, resynced_at FROM syncs WHERE instance = ? AND type = ?',
+                                      (instance, asset_type)).fetchone()
+            resync = rebuild or not sync or time.time() - sync['resynced_at'] > INDEX_RESYNC_INTERVAL
+            watermark = 0 if resync else sync['watermark']
+            resynced_at = time.time() if resync else sync['resynced_at']
+
+            # Gets all assets on resync or only assets changed since newest indexed one
+            query = '*' if resync else f"updatedAt>='{watermark}'"
+            first_page = api.eloqua_get_assets(
+                query, asset_type, count=INDEX_PAGE_SIZE, page=1, depth='minimal')
+            pages = -(-int(first_page.get('total', 0)) // INDEX_PAGE_SIZE)
+            assets = list(first_page.get('elements', []))
+            with ThreadPoolExecutor(max_workers=INDEX_WORKERS) as executor:
+                for assets_page in executor.map(
+                        lambda page: api.eloqua_get_assets(
+                            query, asset_type, count=INDEX_PAGE_SIZE, page=page, depth='minimal'),
+                        range(2, pages + 1)):
+                    assets.extend(assets_page.get('elements', []))
+
+            if resync:
+                connection.execute('DELETE FROM assets WHERE instance = ? AND type = ?', (instance, asset_type))
+            connection.executemany('''
+                INSERT OR REPLACE INTO assets
+                (instance, type, id, name, name_lower, folder_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(instance, asset_type, str(asset['id']), asset.get('name', ''), asset.get('name', '').lower(),
+                   asset.get('folderId'), int(asset.get('createdAt', 0)), int(asset.get('updatedAt', 0)))
+                  for asset in assets])
+            watermark = max([watermark] + [int(asset.get('updatedAt', 0)) for asset in assets])
+            connection.execute('INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?, ?)',
+                               (instance, asset_type, watermark, time.time(), resynced_at))
+            connection.commit()
+        finally:
+            connection.close()
+
+    return len(assets)
+
+
+def index_synced_at(asset_type):
+    '''
+    Returns time of last sync of asset type or 0 if it was never synced
+    '''
+    connection = index_connection()
+    try:
+        sync = connection.execute('SELECT synced_at FROM syncs WHERE instance = ? AND type = ?',
+                                  (index_instance(), asset_type)).fetchone()
+    finally:
+        connection.close()
+
+    return sync['synced_at'] if sync else 0
+
+
+def index_remove(asset_type, asset_id):
+    '''
+    Removes asset that no longer exists in Eloqua from index
+    '''
+    with index_lock:
+        connection = index_connection()
+        try:
+            connection.execute('DELETE FROM assets WHERE instance = ? AND type = ? AND id = ?',
+                               (index_instance(), asset_type, str(asset_id)))
+            connection.commit()
+        finally:
+            connection.close()
+
+    return
+
+
+'''
+=================================================================================
+                                Index search
+=================================================================================
+'''
+
+
+def index_search(asset_type, query, created_from=None, created_to=None):
+    '''
+    Requires asset type and name query with optional * wildcards (e.g. 'WKPL_*' or '*webinar*')
+    and optionally range of creation epoch
+    Syncs index if it is older than INDEX_SYNC_INTERVAL or nothing was found locally
+    Returns matching assets from newest as list of dicts with id, name, folderId, createdAt, updatedAt
+    '''
+
+    def search():
+        '''
+        Returns matching assets from local index
+        '''
+        sql = 'SELECT * FROM assets WHERE instance = ? AND type = ? AND name_lower GLOB ?'
+        params = [index_instance(), asset_type, glob_pattern(query)]
+        if created_from is not None:
+            sql += ' AND created_at >= ?'
+            params.append(int(created_from))
+        if created_to is not None:
+            sql += ' AND created_at <= ?'
+            params.append(int(created_to))
+        connection = index_connection()
+        try:
+            rows = connection.execute(sql + ' ORDER BY CAST(id AS INTEGER) DESC', params).fetchall()
+        finally:
+            connection.close()
+
+        return [{
+            'id': row['id'],
+            'name': row['name'],
+            'folderId': row['folder_id'],
+            'createdAt': row['created_at'],
+            'updatedAt': row['updated_at']
+        } for row in rows]
+
+    synced_at = index_synced_at(asset_type)
+    if time.time() - synced_at > INDEX_SYNC_INTERVAL:
+        index_sync(asset_type)
+        return search()
+
+    # Syncs again if asset might have been created since last sync
+    results = search()
+    if not results:
+        index_sync(asset_type)
+        results = search()
+
+    return results
+
+
+def index_confirm(asset_type, asset_id):
+    '''
+    Returns asset of complete depth from Eloqua or False if it no longer exists,
+    removing such asset from index
+    '''
+    try:
+        asset = api.eloqua_asset_get(asset_id, asset_type, depth='complete')
+    except json.decoder.JSONDecodeError:
+        asset = False
+    if isinstance(asset, dict) and asset.get('id'):
+        return asset
+    index_remove(asset_type, asset_id)
+
+    return False
@@ -14,10 +14,16 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 import os
 import re
 import sys
+import json
+import time
+import pickle
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.cache as cache
 import utils.api.api as api
 
 # Initialize colorama
@@ -26,6 +32,12 @@ init(autoreset=True)
 # Globals
 source_country = None
 
+# Maximum of concurrent Eloqua API calls in batch tracking rewrite
+ELOQUA_WORKERS = 8
+
+# Seconds after which all e-mail ids are listed again to drop deleted e-mails from link index
+LINK_INDEX_RESYNC_INTERVAL = 24 * 60 * 60
+
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
 SUCCESS = f'{Fore.WHITE}[{Fore.GREEN}SUCCESS{Fore.WHITE}] '
@@ -45,7 +57,7 @@ def file(file_path, name=''):
     Returns file path to template files
     '''
 
-    def find_data_file(filename):
+    def find_data_file(filename, directory='outcomes'):
         '''
         Returns correct file path for both script and frozen app
         '''
@@ -53,14 +65,19 @@ def file(file_path, name=''):
             datadir = os.path.dirname(sys.executable)
         else:
             datadir = os.path.dirname(os.path.dirname(__file__))
-        return os.path.join(datadir, 'outcomes', filename)
+        if directory == 'api':  # For reading and saving link index
+            return os.path.join(datadir, 'utils', directory, filename)
+        return os.path.join(datadir, directory, filename)
 
     if not name:
         name = f'WK{source_country}_SwappedUTM-Code.txt'
 
     file_paths = {
         'elqtrack': find_data_file(f'{name}.txt'),
-        'utmswap': find_data_file(f'{name}.txt')
+        'utmswap': find_data_file(f'{name}.txt'),
+        'batch-report': find_data_file(f'WK{source_country}_BatchTracking-Report.json'),
+        'audit-report': find_data_file(f'WK{source_country}_LinkAudit-Report.json'),
+        'link-index': find_data_file(f'links{source_country}.p', directory='api')
     }
 
     return file_paths.get(file_path)
@@ -150,30 +167,46 @@ def output_method(code, email_id, name):
 '''
 
 
-def add_elqtrack(code):
+# Matches value of every href attribute in HTML
+link_regex = re.compile(r'href="(.*?)"', re.UNICODE)
+
+# Matches elqTrack and UTM tracking scripts in links
+elq_track_regex = re.compile(r'((\?|&)elqTrack.*?(?=(#|")))', re.UNICODE)
+utm_track_regex = re.compile(r'((\?|&)(kampania|utm).*?)(?=(#|"))', re.UNICODE)
+
+
+def trackable_link(link):
     '''
-    Returns code after appending correctly elqTrack=true to viable links
+    Returns True if link should get tracking scripts
     '''
-    # Gathers all links in HTML
-    links = re.compile(r'href=(".*?")', re.UNICODE)
-    trackable_links = links.findall(code)
-    trackable_links = list(set(trackable_links))
-
-    # Removes untrackable links
-    for link in trackable_links[:]:
-        if not link or 'googleapis' in link or 'emailfield' in link:
-            trackable_links.remove(link)
-
-    # Fixes links in alert mails
-    for link in trackable_links:
-        # Appends new tracking script
-        if '?' in link:
-            code = code.replace(link, (link[:-1] + '&elqTrack=true"'))
-        else:
-            code = code.replace(link, (link[:-1] + '?elqTrack=true"'))
+    return bool(link) and 'googleapis' not in link and 'emailfield' not in link
+
+
+def elqtrack_appender(link):
+    '''
+    Returns link with elqTrack=true appended if it was not tracked yet
+    '''
+    if 'elqTrack=true' in link:
+        return link
+    if '?' in link:
+        return link + '&elqTrack=true'
+
+    return link + '?elqTrack=true'
+
+
+def link_rewriter(code, rewrite):
+    '''
+    Requires code and rewrite function changing single trackable link
+    Returns code with all href links rewritten in a single pass over the code
+    and file storage links swapped to unbranded SSL
+    '''
+    def rewrite_match(match):
+        link = match.group(1)
+        if not trackable_link(link):
+            return match.group()
+        return f'href="{rewrite(link)}"'
 
-    # Clean invalid tracking scripts
-    code = code.replace('"?elqTrack=true"', '""')
+    code = link_regex.sub(rewrite_match, code)
 
     # Swaps file storage links to unbranded SSL
     code = code.replace(
@@ -182,6 +215,23 @@ def add_elqtrack(code):
     return code
 
 
+def add_elqtrack(code):
+    '''
+    Returns code after appending correctly elqTrack=true to viable links
+    '''
+    # Returns cached outcome if the same code was already tracked
+    key = cache.cache_key('add_elqtrack', code)
+    cached_code = cache.cache_get(key)
+    if cached_code is not None:
+        return cached_code
+
+    code = link_rewriter(code, elqtrack_appender)
+
+    cache.cache_set(key, code)
+
+    return code
+
+
 '''
 =================================================================================
                                 Cleaning functions
@@ -199,12 +249,11 @@ def clean_elq_track():
     name, code = name_and_code
 
     # Checks if there is anything to clear
-    elq_track = re.compile(r'((\?|&)elqTrack.*?(?=(#|")))', re.UNICODE)
-    if elq_track.findall(code):
+    if elq_track_regex.findall(code):
         print(
             f'\n{Fore.WHITE}[{Fore.GREEN}SUCCESS{Fore.WHITE}]',
-            f'{Fore.WHITE}Cleaned {len(elq_track.findall(code))} elqTracks and saved to Outcomes folder.')
-        code = elq_track.sub('', code)
+            f'{Fore.WHITE}Cleaned {len(elq_track_regex.findall(code))} elqTracks and saved to Outcomes folder.')
+        code = elq_track_regex.sub('', code)
         code = add_elqtrack(code)
         with open(file('elqtrack', name=name), 'w', encoding='utf-8') as f:
             f.write(code)
@@ -243,14 +292,11 @@ def swap_utm_track(code='', email_id='', name=''):
             name, code = name_and_code
 
         # Cleans ELQ tracking
-        elq_track = re.compile(r'((\?|&)elqTrack.*?(?=(#|")))', re.UNICODE)
-        if elq_track.findall(code):
-            code = elq_track.sub('', code)
+        if elq_track_regex.findall(code):
+            code = elq_track_regex.sub('', code)
 
         # Gets new UTM tracking
-        utm_track = re.compile(
-            r'((\?|&)(kampania|utm).*?)(?=(#|"))', re.UNICODE)
-        if utm_track.findall(code):
+        if utm_track_regex.findall(code):
             break
         else:
             print(f'{ERROR}Chosen e-mail does not have any UTM tracking script')
@@ -262,7 +308,7 @@ def swap_utm_track(code='', email_id='', name=''):
         new_utm = input(' ')
         if not new_utm:
             new_utm = pyperclip.paste()
-        if utm_track.findall(new_utm + '"'):
+        if utm_track_regex.findall(new_utm + '"'):
             break
         print(f'{ERROR}Entered UTM tracking script is incorrect')
 
@@ -270,15 +316,15 @@ def swap_utm_track(code='', email_id='', name=''):
     swapping = ''
     while swapping.lower() != 'y' and swapping.lower() != 'n':
         print(f'\n{Fore.WHITE}Change UTM tracking script?',
-              f'\n{Fore.WHITE}From › {Fore.YELLOW}{(utm_track.findall(code))[0][0]}',
+              f'\n{Fore.WHITE}From › {Fore.YELLOW}{(utm_track_regex.findall(code))[0][0]}',
               f'\n{Fore.WHITE}To › {Fore.YELLOW}{new_utm}',
               f'\n{Fore.WHITE}({YES}/{NO}):', end=' ')
         swapping = input('')
 
     if swapping.lower() == 'y':
         print(
-            f'{Fore.GREEN}» Swapped {len(utm_track.findall(code))} UTM tracking scripts and saved to Outcomes folder.')
-        code = utm_track.sub(new_utm, code)
+            f'{Fore.GREEN}» Swapped {len(utm_track_regex.findall(code))} UTM tracking scripts and saved to Outcomes folder.')
+        code = utm_track_regex.sub(new_utm, code)
         code = add_elqtrack(code)
         with open(file('utmswap', name=name), 'w', encoding='utf-8') as f:
             f.write(code)
@@ -303,6 +349,423 @@ def swap_utm_track(code='', email_id='', name=''):
     return
 
 
+'''
+=================================================================================
+                                Batch tracking rewrite
+=================================================================================
+'''
+
+
+def tracking_rewrite(code, new_utm=''):
+    '''
+    Requires e-mail code and optionally new UTM tracking script
+    Returns code with cleaned elqTrack, swapped UTM and new elqTrack
+    '''
+    code = elq_track_regex.sub('', code)
+    if new_utm:
+        code = utm_track_regex.sub(new_utm, code)
+
+    return add_elqtrack(code)
+
+
+def rewritten_links_counter(old_code, new_code):
+    '''
+    Returns count of href links that differ between old and new code [integer]
+    '''
+    old_links = link_regex.findall(old_code)
+    new_links = link_regex.findall(new_code)
+    if len(old_links) != len(new_links):
+        old_links = set(old_links)
+        return len([link for link in new_links if link not in old_links])
+
+    return sum(old_link != new_link for old_link, new_link in zip(old_links, new_links))
+
+
+def batch_emails_getter(query, executor, depth='complete'):
+    '''
+    Requires Eloqua search query, executor for concurrent page calls and optionally depth
+    Yields e-mails of given depth as pages of results arrive
+    '''
+    first_page = api.eloqua_get_assets(query, asset_type='email', page=1, depth=depth)
+    yield from first_page.get('elements', [])
+
+    # Gets all other pages concurrently
+    pages = -(-int(first_page.get('total', 0)) // int(first_page.get('pageSize', 20)))
+    page_calls = [executor.submit(api.eloqua_get_assets, query, asset_type='email', page=page, depth=depth)
+                  for page in range(2, pages + 1)]
+    for page_call in as_completed(page_calls):
+        yield from page_call.result().get('elements', [])
+
+
+def batch_email_rewrite(email, new_utm):
+    '''
+    Requires e-mail of complete depth and new UTM tracking script
+    Returns (email, new code, count of rewritten links) or None if nothing changed
+    '''
+    html_content = email.get('htmlContent', {})
+    if html_content.get('type') != 'RawHtmlContent' or not html_content.get('html'):
+        return None
+    old_code = html_content['html']
+    new_code = tracking_rewrite(old_code, new_utm)
+    if new_code == old_code:
+        return None
+
+    return (email, new_code, rewritten_links_counter(old_code, new_code))
+
+
+def batch_tracking_rewrite():
+    '''
+    Rewrites tracking scripts in all e-mails matching Eloqua search query
+    Uploads only changed e-mails and saves report to Outcomes folder
+    '''
+    # Gets search query
+    while True:
+        print(
+            f'\n{Fore.WHITE}» [{Fore.YELLOW}QUERY{Fore.WHITE}] Write or copypaste Eloqua search query',
+            f'{Fore.WHITE}(e.g. WK{source_country}_*_NSL*) and click [Enter]')
+        query = input(' ')
+        if not query:
+            query = pyperclip.paste()
+        if query:
+            break
+        print(f'{ERROR}Search query can not be blank')
+
+    # Gets new UTM tracking or only refreshes elqTrack
+    while True:
+        print(
+            f'\n{Fore.WHITE}» Write or copypaste new UTM tracking script and click [Enter]',
+            f'\n{Fore.WHITE}or [S]kip to only refresh elqTrack in links')
+        new_utm = input(' ')
+        if not new_utm:
+            new_utm = pyperclip.paste()
+        if new_utm.lower() == 's':
+            new_utm = ''
+            break
+        if utm_track_regex.findall(new_utm + '"'):
+            break
+        print(f'{ERROR}Entered UTM tracking script is incorrect')
+
+    # Streams e-mails to rewrite workers as pages arrive
+    print(f'\n{Fore.YELLOW}» Rewriting tracking in e-mails ', end='')
+    emails = 0
+    changed_emails = []
+    with ThreadPoolExecutor(max_workers=ELOQUA_WORKERS) as executor:
+        rewrites = []
+        for email in batch_emails_getter(query, executor):
+            emails += 1
+            rewrites.append(executor.submit(batch_email_rewrite, email, new_utm))
+        for rewrite in as_completed(rewrites):
+            if rewrite.result():
+                changed_emails.append(rewrite.result())
+                print(f'{Fore.GREEN}|', end='', flush=True)
+    changed_emails.sort(key=lambda change: int(change[0]['id']))
+    links = sum(change[2] for change in changed_emails)
+    print(f'\n{Fore.WHITE}» Found {Fore.YELLOW}{emails}{Fore.WHITE} e-mails,',
+          f'{Fore.YELLOW}{len(changed_emails)}{Fore.WHITE} to change with',
+          f'{Fore.YELLOW}{links}{Fore.WHITE} rewritten links')
+    if not changed_emails:
+        return
+
+    # Asks for confirmation before touching Eloqua
+    for email, _, email_links in changed_emails[:10]:
+        print(f'{Fore.WHITE}  [{Fore.YELLOW}{email["id"]}{Fore.WHITE}] {email["name"]}',
+              f'{Fore.WHITE}({email_links} links)')
+    if len(changed_emails) > 10:
+        print(f'{Fore.WHITE}  ... and {len(changed_emails) - 10} more')
+    print(f'\n{Fore.WHITE}» Upload changed e-mails to Eloqua? {Fore.WHITE}({YES}/{NO}):', end=' ')
+    if input('').lower() != 'y':
+        return
+
+    # Uploads changed e-mails with bounded concurrency
+    print(f'\n{Fore.YELLOW}» Uploading e-mails ', end='')
+    report = []
+    with ThreadPoolExecutor(max_workers=ELOQUA_WORKERS) as executor:
+        uploads = {executor.submit(api.eloqua_put_email, email, new_code): (email, email_links)
+                   for email, new_code, email_links in changed_emails}
+        for upload in as_completed(uploads):
+            email, email_links = uploads[upload]
+            try:
+                updated = bool(upload.result())
+            except Exception:
+                updated = False
+            print(f'{Fore.GREEN if updated else Fore.RED}|', end='', flush=True)
+            report.append({
+                'id': email['id'],
+                'name': email['name'],
+                'links': email_links,
+                'updated': updated
+            })
+    report.sort(key=lambda entry: int(entry['id']))
+
+    # Saves and prints report
+    updated_emails = [entry for entry in report if entry['updated']]
+    updated_links = sum(entry['links'] for entry in updated_emails)
+    with open(file('batch-report'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'query': query,
+            'utm': new_utm,
+            'emails': emails,
+            'changed': len(updated_emails),
+            'failed': len(report) - len(updated_emails),
+            'links': updated_links,
+            'report': report
+        }, f, ensure_ascii=False, indent=4)
+    print(f'\n{Fore.WHITE}» {SUCCESS}Changed {len(updated_emails)} e-mails with',
+          f'{updated_links} rewritten links, report saved to Outcomes folder')
+    for entry in report:
+        if not entry['updated']:
+            print(f'{ERROR}Could not update E-mail ID {entry["id"]} {entry["name"]}')
+
+    return
+
+
+'''
+=================================================================================
+                                Link audit index
+=================================================================================
+'''
+
+
+# Old file storage domain that should be swapped to unbranded SSL
+OLD_CDN = 'http://images.go.wolterskluwer.com'
+
+
+def link_domain(link):
+    '''
+    Returns lowercase domain of the link or empty string for non-web links
+    '''
+    if link.startswith('//'):
+        link = 'http:' + link
+    elif link.startswith('www'):
+        link = 'http://' + link
+    elif not link.startswith('http'):
+        return ''
+    try:
+        domain = urlsplit(link).hostname or ''
+    except ValueError:
+        return ''
+
+    return domain.lower()
+
+
+def link_index_getter():
+    '''
+    Returns stored link index of source country or empty one
+    '''
+    try:
+        with open(file('link-index'), 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        index = {}
+    if index.get('country') != source_country:
+        index = {
+            'country': source_country,
+            'watermark': 0,  # Newest updatedAt of indexed e-mails
+            'resynced_at': 0,  # Time of last listing of all e-mail ids
+            'emails': {},  # {email id: (name, updatedAt, links)}
+            'links': {},  # {link: set of email ids}
+            'domains': {},  # {domain: set of email ids}
+            'old_cdn': set()  # Email ids still using old file storage links
+        }
+
+    return index
+
+
+def link_index_remove(index, email_id):
+    '''
+    Removes e-mail and its links from link index
+    '''
+    if email_id not in index['emails']:
+        return
+    _, _, links = index['emails'].pop(email_id)
+    for link in links:
+        for index_name, key in (('links', link), ('domains', link_domain(link))):
+            email_ids = index[index_name].get(key)
+            if email_ids is None:
+                continue
+            email_ids.discard(email_id)
+            if not email_ids:
+                del index[index_name][key]
+    index['old_cdn'].discard(email_id)
+
+    return
+
+
+def link_index_add(index, email):
+    '''
+    Adds links of e-mail of complete depth to link index
+    '''
+    email_id = email['id']
+    link_index_remove(index, email_id)
+    code = email.get('htmlContent', {}).get('html', '') or ''
+    links = set(link_regex.findall(code))
+    index['emails'][email_id] = (email.get('name', ''), int(email.get('updatedAt', 0)), links)
+    for link in links:
+        index['links'].setdefault(link, set()).add(email_id)
+        domain = link_domain(link)
+        if domain:
+            index['domains'].setdefault(domain, set()).add(email_id)
+    if OLD_CDN in code:
+        index['old_cdn'].add(email_id)
+    index['watermark'] = max(index['watermark'], int(email.get('updatedAt', 0)))
+
+    return
+
+
+def link_index_update(rebuild=False):
+    '''
+    Indexes links of e-mails updated since last indexing (or all e-mails if rebuild)
+    Drops deleted e-mails after listing all e-mail ids if LINK_INDEX_RESYNC_INTERVAL passed
+    Returns updated link index
+    '''
+    index = link_index_getter()
+    if rebuild:
+        index['emails'].clear()
+        index['links'].clear()
+        index['domains'].clear()
+        index['old_cdn'].clear()
+        index['watermark'] = 0
+    if not index['watermark']:
+        index['resynced_at'] = time.time()
+
+    query = f"name='WK{source_country}*'"
+    print(f'\n{Fore.YELLOW}» Indexing links of e-mails ', end='')
+    start = time.perf_counter()
+    indexed = 0
+    dropped = 0
+    with ThreadPoolExecutor(max_workers=ELOQUA_WORKERS) as executor:
+        # Lists ids of all e-mails with minimal depth to drop deleted ones
+        if time.time() - index.get('resynced_at', 0) > LINK_INDEX_RESYNC_INTERVAL:
+            existing = {email['id'] for email in batch_emails_getter(query, executor, depth='minimal')}
+            for email_id in [email_id for email_id in index['emails'] if email_id not in existing]:
+                link_index_remove(index, email_id)
+                dropped += 1
+            index['resynced_at'] = time.time()
+
+        # Gets only e-mails changed since newest indexed one
+        if index['watermark']:
+            query += f"updatedAt>='{index['watermark']}'"
+        for email in batch_emails_getter(query, executor):
+            link_index_add(index, email)
+            indexed += 1
+    with open(file('link-index'), 'wb') as f:
+        pickle.dump(index, f)
+    print(f'\n{Fore.WHITE}» {SUCCESS}Indexed {indexed} new or changed e-mails',
+          f'and dropped {dropped} deleted ones in',
+          f'{time.perf_counter() - start:.1f}s {Fore.WHITE}({len(index["emails"])} e-mails,',
+          f'{len(index["links"])} unique links, {len(index["domains"])} domains)')
+
+    return index
+
+
+def audit_domain(index, domain):
+    '''
+    Returns ids of e-mails linking to domain or any of its subdomains [set]
+    '''
+    domain = domain.lower().strip().strip('.')
+    email_ids = set(index['domains'].get(domain, set()))
+    for indexed_domain, domain_email_ids in index['domains'].items():
+        if indexed_domain.endswith('.' + domain):
+            email_ids |= domain_email_ids
+
+    return email_ids
+
+
+def audit_link(index, phrase):
+    '''
+    Returns ids of e-mails with links containing phrase [set]
+    '''
+    email_ids = set()
+    for link, link_email_ids in index['links'].items():
+        if phrase in link:
+            email_ids |= link_email_ids
+
+    return email_ids
+
+
+def audit_untracked(index):
+    '''
+    Returns ids of e-mails with trackable web links missing elqTrack [set]
+    '''
+    email_ids = set()
+    for link, link_email_ids in index['links'].items():
+        if trackable_link(link) and link_domain(link) and 'elqTrack=true' not in link:
+            email_ids |= link_email_ids
+
+    return email_ids
+
+
+def audit_old_cdn(index):
+    '''
+    Returns ids of e-mails still using old file storage links [set]
+    '''
+    return set(index['old_cdn'])
+
+
+def link_audit():
+    '''
+    Updates link index and answers audit queries about links in e-mails
+    '''
+    print(f'\n{Fore.WHITE}» Rebuild whole link index instead of update? {Fore.WHITE}({YES}/{NO}):', end=' ')
+    index = link_index_update(rebuild=input('').lower() == 'y')
+
+    audits = {
+        '1': ('Domain', 'E-mails linking to domain'),
+        '2': ('Link', 'E-mails with links containing phrase'),
+        '3': ('elqTrack', 'E-mails with links missing elqTrack'),
+        '4': ('CDN', f'E-mails still using {OLD_CDN}')
+    }
+    while True:
+        print(f'\n{Fore.GREEN}Link audit queries:')
+        for choice, (audit_name, audit_description) in audits.items():
+            print(f'{Fore.WHITE}[{Fore.YELLOW}{choice}{Fore.WHITE}]\t» '
+                  f'[{Fore.YELLOW}{audit_name}{Fore.WHITE}] {audit_description}')
+        print(f'{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t» [{Fore.YELLOW}Quit to main menu{Fore.WHITE}]')
+        print(f'{Fore.YELLOW}Enter number associated with chosen query:', end='')
+        choice = input(' ')
+        if choice.lower() == 'q':
+            break
+        elif choice not in audits:
+            print(f'{Fore.RED}Entered value does not belong to any query!')
+            continue
+
+        phrase = ''
+        if choice in ['1', '2']:
+            print(f'\n{Fore.WHITE}» Write or copypaste {audits[choice][0].lower()} and click [Enter]')
+            phrase = input(' ')
+            if not phrase:
+                phrase = pyperclip.paste()
+            if not phrase:
+                print(f'{ERROR}Query can not be blank')
+                continue
+
+        start = time.perf_counter()
+        if choice == '1':
+            email_ids = audit_domain(index, phrase)
+        elif choice == '2':
+            email_ids = audit_link(index, phrase)
+        elif choice == '3':
+            email_ids = audit_untracked(index)
+        elif choice == '4':
+            email_ids = audit_old_cdn(index)
+        query_time = (time.perf_counter() - start) * 1000
+
+        # Prints and saves found e-mails from newest
+        results = [{'id': email_id, 'name': index['emails'][email_id][0]}
+                   for email_id in sorted(email_ids, key=int, reverse=True)]
+        print(f'\n{Fore.WHITE}» Found {Fore.YELLOW}{len(results)}{Fore.WHITE} e-mails in {query_time:.1f}ms')
+        for result in results[:20]:
+            print(f'{Fore.WHITE}  [{Fore.YELLOW}{result["id"]}{Fore.WHITE}] {result["name"]}')
+        if len(results) > 20:
+            print(f'{Fore.WHITE}  ... and {len(results) - 20} more')
+        with open(file('audit-report'), 'w', encoding='utf-8') as f:
+            json.dump({'query': audits[choice][1], 'phrase': phrase, 'emails': results},
+                      f, ensure_ascii=False, indent=4)
+        print(f'{Fore.WHITE}» {SUCCESS}Report saved to Outcomes folder')
+
+    return
+
+
 '''
 =================================================================================
                                 Link module menu
@@ -321,6 +784,8 @@ def link_module(country):
         f'\n{Fore.GREEN}ELQuent.link Utilites:'
         f'\n{Fore.WHITE}[{Fore.YELLOW}1{Fore.WHITE}]\t» [{Fore.YELLOW}ELQ{Fore.WHITE}] Delete elqTrack code in E-mail links'
         f'\n{Fore.WHITE}[{Fore.YELLOW}2{Fore.WHITE}]\t» [{Fore.YELLOW}UTM{Fore.WHITE}] Swap UTM tracking code in E-mail links'
+        f'\n{Fore.WHITE}[{Fore.YELLOW}3{Fore.WHITE}]\t» [{Fore.YELLOW}Batch{Fore.WHITE}] Swap UTM or refresh elqTrack in all E-mails matching query'
+        f'\n{Fore.WHITE}[{Fore.YELLOW}4{Fore.WHITE}]\t» [{Fore.YELLOW}Audit{Fore.WHITE}] Find E-mails by linked domain, link, missing elqTrack or old CDN'
         f'\n{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t» [{Fore.YELLOW}Quit to main menu{Fore.WHITE}]'
     )
     while True:
@@ -334,6 +799,12 @@ def link_module(country):
         elif choice == '2':
             swap_utm_track()
             break
+        elif choice == '3':
+            batch_tracking_rewrite()
+            break
+        elif choice == '4':
+            link_audit()
+            break
         else:
             print(f'{Fore.RED}Entered value does not belong to any utility!')
             choice = ''
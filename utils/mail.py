@@ -14,10 +14,17 @@ import os
 import re
 import sys
 import json
+import pickle
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.link as link
+import utils.cache as cache
+import utils.config as config
+import utils.template as template
 import utils.api.api as api
 
 # Initialize colorama
@@ -27,6 +34,9 @@ init(autoreset=True)
 naming = None
 source_country = None
 
+# Maximum of concurrent image uploads to Eloqua
+IMAGE_WORKERS = 6
+
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
 WARNING = f'{Fore.WHITE}[{Fore.YELLOW}WARNING{Fore.WHITE}] '
@@ -43,10 +53,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -103,7 +112,7 @@ def file(file_path, file_name='', folder_name=''):
             return os.path.join(datadir, 'incomes', folder_name, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
+        'image-cache': find_data_file('images.p', directory='api'),
         'incomes': find_data_file('incomes', directory='main'),
         'newsletter': find_data_file(f'WK{source_country}_EML_newsletter.txt', directory='templates'),
         'alert-renewal1': find_data_file(f'WK{source_country}_EML_alert-renewal1.txt', directory='templates'),
@@ -194,46 +203,124 @@ def package_chooser():
 '''
 
 
-def link_manipulator(code_file, trackable_links, utm):
+# Matches old UTM tracking elements in link
+utm_element_regex = re.compile(r'(&|)(utm.*?)(?=&|$)', re.UNICODE)
+
+
+def link_manipulator(code_file, utm):
     '''
     Appends PURL, UTM & elqTrack to viable links and changes CDN to SSL Eloqua one
     '''
-    utm_element = re.compile(r'(&|)(utm.*?)(?=(&|"))', re.UNICODE)
-    for link in trackable_links:
-        if 'info.wolterskluwer' in link and link[-2] == '/':
-            code_file = code_file.replace(
-                link, (link[:-1] + '<span class=eloquaemail >PURL_NAME1</span>' + utm + '"'))
-        elif 'info.wolterskluwer' in link and link[-2] != '/':
-            code_file = code_file.replace(
-                link, (link[:-1] + '/<span class=eloquaemail >PURL_NAME1</span>' + utm + '"'))
-        elif utm.lower() != 's':
-            new_link = link
-            # Cleans old tracking script if any
-            if 'utm_' in link:
-                new_link = utm_element.sub('', link)
-                new_link = new_link.replace('?"', '"')
-            # Appends new tracking script
-            if '?' in new_link:
-                code_file = code_file.replace(
-                    link, (new_link[:-1] + '&' + utm[1:] + '&elqTrack=true"'))
-            else:
-                code_file = code_file.replace(
-                    link, (new_link[:-1] + utm + '&elqTrack=true"'))
-        elif utm.lower() == 's':
-            if '?' in link:
-                code_file = code_file.replace(
-                    link, (link[:-1] + '&elqTrack=true"'))
-            else:
-                code_file = code_file.replace(
-                    link, (link[:-1] + '?elqTrack=true"'))
+    # Returns cached outcome if the same code was already tracked with the same UTM
+    key = cache.cache_key('link_manipulator', code_file, utm)
+    cached_code = cache.cache_get(key)
+    if cached_code is not None:
+        return cached_code
 
-    # Swaps file storage links to unbranded SSL
-    code_file = code_file.replace(
-        'http://images.go.wolterskluwer.com', 'https://img06.en25.com')
+    skip_utm = utm.lower() == 's'
+
+    def track_link(old_link):
+        '''
+        Returns link with PURL or new UTM and elqTrack
+        '''
+        if 'info.wolterskluwer' in old_link:
+            purl = '<span class=eloquaemail >PURL_NAME1</span>' + ('' if skip_utm else utm)
+            if old_link.endswith('/'):
+                return old_link + purl
+            return old_link + '/' + purl
+        if skip_utm:
+            return link.elqtrack_appender(old_link)
+
+        # Cleans old tracking script if any
+        new_link = old_link
+        if 'utm_' in old_link:
+            new_link = utm_element_regex.sub('', old_link)
+            if new_link.endswith('?'):
+                new_link = new_link[:-1]
+        # Appends new tracking script
+        if '?' in new_link:
+            return new_link + '&' + utm[1:] + '&elqTrack=true'
+
+        return new_link + utm + '&elqTrack=true'
+
+    code_file = link.link_rewriter(code_file, track_link)
+
+    cache.cache_set(key, code_file)
 
     return code_file
 
 
+'''
+=================================================================================
+                                Image Upload Helper
+=================================================================================
+'''
+
+
+def image_uploader(image_files, folder_name):
+    '''
+    Uploads package images to Eloqua concurrently, each content only once
+    and never again if the same content was already uploaded and still exists
+    Returns {image name: (image link, bool if taken from cache)} without images that failed to upload
+    '''
+
+    def image_exists(image_hash):
+        '''
+        Returns True if cached image of content hash still exists in Eloqua
+        '''
+        try:
+            image = api.eloqua_asset_get(country_cache[image_hash][1], asset_type='image', depth='minimal')
+        except json.decoder.JSONDecodeError:
+            return False
+        return isinstance(image, dict) and bool(image.get('id'))
+
+    # Loads content hash to Eloqua image link and id cache
+    try:
+        with open(file('image-cache'), 'rb') as f:
+            image_cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        image_cache = {}
+    country_cache = image_cache.setdefault(source_country, {})
+
+    # Groups images by hash of their content
+    image_hashes = {}
+    image_contents = {}
+    for image_name in image_files:
+        with open(file('package_file', file_name=image_name, folder_name=folder_name), 'rb') as f:
+            image_content = f.read()
+        image_hash = hashlib.sha256(image_content).hexdigest()
+        image_hashes[image_name] = image_hash
+        image_contents.setdefault(image_hash, (image_name, image_content))
+
+    cached = [image_hash for image_hash in image_contents
+              if isinstance(country_cache.get(image_hash), tuple)]
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as executor:
+        # Drops cached images that were deleted from Eloqua
+        for image_hash, exists in zip(cached, list(executor.map(image_exists, cached))):
+            if not exists:
+                del country_cache[image_hash]
+        cached = [image_hash for image_hash in cached if image_hash in country_cache]
+
+        # Uploads only contents missing in cache, saving cache even if some uploads fail
+        to_upload = [image_hash for image_hash in image_contents if image_hash not in cached]
+        upload_calls = {executor.submit(api.eloqua_post_image, {'file': image_contents[image_hash]}): image_hash
+                        for image_hash in to_upload}
+        try:
+            for upload_call in as_completed(upload_calls):
+                image_hash = upload_calls[upload_call]
+                try:
+                    country_cache[image_hash] = upload_call.result()
+                except (Exception, SystemExit) as error:
+                    country_cache.pop(image_hash, None)
+                    print(f'\n{ERROR}Could not upload {image_contents[image_hash][0]} ({error!r})')
+        finally:
+            with open(file('image-cache'), 'wb') as f:
+                pickle.dump(image_cache, f)
+
+    return {image_name: (country_cache[image_hash][0], image_hash in cached)
+            for image_name, image_hash in image_hashes.items() if image_hash in country_cache}
+
+
 '''
 =================================================================================
                                 Code Output Helper
@@ -349,61 +436,44 @@ def alert_constructor(country, ab_test=False):
     =================================================== Modify package
     '''
 
-    # Gathers all links in HTML
-    links = re.compile(r'href=(".*?")', re.UNICODE)
-    trackable_links = links.findall(mail_html)
-    trackable_links = list(set(trackable_links))
-
-    # Removes untrackable links
-    for link in trackable_links[:]:
-        if not link or 'googleapis' in link or 'emailfield' in link:
-            trackable_links.remove(link)
-
-    # Fixes links in alert mails
-    for link in trackable_links:
-        link = link[1:-1]
-        if 'sip.lex' in link and '#' in link:
-            question_marks = 0
-            for char in link:
-                if char == '?':
-                    question_marks += 1
+    def alert_link(old_link):
+        '''
+        Returns alert link with tracking queries moved after asset part and elqTrack
+        '''
+        new_link = old_link
+        if 'sip.lex' in old_link and '#' in old_link:
+            question_marks = old_link.count('?')
             if question_marks > 0:
-                base_part = link.split('?')[0]
-                tracking_part = link.split('?')[1].split('#')[0]
-                asset_part = link.split('?')[1].split('#')[1]
+                base_part = old_link.split('?')[0]
+                tracking_part = old_link.split('?')[1].split('#')[0]
+                asset_part = old_link.split('?')[1].split('#')[1]
             if question_marks == 2:
-                filter_part = link.split('?')[2]
+                filter_part = old_link.split('?')[2]
                 new_link = f'{base_part}#{asset_part}?{filter_part}&{tracking_part}'
             elif question_marks == 1:
                 new_link = f'{base_part}#{asset_part}?{tracking_part}'
             elif question_marks == 0:
-                print(f'{WARNING}No tracking queries in link: {link}!')
-                new_link = link
+                print(f'{WARNING}No tracking queries in link: {old_link}!')
             else:
-                print(f'{ERROR}Incorrect link in package: {link}!')
-                new_link = link
-        else:
-            new_link = link
-        if 'elqTrack=true' not in link:
-            if '?' in link:
+                print(f'{ERROR}Incorrect link in package: {old_link}!')
+        if 'elqTrack=true' not in old_link:
+            if '?' in old_link:
                 new_link = new_link + '&elqTrack=true'
             else:
                 new_link = new_link + '?elqTrack=true'
-        # Swap old link to new link
-        mail_html = mail_html.replace(
-            f'"{link}"',
-            f'"{new_link}"'
-        )
+
+        return new_link
+
+    # Fixes links in alert mails
+    mail_html = link.link_rewriter(mail_html, alert_link)
 
     # Adds renewal box to LEX Alert
     if 'Zobacz nowości w Twoim systemie LEX' in mail_html:
-        with open(file('alert-renewal2'), 'r', encoding='utf-8') as f:
-            alert_renewal_content = f.read()
+        alert_renewal_content = template.text_getter(file('alert-renewal2'))
         mail_html = mail_html.replace(
             '<!-- Naglowek END -->', alert_renewal_content)
     else:
-        with open(file('alert-renewal1'), 'r', encoding='utf-8') as f:
-            alert_renewal_content = f.read()
+        alert_renewal_content = template.text_getter(file('alert-renewal1'))
         mail_html = mail_html.replace(
             '<!-- Naglowek END -->', alert_renewal_content)
 
@@ -427,7 +497,7 @@ def alert_constructor(country, ab_test=False):
     # Beautify arrow links
     mail_html = mail_html.replace('>>', '»')
 
-    # Swaps file storage links to unbranded SSL
+    # Swaps file storage links to unbranded SSL (also in added renewal box)
     mail_html = mail_html.replace(
         'http://images.go.wolterskluwer.com', 'https://img06.en25.com')
 
@@ -475,10 +545,8 @@ def newsletter_constructor(country):
     '''
 
     # Gets newsletter template & puts the modified body in it
-    with open(file('newsletter'), 'r', encoding='utf-8') as f:
-        newsletter_template = f.read()
-    mail_html = newsletter_template.replace(
-        '<!-- BODY TABLE -->', newsletter_html)
+    mail_html = template.template_filler(
+        file('newsletter'), {'<!-- BODY TABLE -->': newsletter_html})
 
     '''
     =================================================== Modify package
@@ -567,13 +635,16 @@ def mail_constructor(country, campaign=False):
     =================================================== Image getter
     '''
 
-    # Uploads each image and adds swaps relative link to url in code
+    # Uploads all images and adds swaps relative link to url in code
+    if image_files:
+        print(f'\n{Fore.YELLOW}» Uploading {len(image_files)} images', end='', flush=True)
+    image_links = image_uploader(image_files, folder_name)
     for image_name in image_files:
+        if image_name not in image_links:
+            continue
+        image_link, cached = image_links[image_name]
         print(f'\n   {Fore.YELLOW}› {Fore.WHITE}Adding {image_name} to', end='')
-        image = {'file': open(file('package_file',
-                                   file_name=image_name,
-                                   folder_name=folder_name), 'rb')}
-        image_link = api.eloqua_post_image(image)
+        print(f'{Fore.GREEN} › {Fore.WHITE}{"CACHE" if cached else "ELQ"}', end='', flush=True)
 
         if html_files:
             for relative_link in linkable_images_html:
@@ -653,24 +724,11 @@ def mail_constructor(country, campaign=False):
             break
         print(f'{ERROR}Copied code is not correct UTM tracking script')
 
-    # Gathers all links in HTML
-    links = re.compile(r'href=(".*?")', re.UNICODE)
-    if html_files:
-        trackable_links = links.findall(html)
-    elif mjml_files:
-        trackable_links = links.findall(mjml)
-    trackable_links = list(set(trackable_links))
-
-    # Removes untrackable links
-    for link in trackable_links[:]:
-        if not link or 'googleapis' in link or 'emailfield' in link:
-            trackable_links.remove(link)
-
     if html_files:
-        html = link_manipulator(html, trackable_links, utm)
+        html = link_manipulator(html, utm)
 
     if mjml_files:
-        mjml = link_manipulator(mjml, trackable_links, utm)
+        mjml = link_manipulator(mjml, utm)
 
     '''
     =================================================== Swap pre-header
@@ -13,11 +13,16 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 import os
 import re
 import sys
-import json
+import glob
+import time
+import bisect
+import multiprocessing
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.cache as cache
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -43,10 +48,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -85,8 +89,9 @@ def file(file_path, file_name=''):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
-        'mail_html': find_data_file(f'WK{source_country}_{file_name}.txt')
+        'incomes': find_data_file('incomes', directory='main'),
+        'mail_html': find_data_file(f'WK{source_country}_{file_name}.txt'),
+        'batch_html': find_data_file(f'WK{source_country}_{file_name}-minified.html')
     }
 
     return file_paths.get(file_path)
@@ -154,71 +159,116 @@ def output_method(html_code):
 '''
 
 
+# Tags whose surrounding new lines are removed
+MINIFIER_TAGS = 'html|head|style|body|table|tbody|tr|td|th|div'
+
+# Precompiled minifier passes, each one is a single linear scan of the code
+minifier_passes = {
+    'tag_end': (re.compile(rf'({MINIFIER_TAGS})>\s*\n\s*'), r'\1>'),
+    'tag_start': (re.compile(rf'\s*\n\s+<({MINIFIER_TAGS})'), r'<\1'),
+    'attr_newline': (re.compile(r'"\n+\s*'), '" '),
+    'attr_empty': (re.compile(r'(?:alt|title|data-class)=""'), ''),
+    'self_closing': (re.compile(r'" />'), '"/>'),
+    'comment': (re.compile(r'<!--[^\[\]]*?-->'), ''),
+    'mso_start': (re.compile(r'\s*\n*\s*<!--\[if mso \| IE\]>\s*\n\s*'), '\n<!--[if mso | IE]>'),
+    'mso_end': (re.compile(r'\s*\n\s*<!\[endif\]-->\s*\n\s*'), '<![endif]-->\n'),
+    'css_open': (re.compile(r'{\s*\n\s*'), '{'),
+    'css_close': (re.compile(r';\s*\n\s*}\n\s*'), '} '),
+    'css_rule': (re.compile(r';\s*\n\s*'), '; '),
+    'css_block': (re.compile(r'}\n+'), '} '),
+    'whitespace': (re.compile(r' *\n[ \n]*| {2,}'), ' ')
+}
+line_break_regex = re.compile(r'[> ]')
+lengthy_line_regex = re.compile(r'^.{500,}$', re.MULTILINE)
+lengthy_link_regex = re.compile(r'href=\".{40,}?\"|src=\".{40,}?\"')
+
+
 def email_minifier(code):
     '''
     Requires html code of an e-mail
     Returns minified html code of an e-mail
     '''
+    # Returns cached outcome if the same code was already minified
+    key = cache.cache_key('email_minifier', code)
+    cached_code = cache.cache_get(key)
+    if cached_code is not None:
+        return cached_code
+
+    def minify(code, *pass_names):
+        '''
+        Returns code after chosen minifier passes
+        '''
+        for pass_name in pass_names:
+            regex, replacement = minifier_passes[pass_name]
+            code = regex.sub(replacement, code)
+
+        return code
 
     # HTML Minifier
-    html_attr = ['html', 'head', 'style', 'body',
-                 'table', 'tbody', 'tr', 'td', 'th', 'div']
-    for attr in html_attr:
-        code = re.sub(rf'{attr}>\s*\n\s*', f'{attr}>', code)
-        code = re.sub(rf'\s*\n\s+<{attr}', f'<{attr}', code)
-    code = re.sub(r'"\n+\s*', '" ', code)
-    for attr in ['alt', 'title', 'data-class']:
-        code = re.sub(rf'{attr}=""', '', code)
-    code = re.sub(r'" />', '"/>', code)
-    code = re.sub(r'<!--[^\[\]]*?-->', '', code)
-    for attr in html_attr:
-        code = re.sub(rf'{attr}>\s*\n\s*', f'{attr}>', code)
-        code = re.sub(rf'\s*\n\s+<{attr}', f'<{attr}', code)
+    code = minify(code, 'tag_end', 'tag_start', 'attr_newline', 'attr_empty',
+                  'self_closing', 'comment', 'tag_end', 'tag_start')
 
     # Conditional Comment Minifier
-    code = re.sub(
-        r'\s*\n*\s*<!--\[if mso \| IE\]>\s*\n\s*', '\n<!--[if mso | IE]>', code)
-    code = re.sub(
-        r'\s*\n\s*<!\[endif\]-->\s*\n\s*', '<![endif]-->\n', code)
+    code = minify(code, 'mso_start', 'mso_end')
 
     # CSS Minifier
-    code = re.sub(r'{\s*\n\s*', '{', code)
-    code = re.sub(r';\s*\n\s*}\n\s*', '} ', code)
-    code = re.sub(r';\s*\n\s*', '; ', code)
-    code = re.sub(r'}\n+', '} ', code)
+    code = minify(code, 'css_open', 'css_close', 'css_rule', 'css_block')
 
     # Whitespace Minifier
-    code = re.sub(r'\t', '', code)
-    code = re.sub(r'\n+', ' ', code)
-    while '  ' in code:
-        code = re.sub(r' {2,}', ' ', code)
-
-    # Trim lines to maximum of 500 characters
-    count = 0
-    newline_indexes = []
-    for i, letter in enumerate(code):
-        if count > 450:
-            if letter in ['>', ' ']:
-                newline_indexes.append(i)
-                count = 0
-        else:
-            count += 1
-
-    for index in reversed(newline_indexes):
-        output = code[:index+1] + '\n' + code[index+1:]
-        code = output
+    code = code.replace('\t', '')
+    code = minify(code, 'whitespace')
+
+    # Trim lines to maximum of 500 characters by breaking after first '>' or ' '
+    # found once the line is over 450 characters long
+    code_lines = []
+    line_start = 0
+    line_break = line_break_regex.search(code, 451)
+    while line_break:
+        code_lines.append(code[line_start:line_break.end()])
+        line_start = line_break.end()
+        line_break = line_break_regex.search(code, line_break.start() + 452)
+    code_lines.append(code[line_start:])
+    code = '\n'.join(code_lines)
 
     # Takes care of lengthy links that extends line over 500 characters
+    # by moving first link of each lengthy line (and all its copies) to new line,
+    # each copy gets a single new line even if the link starts many lengthy lines
     while True:
-        lengthy_lines_list = re.findall(r'^.{500,}$', code, re.MULTILINE)
-        if not lengthy_lines_list:
+        lengthy_links = {}
+        for line in lengthy_line_regex.findall(code):
+            # Link already starting the line can not shorten it any more
+            for link in lengthy_link_regex.finditer(line):
+                if link.start():
+                    lengthy_links[link.group()] = True
+                    break
+        if not lengthy_links:
+            break
+
+        # Collects new line positions first and rebuilds the code only once,
+        # skipping link copies already cut by new line of previous link
+        new_lines = []
+        for link in lengthy_links:
+            position = code.find(link)
+            while position != -1:
+                next_new_line = bisect.bisect_right(new_lines, position)
+                if next_new_line < len(new_lines) and new_lines[next_new_line] < position + len(link):
+                    position = code.find(link, position + 1)
+                    continue
+                if position and code[position - 1] != '\n':
+                    bisect.insort(new_lines, position)
+                position = code.find(link, position + len(link))
+        if not new_lines:
             break
 
-        lengthy_link_regex = re.compile(r'href=\".{40,}?\"|src=\".{40,}?\"')
-        for line in lengthy_lines_list:
-            lengthy_link_list = re.findall(lengthy_link_regex, line)
-            code = code.replace(
-                lengthy_link_list[0], f'\n{lengthy_link_list[0]}')
+        code_parts = []
+        part_start = 0
+        for position in new_lines:
+            code_parts.append(code[part_start:position])
+            part_start = position
+        code_parts.append(code[part_start:])
+        code = '\n'.join(code_parts)
+
+    cache.cache_set(key, code)
 
     return code
 
@@ -288,6 +338,129 @@ def email_workflow(email_code=''):
     return
 
 
+'''
+=================================================================================
+                                Batch Minifier
+=================================================================================
+'''
+
+
+def batch_minify(job):
+    '''
+    Requires job tuple (name, file path, code) - code is read from path if None
+    Returns (name, original size, minified size, seconds, minified code)
+    Runs in process pool, so it must stay on module level
+    '''
+    name, path, code = job
+    start = time.perf_counter()
+    if code is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+    minified_code = email_minifier(code)
+    seconds = time.perf_counter() - start
+
+    return (name, len(code.encode('utf-8')), len(minified_code.encode('utf-8')),
+            seconds, minified_code)
+
+
+def batch_names(names):
+    '''
+    Returns names safe to use in file names, unique within the batch [list]
+    '''
+    safe_names = []
+    used_names = set()
+    for name in names:
+        # Changes asteriks to ^ and other forbidden characters to - to mitigate Windows limitations
+        safe_name = re.sub(r'[\\/:?"<>|]', '-', name.replace('*', '^'))
+        unique_name = safe_name
+        counter = 2
+        while unique_name.lower() in used_names:
+            unique_name = f'{safe_name}-{counter}'
+            counter += 1
+        used_names.add(unique_name.lower())
+        safe_names.append(unique_name)
+
+    return safe_names
+
+
+def batch_jobs_getter():
+    '''
+    Returns list of batch jobs (name, file path, code) chosen by user
+    from folder, glob pattern or comma separated Eloqua E-mail IDs
+    Names are safe and unique file names, code is None for jobs read from files
+    '''
+    while True:
+        print(
+            f'\n{Fore.WHITE}[{Fore.YELLOW}SOURCE{Fore.WHITE}] » Write folder path, file pattern (e.g. templates/*.html)'
+            f'\n{Fore.WHITE}or Eloqua E-mail IDs separated by comma. Click [Enter] to use Incomes folder:')
+        source = input(' ').strip()
+        if not source:
+            source = file('incomes')
+
+        # Eloqua E-mail IDs
+        email_ids = [email_id.strip() for email_id in source.split(',')]
+        if all(email_id.isdigit() for email_id in email_ids):
+            jobs = []
+            print(f'{Fore.YELLOW}» Getting e-mails ', end='')
+            for email_id in email_ids:
+                name, code = api.eloqua_asset_get(email_id, asset_type='email')
+                jobs.append((f'{email_id}_{name}', '', code or ''))
+                print(f'{Fore.GREEN}|', end='', flush=True)
+            print()
+            return [(safe_name, path, code) for safe_name, (_, path, code)
+                    in zip(batch_names(job[0] for job in jobs), jobs)]
+
+        # HTML files from folder or matching pattern
+        if os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, '*.html')) + \
+                glob.glob(os.path.join(source, '*.htm'))
+        else:
+            paths = glob.glob(source)
+        paths = sorted(path for path in paths if os.path.isfile(path))
+        if paths:
+            names = batch_names(os.path.splitext(os.path.basename(path))[0] for path in paths)
+            return [(name, path, None) for name, path in zip(names, paths)]
+        print(f'{ERROR}No HTML files found!')
+
+
+def batch_workflow():
+    '''
+    Minifies many e-mails at once across process pool
+    Saves minified codes to Outcomes folder and prints summary table
+    '''
+    jobs = batch_jobs_getter()
+
+    # Minifies e-mails in parallel keeping input order of results
+    print(f'\n{Fore.YELLOW}» Minifying {len(jobs)} e-mails ', end='')
+    start = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(min(len(jobs), os.cpu_count() or 1)) as pool:
+        for result in pool.imap(batch_minify, jobs):
+            name, _, _, _, minified_code = result
+            with open(file('batch_html', file_name=name), 'w', encoding='utf-8') as f:
+                f.write(minified_code)
+            results.append(result[:4])
+            print(f'{Fore.GREEN}|', end='', flush=True)
+    total_seconds = time.perf_counter() - start
+
+    # Prints summary table
+    name_width = min(max(len(result[0]) for result in results), 60)
+    print(f'\n\n{Fore.GREEN}{"E-mail":<{name_width}}  {"Original":>9}  {"Minified":>9}  {"Saved":>6}  {"Time":>8}')
+    for name, original_size, minified_size, seconds in results:
+        saved = (original_size - minified_size) / original_size * 100 if original_size else 0
+        print(f'{Fore.WHITE}{name[:name_width]:<{name_width}}  {original_size/1024:>7.1f}kB  '
+              f'{minified_size/1024:>7.1f}kB  {Fore.GREEN}{saved:>5.1f}%  {Fore.WHITE}{seconds*1000:>6.0f}ms')
+    original_total = sum(result[1] for result in results)
+    minified_total = sum(result[2] for result in results)
+    saved_total = (original_total - minified_total) / original_total * 100 if original_total else 0
+    print(f'{Fore.YELLOW}{"Total":<{name_width}}  {original_total/1024:>7.1f}kB  '
+          f'{minified_total/1024:>7.1f}kB  {Fore.GREEN}{saved_total:>5.1f}%  {Fore.YELLOW}{total_seconds*1000:>6.0f}ms')
+
+    print(f'\n{Fore.WHITE}» {SUCCESS}Minified e-mails saved to Outcomes folder')
+
+    return
+
+
 '''
 =================================================================================
                                 Minifier module menu
@@ -307,6 +480,7 @@ def minifier_module(country):
     print(
         f'\n{Fore.GREEN}ELQuent.minifier Utilites:'
         f'\n{Fore.WHITE}[{Fore.YELLOW}1{Fore.WHITE}]\t» [{Fore.YELLOW}E-mail{Fore.WHITE}] Minifies e-mail code'
+        f'\n{Fore.WHITE}[{Fore.YELLOW}2{Fore.WHITE}]\t» [{Fore.YELLOW}Batch{Fore.WHITE}] Minifies all e-mails from folder, file pattern or Eloqua IDs'
         f'\n{Fore.WHITE}[{Fore.YELLOW}Q{Fore.WHITE}]\t» [{Fore.YELLOW}Quit to main menu{Fore.WHITE}]'
     )
     while True:
@@ -317,6 +491,9 @@ def minifier_module(country):
         elif choice == '1':
             email_workflow()
             break
+        elif choice == '2':
+            batch_workflow()
+            break
         else:
             print(f'{Fore.RED}Entered value does not belong to any utility!')
             choice = ''
@@ -14,10 +14,13 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 import os
 import csv
 import sys
-import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
+import utils.index as index
 import utils.api.api as api
 import utils.helper as helper
 
@@ -28,6 +31,9 @@ init(autoreset=True)
 naming = None
 source_country = None
 
+# Maximum of concurrently redirected landing pages
+MODIFIER_WORKERS = 8
+
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
 WARNING = f'{Fore.WHITE}[{Fore.YELLOW}WARNING{Fore.WHITE}] '
@@ -47,10 +53,9 @@ def country_naming_setter(country):
     # Prepares globals for imported modules
     helper.country_naming_setter(source_country)
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -83,7 +88,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, 'utils', directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'outcome-csv': find_data_file(f'WK{source_country}_{name}.csv', directory='outcomes')
     }
 
@@ -135,34 +139,91 @@ def get_completed_campaigns(redirected_campaigns):
     return completed_campaigns
 
 
+def lp_prefix(name):
+    '''
+    Returns lowercase 4-part name prefix shared by campaign and its landing pages
+    '''
+    return '_'.join(name.split('_')[0:4]).lower()
+
+
+def lp_redirector(landing_page):
+    '''
+    Requires landing page from asset index
+    Gets its full HTML, adds redirect script to the <head> tag and updates it in Eloqua
+    Returns (landing page, outcome) where outcome is None for already redirected
+    or no longer existing landing page and result of the update otherwise
+    '''
+    landing_page = index.index_confirm('landingPage', landing_page['id'])
+
+    # Skips adding redirection if there is one already
+    if not landing_page or 'window.location.replace' in landing_page['htmlContent'].get('html', ''):
+        return (landing_page, None)
+
+    # Builds valid redirect link string
+    redirect_link = naming[source_country]['id']['redirect']\
+        + f'?utm_source={landing_page.get("name")}&utm_medium=redirect'
+    redirect_link = f'<head><script>window.location.replace("{redirect_link}")</script>'
+
+    # Gets and modifies code of the LP with redirect link
+    landing_page_html = landing_page['htmlContent'].get('html')
+    landing_page_html = landing_page_html.replace(
+        r'<head>', redirect_link,
+    )
+
+    # Build landing page data
+    data = {
+        'id': landing_page.get('id'),
+        'name': landing_page.get('name'),
+        'description': 'ELQuent API » Redirected',
+        'folderId': landing_page.get('folderId'),
+        'micrositeId': landing_page.get('micrositeId'),
+        'relativePath': landing_page.get('relativePath'),
+        'htmlContent': {
+            'type': 'RawHtmlContent',
+            'html': landing_page_html
+        }
+    }
+
+    # Upload modified LP
+    landing_page_modification = api.eloqua_put_landingpage(
+        landing_page.get('id'), data)
+
+    return (landing_page, landing_page_modification)
+
+
 def put_modified_lp(completed_campaigns):
     '''
     Required completed_campaigns list of campaign ['id', 'name']
 
     Finds all Landing Pages connected to campaigns from completed_campaigns list
+    by joining them on 4-part name prefix with all country Landing Pages from asset index
     Adds redirect script to the <head> tag and updates HTML in Eloqua
 
     Returns  a string with comma-separated id for every redirected campaign
     '''
     redirected_campaigns_string = ''
 
-    print(f'\n\n{Fore.WHITE}[{Fore.YELLOW}MODIFY{Fore.WHITE}] ')
-    for campaign in completed_campaigns:
-        # Create search query to get all LPs connected to campaign
-        campaign_name = campaign[1]
-        search_query = campaign_name.split('_')
-        search_query = ('_').join(search_query[0:4]) + '*'
-        print(f'{Fore.WHITE}[{Fore.YELLOW}Campaign{Fore.WHITE}] › '
-              f'{Fore.YELLOW}{campaign_name}')
-
-        # Iterates over pages of outcomes
-        page = 1
-        while True:
-            # Gets full data on landing page
-            landing_pages = api.eloqua_get_assets(
-                search_query, asset_type='landingPage', page=page)
-
-            if not landing_pages['elements']:
+    # Groups all country landing pages by 4-part name prefix » {prefix: [landing pages]}
+    print(f'\n{Fore.WHITE}[{Fore.YELLOW}SYNC{Fore.WHITE}] Landing Pages', end='', flush=True)
+    landing_pages_by_prefix = defaultdict(list)
+    for landing_page in index.index_search('landingPage', f'WK{source_country}*'):
+        landing_pages_by_prefix[lp_prefix(landing_page['name'])].append(landing_page)
+
+    # Gets full HTML and redirects landing pages of all campaigns concurrently
+    campaign_landing_pages = [
+        (campaign, landing_pages_by_prefix.get(lp_prefix(campaign[1]), []))
+        for campaign in completed_campaigns
+    ]
+    with ThreadPoolExecutor(max_workers=MODIFIER_WORKERS) as executor:
+        redirects = executor.map(lp_redirector, [
+            landing_page for _, landing_pages in campaign_landing_pages for landing_page in landing_pages])
+
+        print(f'\n\n{Fore.WHITE}[{Fore.YELLOW}MODIFY{Fore.WHITE}] ')
+        for campaign, landing_pages in campaign_landing_pages:
+            print(f'{Fore.WHITE}[{Fore.YELLOW}Campaign{Fore.WHITE}] › '
+                  f'{Fore.YELLOW}{campaign[1]}')
+
+            if not landing_pages:
                 print(
                     f'  {Fore.WHITE}[{Fore.YELLOW}LP{Fore.WHITE}] » {Fore.YELLOW}Landing Page not found')
                 # Write modifier outcome to csv file
@@ -170,45 +231,17 @@ def put_modified_lp(completed_campaigns):
                     writer = csv.writer(f)
                     writer.writerow([campaign[0], campaign[1],
                                      'not found', 'not found', False])
-                break
+                continue
 
-            for landing_page in landing_pages['elements']:
-                # Skips adding redirection if there is one already
-                if 'window.location.replace' in landing_page['htmlContent'].get('html'):
+            for _ in landing_pages:
+                landing_page, landing_page_modification = next(redirects)
+                if landing_page_modification is None:
                     continue
 
                 landing_page_ending = landing_page.get("name").split('_')[-1]
                 print(f'  {Fore.WHITE}[{Fore.YELLOW}LP{Fore.WHITE}] {Fore.YELLOW}» '
                       f'{Fore.WHITE}ID: {landing_page.get("id")} {Fore.YELLOW}› '
                       f'{Fore.WHITE}_{landing_page_ending}', end=' ')
-                # Builds valid redirect link string
-                redirect_link = naming[source_country]['id']['redirect']\
-                    + f'?utm_source={landing_page.get("name")}&utm_medium=redirect'
-                redirect_link = f'<head><script>window.location.replace("{redirect_link}")</script>'
-
-                # Gets and modifies code of the LP with redirect link
-                landing_page_html = landing_page['htmlContent'].get('html')
-                landing_page_html = landing_page_html.replace(
-                    r'<head>', redirect_link,
-                )
-
-                # Build landing page data
-                data = {
-                    'id': landing_page.get('id'),
-                    'name': landing_page.get('name'),
-                    'description': 'ELQuent API » Redirected',
-                    'folderId': landing_page.get('folderId'),
-                    'micrositeId': landing_page.get('micrositeId'),
-                    'relativePath': landing_page.get('relativePath'),
-                    'htmlContent': {
-                        'type': 'RawHtmlContent',
-                        'html': landing_page_html
-                    }
-                }
-
-                # Upload modified LP
-                landing_page_modification = api.eloqua_put_landingpage(
-                    landing_page.get('id'), data)
 
                 # Write modifier outcome to csv file
                 with open(file('outcome-csv', f'redirected-campaigns'), 'a', encoding='utf-8') as f:
@@ -220,18 +253,8 @@ def put_modified_lp(completed_campaigns):
                                      landing_page_modification])
                 print(f'{SUCCESS}')
 
-            # Stops iteration when full list is obtained
-            if landing_pages['total'] - page * 20 < 0:
-                # Adds ID to a string containg all redirected campaigns
-                redirected_campaigns_string += ',' + campaign[0]
-                break
-
-            # Else increments page to get next part of outcomes
-            page += 1
-
-            # Every ten batches draws hyphen for better readability
-            if page % 10 == 0:
-                print(f'{Fore.YELLOW}-', end='', flush=True)
+            # Adds ID to a string containg all redirected campaigns
+            redirected_campaigns_string += ',' + campaign[0]
 
     return redirected_campaigns_string
 
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.monitor
+Headless health checks of Voucher App and webinar uploads for cron or daemon runs
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import contextlib
+from datetime import datetime
+from colorama import Fore, init
+
+# ELQuent imports
+import utils.validator as validator
+import utils.webinar as webinar
+import utils.config as config
+import utils.api.api as api
+
+# Initialize colorama
+init(autoreset=True)
+
+# Globals
+naming = None
+source_country = None
+
+# Exit codes of monitoring run
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+# Predefined messege elements
+ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
+SUCCESS = f'{Fore.WHITE}[{Fore.GREEN}SUCCESS{Fore.WHITE}] '
+
+
+def country_naming_setter(country):
+    '''
+    Sets source_country for all functions
+    Loads json file with naming convention
+    '''
+    global source_country
+    source_country = country
+
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
+
+
+'''
+=================================================================================
+                            File Path Getter
+=================================================================================
+'''
+
+
+def file(file_path):
+    '''
+    Returns file path to template files
+    '''
+
+    def find_data_file(filename, directory='api'):
+        '''
+        Returns correct file path for both script and frozen app
+        '''
+        if directory == 'api':  # For reading api files and saving stats
+            if getattr(sys, 'frozen', False):
+                datadir = os.path.dirname(sys.executable)
+            else:
+                datadir = os.path.dirname(os.path.dirname(__file__))
+            return os.path.join(datadir, 'utils', directory, filename)
+
+    file_paths = {
+        'country': find_data_file('country.p'),
+        'click': find_data_file('click.p'),
+        'key': find_data_file('key.p'),
+        'stats': find_data_file('monitor.json')
+    }
+
+    return file_paths.get(file_path)
+
+
+'''
+=================================================================================
+                                Health checks
+=================================================================================
+'''
+
+
+def voucher_check():
+    '''
+    Validates Voucher App in checklisted campaigns
+    Returns (passed bool, detail dict)
+    '''
+    validator.country_naming_setter(source_country)
+    passed = validator.voucher_validation()
+
+    return (passed, {})
+
+
+def webinar_check():
+    '''
+    Uploads new webinar attendees as External Activities
+    Returns (passed bool, detail dict)
+    '''
+    if not os.path.isfile(file('click')):
+        raise RuntimeError('No stored ClickMeeting API Key')
+    webinar.country_naming_setter(source_country)
+
+    # Gets date of last webinar sync
+    last_webinar_sync = api.eloqua_asset_get(
+        naming[source_country]['id']['webinar_sync'], 'sharedContent', depth='complete')
+    last_webinar_sync = last_webinar_sync['contentHtml']
+    sync_date = datetime.strptime(last_webinar_sync, '%Y-%m-%d %H:%M')
+    sync_delta = datetime.today() - sync_date
+
+    activities = webinar.click_to_activity(last_webinar_sync)
+
+    return (True, {'last_sync': last_webinar_sync,
+                   'days_since_sync': sync_delta.days,
+                   'activities': activities})
+
+
+checks = {
+    'voucher': voucher_check,
+    'webinar': webinar_check
+}
+
+
+'''
+=================================================================================
+                                Latency stats
+=================================================================================
+'''
+
+
+def stats_update(check_name, latency, status):
+    '''
+    Updates per-check latency stats stored in monitor.json
+    Returns stats of given check [dict]
+    '''
+    try:
+        with open(file('stats'), 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        stats = {}
+
+    check_stats = stats.get(check_name, {
+        'runs': 0, 'failures': 0, 'total': 0.0, 'min': latency, 'max': latency
+    })
+    check_stats['runs'] += 1
+    if status != 'ok':
+        check_stats['failures'] += 1
+    check_stats['total'] = round(check_stats['total'] + latency, 3)
+    check_stats['min'] = min(check_stats['min'], latency)
+    check_stats['max'] = max(check_stats['max'], latency)
+    check_stats['mean'] = round(check_stats['total'] / check_stats['runs'], 3)
+    check_stats['last'] = latency
+    stats[check_name] = check_stats
+
+    with open(file('stats'), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=4)
+
+    return check_stats
+
+
+'''
+=================================================================================
+                                Monitoring run
+=================================================================================
+'''
+
+
+def run_checks(chosen_checks):
+    '''
+    Runs chosen checks with their console output moved to stderr
+    Prints one JSON line per check to stdout
+    Returns exit code of the run [integer]
+    '''
+    exit_code = EXIT_OK
+    for check_name in chosen_checks:
+        result = {
+            'check': check_name,
+            'country': source_country,
+            'started': datetime.now().isoformat(timespec='seconds')
+        }
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                passed, detail = checks[check_name]()
+            result['status'] = 'ok' if passed else 'failed'
+            result.update(detail)
+        except (Exception, SystemExit) as error:
+            result['status'] = 'error'
+            result['error'] = f'{type(error).__name__}: {error}'
+        latency = round(time.perf_counter() - start, 3)
+        result['latency'] = latency
+        result['stats'] = stats_update(check_name, latency, result['status'])
+        print(json.dumps(result), flush=True)
+
+        if result['status'] == 'error':
+            exit_code = EXIT_ERROR
+        elif result['status'] == 'failed' and exit_code == EXIT_OK:
+            exit_code = EXIT_FAILED
+
+    return exit_code
+
+
+def store_key():
+    '''
+    Saves Eloqua key used by headless runs to key.p
+    '''
+    api.get_eloqua_auth(source_country)
+    pickle.dump(api.eloqua_key, open(file('key'), 'wb'))
+    print(f'\n{SUCCESS}Eloqua key stored for headless runs')
+
+    return
+
+
+'''
+=================================================================================
+                            Monitor module entry
+=================================================================================
+'''
+
+
+def monitor_module(arguments):
+    '''
+    Runs chosen checks once or every --interval minutes without any prompts
+    Returns exit code of the last run [integer]
+    '''
+    parser = argparse.ArgumentParser(
+        prog='elquent.py monitor',
+        description='Runs ELQuent health checks without user interaction')
+    parser.add_argument('checks', nargs='*',
+                        help=f'checks to run: {", ".join(checks)} (default: all)')
+    parser.add_argument('--country', help='source country (default: stored one)')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='repeat every given minutes instead of single run')
+    parser.add_argument('--store-key', action='store_true',
+                        help='log in once and store Eloqua key for headless runs')
+    args = parser.parse_args(arguments)
+    unknown_checks = [check for check in args.checks if check not in checks]
+    if unknown_checks:
+        parser.error(f'unknown checks: {", ".join(unknown_checks)}')
+
+    # Source country is taken from argument or stored choice
+    country = args.country
+    if not country and os.path.isfile(file('country')):
+        country = pickle.load(open(file('country'), 'rb'))
+    if not country:
+        print(f'{ERROR}No stored source country, use --country', file=sys.stderr)
+        return EXIT_ERROR
+    country_naming_setter(country)
+
+    if args.store_key:
+        store_key()
+        return EXIT_OK
+
+    # Uses cached Eloqua key as there is no user to type password
+    if not api.get_eloqua_auth(source_country, cached=True):
+        print(f'{ERROR}No valid stored Eloqua key, run with --store-key '
+              f'or set ELQUENT_KEY', file=sys.stderr)
+        return EXIT_ERROR
+
+    chosen_checks = args.checks or list(checks.keys())
+    while True:
+        exit_code = run_checks(chosen_checks)
+        if not args.interval:
+            return exit_code
+        time.sleep(args.interval * 60)
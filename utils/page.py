@@ -14,11 +14,12 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 import os
 import re
 import sys
-import json
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
+import utils.template as template
 import utils.api.api as api
 
 # Initialize colorama
@@ -44,10 +45,9 @@ def country_naming_setter(country):
     global source_country
     source_country = country
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -86,7 +86,6 @@ def file(file_path, name='LP'):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'jquery': find_data_file('WKCORP_LP_jquery.txt'),
         'blank-lp': find_data_file(f'WK{source_country}_LP_blank.txt'),
         'lp-template': find_data_file(f'WK{source_country}_LP_template.txt'),
@@ -148,8 +147,7 @@ def create_landing_page():
 
         else:  # Gets code from template file
             templates = ['blank-lp', 'lp-template']
-            with open(file(templates[choice]), 'r', encoding='utf-8') as f:
-                lp_code = f.read()
+            lp_code = template.text_getter(file(templates[choice]))
 
         return lp_code
 
@@ -174,8 +172,7 @@ def create_landing_page():
         regex_showhide_exists = re.compile(r'\.read-more-state', re.UNICODE)
         if not regex_showhide_exists.findall(lp_code):
             print(f'\t{Fore.CYAN}» Adding ShowHide CSS')
-            with open(file('showhide-css'), 'r', encoding='utf-8') as f:
-                css = f.read()
+            css = template.text_getter(file('showhide-css'))
             regex_showhide = re.compile(r'</style>', re.UNICODE)
             lp_code = regex_showhide.sub(css, lp_code, 1)
 
@@ -270,12 +267,10 @@ def modify_form(existing_form_id=''):
 
         if swapping.lower() == 'y':
             # Prepare lead-by-phone snippet with correct values
-            with open(file('lead-by-phone'), 'r', encoding='utf-8') as f:
-                snippet = f.read()
-            # Replace placeholder with correct name
-            snippet = snippet.replace('<FIELD_NAME>', phone_field[0])
-            # Replace placeholder with correct ID
-            snippet = snippet.replace('<FIELD_ID>', phone_field[1])
+            snippet = template.template_filler(file('lead-by-phone'), {
+                '<FIELD_NAME>': phone_field[0],
+                '<FIELD_ID>': phone_field[1]
+            })
 
             # Swap phone field with lead-by-phone mechanism, regex returns list of single tuple ('code', '</div>')
             regex_phone_div = re.compile(
@@ -288,12 +283,9 @@ def modify_form(existing_form_id=''):
             phone_validation = regex_phone_validation.findall(
                 form)[0]  # Deconstruction from list of single element
 
-            # Open phone validation snippet
-            with open(file('phone-required'), 'r', encoding='utf-8') as f:
-                phone_validation_snippet = f.read()
-                # Replace placeholder with correct ID
-                phone_validation_snippet = phone_validation_snippet.replace(
-                    '<FIELD_ID>', phone_field[1])
+            # Open phone validation snippet with correct ID
+            phone_validation_snippet = template.template_filler(
+                file('phone-required'), {'<FIELD_ID>': phone_field[1]})
 
             # Append extension to existing field validation
             extended_phone_validation = phone_validation + \
@@ -328,8 +320,7 @@ def modify_form(existing_form_id=''):
             submit_div = regex_submit.findall(form)[0]
 
             # Prepare GDPR information
-            with open(file('gdpr-info'), 'r', encoding='utf-8') as f:
-                snippet = f.read()
+            snippet = template.text_getter(file('gdpr-info'))
 
             # Append GDPR information above submit button
             form = form.replace(submit_div[0], submit_div[0] + snippet)
@@ -457,8 +448,7 @@ def swap_form(code, form):
     # Changes CSS of submit button
     regex_submit_css = re.compile(
         r'.elq-form input\[type=submit\][\s\S\n]*?}', re.UNICODE)
-    with open(file('submit-button'), 'r', encoding='utf-8') as f:
-        submit_css = f.read()
+    submit_css = template.text_getter(file('submit-button'))
     code = regex_submit_css.sub(submit_css, code)
 
     # Fixes margin on checkboxes
@@ -514,8 +504,7 @@ def javascript(code):
             code = search_jquery.sub('', code)
 
         # Adds new jquery import to make sure it is appropriate version and placed right
-        with open(file('jquery'), 'r', encoding='utf-8') as f:
-            jquery = f.read()
+        jquery = template.text_getter(file('jquery'))
         regex_jquery = re.compile(r'(<script)', re.UNICODE)
         code = regex_jquery.sub(jquery, code, 1)
         print(f'\t{Fore.GREEN} » Adding jQuery import')
@@ -534,8 +523,7 @@ def javascript(code):
 
         # Checks if the modern code is already in the page
         if '("#lead_div").show' not in code:
-            with open(file('showhide-lead'), 'r', encoding='utf-8') as f:
-                lead_script = f.read()
+            lead_script = template.text_getter(file('showhide-lead'))
             code = code.replace('</body>', lead_script, 1)
 
         return code
@@ -550,8 +538,7 @@ def javascript(code):
             r'<script.+?livevalidation_standalone.compressed.js.+?</script>', re.UNICODE)
         validation_import = regex_validation.findall(code)
         if validation_import:
-            with open(file('live-validation'), 'r', encoding='utf-8') as f:
-                snippet = f.read()
+            snippet = template.text_getter(file('live-validation'))
             code = code.replace(validation_import[0], snippet)
 
         return code
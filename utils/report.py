@@ -15,13 +15,13 @@ import os
 import re
 import sys
 import csv
-import json
 from datetime import datetime
 from colorama import Fore, Style, init
 
 # ELQuent imports
 import utils.helper as helper
-import utils.api.api as api
+import utils.config as config
+import utils.index as index
 
 # Initialize colorama
 init(autoreset=True)
@@ -49,10 +49,9 @@ def country_naming_setter(country):
     # Prepares globals for imported modules
     helper.country_naming_setter(source_country)
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -85,7 +84,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, 'utils', directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'outcome-csv': find_data_file(f'Report_{name}.csv', directory='outcomes'),
     }
 
@@ -149,19 +147,16 @@ def report_nameframe():
 
 def report_search_query():
     '''
-    Returns search query for reporting
+    Returns e-mails in reporting scope found in local asset index
     '''
     while True:
         unix_start, unix_end, report_start_date, report_end_date = report_timeframe()
         nameframe = report_nameframe()
 
-        # Builds search query for API
-        search_query = f"name='*{nameframe}*'createdAt>='{unix_start}'createdAt<='{unix_end}'"
-
-        # Counts results
-        search_results = api.eloqua_get_assets(
-            search_query, asset_type='email', count=1, depth='minimal')
-        total_results = search_results['total']
+        # Finds e-mails by name and creation date in local asset index
+        emails = index.index_search(
+            'email', f'*{nameframe}*', created_from=unix_start, created_to=unix_end)
+        total_results = len(emails)
 
         print(f'\n{Fore.WHITE}» Found {Fore.YELLOW}{total_results}{Fore.WHITE} e-mails.',
               f'{Fore.WHITE}Continue? ({YES}/{NO}):', end=' ')
@@ -171,7 +166,7 @@ def report_search_query():
         else:
             continue
 
-    return (search_query, nameframe, report_start_date, report_end_date)
+    return (emails, nameframe, report_start_date, report_end_date)
 
 
 '''
@@ -186,46 +181,25 @@ def full_report():
     Crates list with links to  Eloqua report for each e-mail in chosen scope
     '''
 
-    # Gets confirmed search query from user
-    search_query, nameframe, report_start_date, report_end_date = report_search_query()
+    # Gets confirmed e-mails from user
+    emails, nameframe, report_start_date, report_end_date = report_search_query()
+
+    # Gets instance url for link creation
+    instance_url = naming['root'][:-10]
 
-    # Creates file to save outcomes
+    # Saves data of e-mails from local asset index to file
     with open(file('outcome-csv', f'full-{nameframe}-{report_start_date}-{report_end_date}'), 'w', encoding='utf-8') as f:
         fieldnames = ['Name', 'ID', 'CreatedAt', 'Report']
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-
-    # Gets instance url for link creation
-    instance_url = naming['root'][:-10]
-
-    page = 1
-    print(f'{Fore.WHITE}[{Fore.YELLOW}SYNC{Fore.WHITE}] ', end='', flush=True)
-    while True:
-        emails = api.eloqua_get_assets(
-            search_query, asset_type='email', page=page, depth='minimal')
-
-        # Creates list with data from API
-        for email in emails['elements']:
-            email_info = {
+        for email in emails:
+            writer.writerow({
                 'Name': email['name'],
                 'ID': int(email['id']),
                 'CreatedAt': datetime.utcfromtimestamp(
                     int(email['createdAt'])).strftime('%Y-%m-%d %H:%M:%S'),
                 'Report': f'{instance_url}/Analytics/Dashboard/EmailDetail?EmailId={email["id"]}'
-            }
-
-            # Append batch of data to file
-            with open(file('outcome-csv', f'full-{nameframe}-{report_start_date}-{report_end_date}'), 'a', encoding='utf-8') as f:
-                fieldnames = ['Name', 'ID', 'CreatedAt', 'Report']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writerow(email_info)
-
-        # Clears dict for next batch
-        email_info = {}
-
-        # Stops iteration when full list is obtained
-        if emails['total'] - page * 500 < 0:
-            break
+            })
 
     print(f'\n\n{SUCCESS}E-mail Report for {Fore.YELLOW}{nameframe} {Fore.WHITE}({Fore.YELLOW}{report_start_date}'
           f'{Fore.WHITE} - {Fore.YELLOW}{report_end_date}{Fore.WHITE}) saved to Outcomes folder')
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3.6
+# -*- coding: utf8 -*-
+
+'''
+ELQuent.template
+Compiled template registry for campaign, page and mail templates
+
+Mateusz Dąbrowski
+github.com/MateuszDabrowski
+linkedin.com/in/mateusz-dabrowski-marketing/
+'''
+
+# Python imports
+import os
+import re
+import json
+import copy
+import threading
+from functools import lru_cache
+
+# Globals
+template_cache = {}  # {(kind, path, placeholders): (modification time, compiled template)}
+template_lock = threading.Lock()
+
+# Uppercase token with underscores (e.g. MAIL_ID) standing as placeholder in json templates
+PLACEHOLDER_TOKEN = re.compile(r'(?<![A-Za-z0-9_./-])[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)+(?![A-Za-z0-9_./-])')
+
+
+'''
+=================================================================================
+                                Template compilers
+=================================================================================
+'''
+
+
+@lru_cache(maxsize=64)
+def placeholder_regex(placeholders):
+    '''
+    Requires tuple of placeholders
+    Returns regex matching any of them, longest first to not break longer ones
+    '''
+    placeholders = sorted(placeholders, key=len, reverse=True)
+
+    return re.compile('(' + '|'.join(re.escape(placeholder) for placeholder in placeholders) + ')')
+
+
+def code_compiler(code, placeholders):
+    '''
+    Requires code and tuple of its placeholders
+    Returns list of code parts where every odd element is a placeholder
+    '''
+    if not placeholders:
+        return [code]
+
+    return placeholder_regex(placeholders).split(code)
+
+
+def json_placeholders(data):
+    '''
+    Requires parsed json
+    Returns placeholder tokens found in all its keys and strings [frozenset]
+    '''
+    placeholders = set()
+
+    def walk(element):
+        '''
+        Adds placeholder tokens of json element to placeholders
+        '''
+        if isinstance(element, str):
+            placeholders.update(PLACEHOLDER_TOKEN.findall(element))
+        elif isinstance(element, dict):
+            for key, value in element.items():
+                placeholders.update(PLACEHOLDER_TOKEN.findall(key))
+                walk(value)
+        elif isinstance(element, list):
+            for value in element:
+                walk(value)
+
+    walk(data)
+
+    return frozenset(placeholders)
+
+
+def template_compiler(kind, path, placeholders=()):
+    '''
+    Requires kind of compilation ('text', 'parts' or 'json'), template path
+    and for 'parts' a tuple of placeholders
+    Returns compiled template, reading the file again only if it was modified
+    (for 'json' a tuple of parsed json and its placeholder tokens)
+    '''
+    modified = os.stat(path).st_mtime_ns
+    key = (kind, path, placeholders)
+    with template_lock:
+        cached = template_cache.get(key)
+        if cached and cached[0] == modified:
+            return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if kind == 'json':
+            compiled = json.load(f)
+            compiled = (compiled, json_placeholders(compiled))
+        elif kind == 'parts':
+            compiled = code_compiler(f.read(), placeholders)
+        else:
+            compiled = f.read()
+    with template_lock:
+        template_cache[key] = (modified, compiled)
+
+    return compiled
+
+
+'''
+=================================================================================
+                                Template getters
+=================================================================================
+'''
+
+
+def text_getter(path):
+    '''
+    Returns text of template file [string]
+    '''
+    return template_compiler('text', path)
+
+
+def json_getter(path):
+    '''
+    Returns fresh copy of parsed json template safe to modify [dict]
+    '''
+    return copy.deepcopy(template_compiler('json', path)[0])
+
+
+def code_filler(code, values):
+    '''
+    Requires code and {placeholder: value} dict
+    Returns code with all placeholders filled in single pass [string]
+    '''
+    parts = code_compiler(code, tuple(sorted(values)))
+    parts[1::2] = [values[placeholder] for placeholder in parts[1::2]]
+
+    return ''.join(parts)
+
+
+def template_filler(path, values):
+    '''
+    Requires template path and {placeholder: value} dict
+    Returns template code with all placeholders filled in single pass [string]
+    '''
+    parts = list(template_compiler('parts', path, tuple(sorted(values))))
+    parts[1::2] = [values[placeholder] for placeholder in parts[1::2]]
+
+    return ''.join(parts)
+
+
+'''
+=================================================================================
+                                JSON template filler
+=================================================================================
+'''
+
+
+def json_filler(data, values, placeholders=None):
+    '''
+    Requires parsed json and {placeholder: value} dict
+    and optionally placeholder tokens of json if they were already found
+    Returns new json with placeholders filled in all keys and strings in single walk
+    Raises KeyError if json contains placeholder token missing in values
+    or placeholder with None or False value
+    '''
+    if placeholders is None:
+        placeholders = json_placeholders(data)
+    unresolved = set(placeholders.difference(values))
+    regex = placeholder_regex(tuple(sorted(values))) if values else None
+
+    def placeholder_value(match):
+        '''
+        Returns value of matched placeholder as string
+        '''
+        placeholder = match.group(0)
+        if values[placeholder] is None or values[placeholder] is False:
+            unresolved.add(placeholder)
+            return placeholder
+        return str(values[placeholder])
+
+    def fill(text):
+        '''
+        Returns text with filled placeholders
+        '''
+        if regex:
+            text = regex.sub(placeholder_value, text)
+        return text
+
+    def walk(element):
+        '''
+        Returns copy of json element with filled placeholders
+        '''
+        if isinstance(element, str):
+            return fill(element)
+        if isinstance(element, dict):
+            return {fill(key): walk(value) for key, value in element.items()}
+        if isinstance(element, list):
+            return [walk(value) for value in element]
+        return element
+
+    filled = walk(data)
+    if unresolved:
+        raise KeyError(f'Unresolved template placeholders: {", ".join(sorted(unresolved))}')
+
+    return filled
+
+
+def json_template_filler(path, values):
+    '''
+    Requires json template path and {placeholder: value} dict
+    Returns new json of template with all placeholders filled [dict]
+    '''
+    data, placeholders = template_compiler('json', path)
+
+    return json_filler(data, values, placeholders)
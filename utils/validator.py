@@ -21,6 +21,8 @@ from colorama import Fore, Style, init
 
 # ELQuent imports
 import utils.helper as helper
+import utils.config as config
+import utils.index as index
 import utils.api.api as api
 
 # Initialize colorama
@@ -53,10 +55,9 @@ def country_naming_setter(country):
     # Prepares globals for imported modules
     helper.country_naming_setter(source_country)
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -95,7 +96,6 @@ def file(file_path, name=''):
             return os.path.join(datadir, directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
         'email-groups': find_data_file(f'WKCORP_email-groups.json'),
         'outcome-csv': find_data_file(f'WK{source_country}_{name}.csv', directory='outcomes')
     }
@@ -285,13 +285,17 @@ def campaign_data_getter():
     global validation_errors
     validation_errors = []
 
-    # Searches Eloqua for a campaign with above acquired name
-    campaign_json = api.eloqua_get_assets(campaign_name, asset_type='campaign')
-    if len(campaign_json['elements']) > 1:
+    # Searches local asset index for a campaign with above acquired name and gets its data from Eloqua
+    campaigns = [index.index_confirm('campaign', campaign['id'])
+                 for campaign in index.index_search('campaign', campaign_name)]
+    campaigns = [campaign for campaign in campaigns if campaign]
+    if len(campaigns) > 1:
         print(f'{ERROR}There is more than one campaign with the same name!')
         return False
-    else:
-        campaign_json = campaign_json['elements'][0]
+    elif not campaigns:
+        print(f'{ERROR}There is no campaign with that name!')
+        return False
+    campaign_json = campaigns[0]
 
     # Creates dict to map information about the campaign
     print(f'\n{Fore.WHITE}» Campaign Validation')
@@ -14,13 +14,16 @@ linkedin.com/in/mateusz-dabrowski-marketing/
 # Python imports
 import os
 import sys
-import json
+import time
 import pickle
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pyperclip
 from colorama import Fore, Style, init
 
 # ELQuent imports
+import utils.config as config
 import utils.api.api as api
 
 # Initialize colorama
@@ -32,6 +35,12 @@ click_key = None
 click_root = None
 source_country = None
 
+# ClickMeeting API concurrency and rate limit
+CLICK_WORKERS = 8
+CLICK_RATE = 10  # requests per second
+click_lock = threading.Lock()
+click_next_call = 0.0
+
 # Predefined messege elements
 ERROR = f'{Fore.WHITE}[{Fore.RED}ERROR{Fore.WHITE}] {Fore.YELLOW}'
 WARNING = f'{Fore.WHITE}[{Fore.YELLOW}WARNING{Fore.WHITE}] '
@@ -54,10 +63,9 @@ def country_naming_setter(country):
     global click_root
     click_root = 'https://api.clickmeeting.com/v1/'
 
-    # Loads json file with naming convention
-    with open(file('naming'), 'r', encoding='utf-8') as f:
-        global naming
-        naming = json.load(f)
+    # Gets naming convention shared by all modules
+    global naming
+    naming = config.naming_getter()
 
 
 '''
@@ -90,8 +98,9 @@ def file(file_path):
             return os.path.join(datadir, 'utils', directory, filename)
 
     file_paths = {
-        'naming': find_data_file('naming.json', directory='api'),
-        'click': find_data_file('click.p', directory='api')
+        'click': find_data_file('click.p', directory='api'),
+        'sessions': find_data_file('sessions.p', directory='api'),
+        'rooms': find_data_file('rooms.p', directory='api')
     }
 
     return file_paths.get(file_path)
@@ -125,6 +134,158 @@ def get_click_auth():
     return click_api_key
 
 
+'''
+=================================================================================
+                        Uploaded sessions registry
+=================================================================================
+'''
+
+
+def sessions_encode(session_ids):
+    '''
+    Returns compact string of session ids for shared content
+    Sorted ids are stored as base36 deltas prefixed with '~',
+    with runs of the same delta written as delta*count
+    '''
+    encoded = []
+    previous = 0
+    for session_id in sorted(session_ids):
+        delta = base36(session_id - previous)
+        if encoded and encoded[-1][0] == delta:
+            encoded[-1][1] += 1
+        else:
+            encoded.append([delta, 1])
+        previous = session_id
+    encoded = [f'{delta}*{count}' if count > 1 else delta for delta, count in encoded]
+
+    return '~' + ','.join(encoded)
+
+
+def sessions_decode(sessions_txt):
+    '''
+    Returns set of session ids from shared content string
+    Reads both compact '~' format and legacy comma separated ids
+    '''
+    session_ids = set()
+    sessions_txt = sessions_txt.strip()
+    if not sessions_txt.startswith('~'):
+        return {int(session_id) for session_id in sessions_txt.split(',') if session_id.strip()}
+
+    previous = 0
+    for part in sessions_txt[1:].split(','):
+        if not part:
+            continue
+        delta, _, count = part.partition('*')
+        for _ in range(int(count or 1)):
+            previous += int(delta, 36)
+            session_ids.add(previous)
+
+    return session_ids
+
+
+def base36(number):
+    '''
+    Returns lowercase base36 representation of non-negative integer
+    '''
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    output = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        output = digits[remainder] + output
+        if not number:
+            return output
+
+
+def uploaded_sessions_getter():
+    '''
+    Returns shared content with uploaded sessions and set of their ids
+    Decoded ids are cached locally and reused while shared content is unchanged
+    '''
+    sc_id = naming[source_country]['id']['uploaded_sessions_list']
+
+    # Small minimal depth call is enough to validate local cache
+    shared_content = api.eloqua_asset_get(sc_id, 'sharedContent', depth='minimal')
+    if os.path.isfile(file('sessions')):
+        cache = pickle.load(open(file('sessions'), 'rb'))
+        if cache['id'] == sc_id and cache['updatedAt'] == shared_content.get('updatedAt'):
+            return (shared_content, cache['sessions'])
+
+    shared_content = api.eloqua_asset_get(sc_id, 'sharedContent', depth='complete')
+    uploaded_sessions = sessions_decode(shared_content['contentHtml'])
+    uploaded_sessions_cache(shared_content, uploaded_sessions)
+
+    return (shared_content, uploaded_sessions)
+
+
+def uploaded_sessions_cache(shared_content, uploaded_sessions):
+    '''
+    Saves set of uploaded session ids with version of shared content to local cache
+    '''
+    cache = {
+        'id': naming[source_country]['id']['uploaded_sessions_list'],
+        'updatedAt': shared_content.get('updatedAt'),
+        'sessions': uploaded_sessions
+    }
+    pickle.dump(cache, open(file('sessions'), 'wb'))
+
+    return
+
+
+def click_datetime(click_date):
+    '''
+    Returns datetime from ClickMeeting date string or None if there is no date
+    '''
+    if not click_date:
+        return None
+
+    return datetime.datetime.strptime(
+        click_date[:10] + ' ' + click_date[11:16], '%Y-%m-%d %H:%M')
+
+
+'''
+=================================================================================
+                            Room session watermarks
+=================================================================================
+'''
+
+
+def room_watermarks_getter():
+    '''
+    Returns dict of room id and end datetime of its latest handled session
+    '''
+    if not os.path.isfile(file('rooms')):
+        return {}
+
+    return pickle.load(open(file('rooms'), 'rb')).get(source_country, {})
+
+
+def room_watermark_update(watermarks, room_id, session_end):
+    '''
+    Moves room watermark forward to given session end datetime
+    '''
+    room_id = str(room_id)
+    if session_end and (room_id not in watermarks or watermarks[room_id] < session_end):
+        watermarks[room_id] = session_end
+
+    return
+
+
+def room_watermarks_setter(room_watermarks, new_watermarks):
+    '''
+    Saves room watermarks moved forward with handled sessions
+    '''
+    for room_id, session_end in new_watermarks.items():
+        room_watermark_update(room_watermarks, room_id, session_end)
+
+    all_watermarks = {}
+    if os.path.isfile(file('rooms')):
+        all_watermarks = pickle.load(open(file('rooms'), 'rb'))
+    all_watermarks[source_country] = room_watermarks
+    pickle.dump(all_watermarks, open(file('rooms'), 'wb'))
+
+    return
+
+
 '''
 =================================================================================
                             Attendees to CDO flow
@@ -132,11 +293,93 @@ def get_click_auth():
 '''
 
 
+def click_request(root):
+    '''
+    Returns response of ClickMeeting API GET call
+    Spaces calls from all threads to respect CLICK_RATE
+    and retries calls rejected with 429 Too Many Requests
+    '''
+    global click_next_call
+    for attempt in range(5):
+        # Reserves next free call slot
+        with click_lock:
+            now = time.monotonic()
+            delay = click_next_call - now
+            click_next_call = max(now, click_next_call) + 1 / CLICK_RATE
+        if delay > 0:
+            time.sleep(delay)
+
+        response = api.api_request(root, api='click')
+        if response.status_code != 429:
+            break
+        time.sleep(int(response.headers.get('Retry-After', 2 ** attempt)))
+
+    return response
+
+
+def session_to_activities(click_session, room, attendees):
+    '''
+    Requires session tuple (id, start, end), room tuple (id, name) and attendees json
+    Returns list of attendee e-mails and list of External Activities of session
+    '''
+    session_id, session_start_date, _ = click_session
+    _, room_name = room
+
+    # Create list of attendees
+    attendees_list = []
+    for attendee in attendees:
+        if attendee['role'] == 'listener' and attendee['email'] is not None:
+            attendees_list.append(attendee['email'])
+
+    # Deduplicating list of email addresses
+    attendees_list = list(set(attendees_list))
+
+    # Filter out corporate and spam e-mails
+    attendees_list = [att for att in attendees_list if
+                      '@wolterskluwer.' not in att.lower() and len(att) > 8]
+
+    # Modifying values for Eloqua naming convention
+    room_name = room_name\
+        .replace(',', '')\
+        .replace('!', '')\
+        .replace('-', '')\
+        .replace('.', '')\
+        .replace(':', '')\
+        .replace('?', '')\
+        .replace('–', '')\
+        .replace(' ', '-')
+    room_name = room_name[:40] if len(room_name) > 40 else room_name
+    while room_name.endswith('-'):
+        room_name = room_name[:-1]
+    while room_name.startswith('-'):
+        room_name = room_name[1:]
+    session_date = f'{session_start_date[2:4]}-{session_start_date[5:7]}-{session_start_date[8:10]}'
+
+    # Naming convention for shared list of uploaded attendees
+    activity_name = f'WK{source_country}_{session_date}_{room_name}-{str(session_id)}_webinar'
+    while '--' in activity_name:
+        activity_name = activity_name.replace('--', '-')
+
+    # Build external activity structured list
+    activities = []
+    campaign_id = naming[source_country]['id']['campaign']['External_Activity']
+    for attendee in attendees_list:
+        # [E-mail, CampaignId, AssetName, AssetType, AssetDate, ActivityType]
+        activities.append([
+            attendee, campaign_id,
+            activity_name, 'WKPL_Webinar',
+            session_start_date, 'Attended'
+        ])
+
+    return (attendees_list, activities)
+
+
 def click_to_activity(last_webinar_sync):
     '''
     Gets ClickMeeting webinars attendees
     uploads them to Eloqua as a shared list
     and adds them to External Activity
+    Returns count of uploaded activities [integer]
     '''
 
     # Parse last_webinar_sync from string to datetime
@@ -145,162 +388,142 @@ def click_to_activity(last_webinar_sync):
     # Gets current datetime to update last_webinar_sync shared list
     current_sync = datetime.datetime.today().strftime('%Y-%m-%d %H:%M')
 
-    # Gets list of already uploaded webinars
-    uploaded_sessions_shared_list = api.eloqua_asset_get(
-        naming[source_country]['id']['uploaded_sessions_list'], 'sharedContent', depth='complete')
-    old_sessions_shared_list = uploaded_sessions_shared_list['contentHtml']
-    old_sessions_shared_list = old_sessions_shared_list.split(',')
+    # Gets set of already uploaded webinar sessions
+    uploaded_sessions_shared_list, uploaded_sessions = uploaded_sessions_getter()
 
     '''
     =================================================== Get room data
     '''
 
     print(f'\n{Fore.YELLOW}» Getting rooms since last sync')
+    # Loads per-room watermarks of latest already handled session
+    room_watermarks = room_watermarks_getter()
+    current_datetime = datetime.datetime.today()
+
+    def room_has_new_sessions(room, active):
+        '''
+        Returns False if room can't contain sessions ended after last sync
+        or all sessions until its end are already behind its watermark
+        '''
+        room_start = click_datetime(room.get('starts_at'))
+        room_end = click_datetime(room.get('ends_at'))
+        watermark = room_watermarks.get(str(room['id']))
+
+        # Skip rooms that have not started yet
+        if room_start and room_start > current_datetime:
+            return False
+        # Permanent rooms can hold sessions past their planned end
+        if active and room.get('permanent_room'):
+            return True
+        # Skip rooms older then last sync
+        if room_end and room_end < last_sync:
+            return False
+        # Skip finished rooms with all sessions already handled
+        if room_end and watermark and room_end <= watermark and room_end <= current_datetime:
+            return False
+
+        return True
+
     # Save active rooms
-    active_ids = []
-    active_names = []
     root = click_root + 'conferences/active'
     response = api.api_request(root, api='click')
     rooms_active_click = response.json()
-    for room in rooms_active_click:
-        active_ids.append(room['id'])
-        active_names.append(room['name'])
-    active_rooms = list(zip(active_ids, active_names))
+    active_rooms = [(room['id'], room['name']) for room in rooms_active_click
+                    if room_has_new_sessions(room, active=True)]
 
     # Save inactive rooms
-    inactive_ids = []
-    inactive_names = []
     root = click_root + 'conferences/inactive'
     response = api.api_request(root, api='click')
     rooms_inactive_click = response.json()
-    for room in rooms_inactive_click:
-        # Creating datetime version of room end date
-        room_date = room['ends_at'][:10] + ' ' + room['ends_at'][11:16]
-        room_datetime = datetime.datetime.strptime(room_date, '%Y-%m-%d %H:%M')
-        # Skip rooms older then last sync
-        if room_datetime >= last_sync:
-            inactive_ids.append(room['id'])
-            inactive_names.append(room['name'])
-    inactive_rooms = list(zip(inactive_ids, inactive_names))
-    print(f'{Fore.GREEN}» Imported {len(active_rooms)} active and {len(inactive_rooms)} inactive rooms')
+    inactive_rooms = [(room['id'], room['name']) for room in rooms_inactive_click
+                      if room_has_new_sessions(room, active=False)]
+    skipped_rooms = len(rooms_active_click) + len(rooms_inactive_click) \
+        - len(active_rooms) - len(inactive_rooms)
+    print(f'{Fore.GREEN}» Imported {len(active_rooms)} active and {len(inactive_rooms)} inactive rooms'
+          f'{Fore.WHITE} ({skipped_rooms} skipped)')
 
     click_rooms = active_rooms + inactive_rooms
 
     '''
-    =================================================== Get session data
-    '''
-
-    print(f'\n{Fore.YELLOW}» Getting sessions')
-    click_sessions = {}
-    # Save all sessions
-    for room in click_rooms:
-        root = f'{click_root}conferences/{room[0]}/sessions'
-        response = api.api_request(root, api='click')
-        if response.status_code == 200:
-            print(f'{Fore.GREEN}|', end='', flush=True)
-            sessions_in_room = response.json()
-            for session in sessions_in_room:
-                # Skip already uploaded sessions
-                if session['id'] not in old_sessions_shared_list:
-                    click_session = (
-                        session['id'],
-                        session['start_date'][:10] + ' ' +
-                        session['start_date'][11:16],
-                        session['end_date'][:10] + ' ' +
-                        session['end_date'][11:16]
-                    )
-                    click_sessions[click_session] = room
-        else:
-            print(f'{Fore.RED}|', end='', flush=True)
-    print(f'\n{Fore.GREEN}» Imported {len(click_sessions)} sessions')
-
-    '''
-    =================================================== Get attendees data
+    =================================================== Get sessions & attendees data
     '''
 
-    print(f'\n{Fore.YELLOW}» Getting attendees')
+    print(f'\n{Fore.YELLOW}» Getting sessions and attendees')
     sessions = 0
     adresses = []
     activities = []
-    new_sessions_shared_list = []
-    # Create list of attendees of each session in chosen period
-    for key, value in click_sessions.items():
-        # click_sessions unpacking
-        session_id, session_start_date, session_end_date = key
-        room_id, room_name = value
-
-        # Creating datetime version of session_date
-        session_end_datetime = datetime.datetime.strptime(
-            session_end_date, '%Y-%m-%d %H:%M')
-
-        # Skip already sessions older then last sync
-        if session_end_datetime >= last_sync:
-            root = f'{click_root}conferences/{room_id}/sessions/{session_id}/attendees'
-            response = api.api_request(
-                root, api='click')
-            attendees = response.json()
-
-            # Create list of attendees
-            attendees_list = []
-            for attendee in attendees:
-                if attendee['role'] == 'listener' and attendee['email'] is not None:
-                    attendees_list.append(attendee['email'])
-
-            # Deduplicating list of email addresses
-            attendees_list = list(set(attendees_list))
-
-            # Filter out corporate and spam e-mails
-            attendees_list = [att for att in attendees_list if
-                              '@wolterskluwer.' not in att.lower() and len(att) > 8]
-
-            # Add this sessions attendees to main attendees list
-            adresses.extend(attendees_list)
-
-            # Modifying values for Eloqua naming convention
-            room_name = room_name\
-                .replace(',', '')\
-                .replace('!', '')\
-                .replace('-', '')\
-                .replace('.', '')\
-                .replace(':', '')\
-                .replace('?', '')\
-                .replace('–', '')\
-                .replace(' ', '-')
-            room_name = room_name[:40] if len(room_name) > 40 else room_name
-            while room_name.endswith('-'):
-                room_name = room_name[:-1]
-            while room_name.startswith('-'):
-                room_name = room_name[1:]
-            session_date = f'{session_start_date[2:4]}-{session_start_date[5:7]}-{session_start_date[8:10]}'
-
-            # Naming convention for shared list of uploaded attendees
-            activity_name = f'WK{source_country}_{session_date}_{room_name}-{str(session_id)}_webinar'
-            while '--' in activity_name:
-                activity_name = activity_name.replace('--', '-')
-
-            # Build external activity structured list
-            campaign_id = naming[source_country]['id']['campaign']['External_Activity']
-            for attendee in attendees_list:
-                # [E-mail, CampaignId, AssetName, AssetType, AssetDate, ActivityType]
-                activities.append([
-                    attendee, campaign_id,
-                    activity_name, 'WKPL_Webinar',
-                    session_start_date, 'Attended'
-                ])
-
-            # Update shared content with newly uploaded session_ids
-            new_sessions_shared_list.append(str(session_id))
-
-            # Increment sessions count
-            sessions += 1
-
-            print(f'{Fore.GREEN}|', end='', flush=True)
-        else:
-            print(f'{Fore.RED}|', end='', flush=True)
+    new_sessions = set()
+    new_watermarks = {}
+    failed_rooms = set()
+    with ThreadPoolExecutor(max_workers=CLICK_WORKERS) as executor:
+        # Rooms fan out to sessions calls
+        pending = {}
+        for room in click_rooms:
+            root = f'{click_root}conferences/{room[0]}/sessions'
+            pending[executor.submit(click_request, root)] = ('sessions', room)
+
+        # Handles responses as they arrive and fans sessions out to attendees calls
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                call_type, payload = pending.pop(future)
+                response = future.result()
+                if response.status_code != 200:
+                    # Room watermark can't move past sessions that failed
+                    failed_rooms.add(str(payload[0] if call_type == 'sessions' else payload[1][0]))
+                    print(f'{Fore.RED}|', end='', flush=True)
+                    continue
+
+                if call_type == 'sessions':
+                    room_id = payload[0]
+                    watermark = room_watermarks.get(str(room_id))
+                    for session in response.json():
+                        session_end_datetime = click_datetime(session['end_date'])
+
+                        # Skip sessions behind room watermark, older then last sync or already uploaded
+                        if (watermark and session_end_datetime <= watermark)\
+                                or session_end_datetime < last_sync\
+                                or int(session['id']) in uploaded_sessions:
+                            room_watermark_update(
+                                new_watermarks, room_id, session_end_datetime)
+                            continue
+                        click_session = (
+                            session['id'],
+                            session['start_date'][:10] + ' ' +
+                            session['start_date'][11:16],
+                            session['end_date'][:10] + ' ' +
+                            session['end_date'][11:16]
+                        )
+                        root = f'{click_root}conferences/{room_id}/sessions/{session["id"]}/attendees'
+                        pending[executor.submit(click_request, root)] = \
+                            ('attendees', (click_session, payload))
+                    continue
+
+                # Builds activities of session as soon as its attendees arrive
+                click_session, room = payload
+                attendees_list, session_activities = session_to_activities(
+                    click_session, room, response.json())
+                adresses.extend(attendees_list)
+                activities.extend(session_activities)
+
+                # Update shared content with newly uploaded session_ids
+                new_sessions.add(int(click_session[0]))
+                room_watermark_update(
+                    new_watermarks, room[0], click_datetime(click_session[2]))
+
+                # Increment sessions count
+                sessions += 1
+
+                print(f'{Fore.GREEN}|', end='', flush=True)
+
+    # Watermarks of rooms with failed calls stay where they were
+    new_watermarks = {room_id: watermark for room_id, watermark in new_watermarks.items()
+                      if room_id not in failed_rooms}
 
     if not activities:
+        room_watermarks_setter(room_watermarks, new_watermarks)
         print(f'\n{Fore.WHITE}» {Fore.RED}No attendees in given timeframe')
-        return
+        return 0
 
     print(
         f'\n{Fore.GREEN}» Imported {len(activities)} attendees from {sessions} sessions')
@@ -316,11 +539,9 @@ def click_to_activity(last_webinar_sync):
     '''
 
     print(f'\n{Fore.YELLOW}» Saving list of all uploaded webinar sessions')
-    # Creates a string with id's of all uploaded webinar sessions
-    all_sessions_shared_list = \
-        (',').join(old_sessions_shared_list + new_sessions_shared_list)
-    if all_sessions_shared_list.startswith(','):  # in case of no old sessions
-        all_sessions_shared_list = all_sessions_shared_list[1:]
+    # Creates a compact string with id's of all uploaded webinar sessions
+    uploaded_sessions |= new_sessions
+    all_sessions_shared_list = sessions_encode(uploaded_sessions)
 
     # Build shared content data for updating the list of uploaded sessions
     data = {
@@ -329,9 +550,13 @@ def click_to_activity(last_webinar_sync):
         'contentHTML': all_sessions_shared_list
     }
 
-    # Updating list of uploaded sessions to shared content
-    api.eloqua_put_sharedcontent(
-        naming[source_country]['id']['uploaded_sessions_list'], data=data)
+    # Updating list of uploaded sessions to shared content and local cache
+    if api.eloqua_put_sharedcontent(
+            naming[source_country]['id']['uploaded_sessions_list'], data=data):
+        uploaded_sessions_shared_list = api.eloqua_asset_get(
+            naming[source_country]['id']['uploaded_sessions_list'], 'sharedContent', depth='minimal')
+        uploaded_sessions_cache(uploaded_sessions_shared_list, uploaded_sessions)
+        room_watermarks_setter(room_watermarks, new_watermarks)
 
     '''
     =================================================== Update last sync date
@@ -355,7 +580,7 @@ def click_to_activity(last_webinar_sync):
 
     print(f'\n{SUCCESS}External Activities uploaded to Eloqua!')
 
-    return
+    return len(activities)
 
 
 '''